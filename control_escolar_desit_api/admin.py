@@ -1,21 +1,110 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from control_escolar_desit_api.models import *
 
+# ====================================================
+#  PAGINADOR CON CONTEO ESTIMADO
+# ====================================================
+
+# Debajo de este número de filas el conteo exacto es barato y se prefiere
+ADMIN_CONTEO_EXACTO_HASTA = 10000
+
+class ConteoEstimadoPaginator(Paginator):
+    """Sin filtros ni búsqueda, usa la estadística de la tabla en vez de COUNT(*).
+
+    En tablas grandes el COUNT(*) recorre todo el índice en cada página del
+    changelist; la estadística (pg_class / information_schema) es una lectura
+    de catálogo. Con filtros o en tablas chicas se cuenta exacto."""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.where:
+            return super().count
+        estimado = _filas_estimadas(self.object_list.db, self.object_list.model._meta.db_table)
+        if estimado is None or estimado < ADMIN_CONTEO_EXACTO_HASTA:
+            return super().count
+        return estimado
+
+def _filas_estimadas(alias, tabla):
+    conexion = connections[alias]
+    with conexion.cursor() as cursor:
+        if conexion.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [tabla])
+        elif conexion.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+                [tabla],
+            )
+        else:
+            return None
+        fila = cursor.fetchone()
+    # reltuples = -1 si la tabla nunca se ha analizado
+    return fila[0] if fila and fila[0] is not None and fila[0] >= 0 else None
+
+
+class PerfilAdmin(admin.ModelAdmin):
+    """Base de los perfiles (admins, alumnos, maestros) colgados de un User"""
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+    ordering = ("-id",)
+    paginator = ConteoEstimadoPaginator
+    # Evita el segundo COUNT(*) (total sin filtrar) al buscar o filtrar
+    show_full_result_count = False
+    search_fields = ("user__username", "user__email", "user__first_name", "user__last_name")
+
+    @admin.display(description="Nombre", ordering="user__last_name")
+    def nombre(self, obj):
+        return (obj.user.first_name + " " + obj.user.last_name).strip()
+
+    @admin.display(description="Email", ordering="user__email")
+    def email(self, obj):
+        return obj.user.email
+
+    @admin.display(description="Activo", boolean=True, ordering="user__is_active")
+    def activo(self, obj):
+        return obj.user.is_active
+
+
 @admin.register(Administradores)
+class AdministradoresAdmin(PerfilAdmin):
+    list_display = ("id", "nombre", "email", "clave_admin", "activo", "creation", "update")
+    search_fields = PerfilAdmin.search_fields + ("clave_admin", "rfc")
+
+
 @admin.register(Alumnos)
-@admin.register(Maestros)
+class AlumnosAdmin(PerfilAdmin):
+    list_display = ("id", "nombre", "email", "matricula", "activo", "creation", "update")
+    search_fields = PerfilAdmin.search_fields + ("matricula", "curp")
 
-class AdministradoresAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "creation", "update")
-    search_fields = ("user__username", "user__email", "user__first_name", "user__last_name")
 
+@admin.register(Maestros)
+class MaestrosAdmin(PerfilAdmin):
+    list_display = ("id", "nombre", "email", "id_trabajador", "area_investigacion", "activo", "creation", "update")
+    search_fields = PerfilAdmin.search_fields + ("id_trabajador", "rfc")
 
-class AlumnosAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "creation", "update")
-    search_fields = ("user__username", "user__email", "user__first_name", "user__last_name")
 
+@admin.register(Materias)
+class MateriasAdmin(admin.ModelAdmin):
+    list_display = ("id", "periodo", "nrc", "nombre", "seccion", "programa_educativo", "profesor_nombre", "salon", "ocupacion", "update")
+    list_select_related = ("profesor__user",)
+    autocomplete_fields = ("profesor",)
+    ordering = ("-id",)
+    paginator = ConteoEstimadoPaginator
+    show_full_result_count = False
+    search_fields = ("nrc", "nombre", "programa_educativo", "salon")
+    list_filter = ("periodo", "programa_educativo")
+
+    @admin.display(description="Profesor", ordering="profesor__user__last_name")
+    def profesor_nombre(self, obj):
+        if obj.profesor is None:
+            return "-"
+        return (obj.profesor.user.first_name + " " + obj.profesor.user.last_name).strip()
 
-class MaestrosAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "creation", "update")
-    search_fields = ("user__username", "user__email", "user__first_name", "user__last_name")
\ No newline at end of file
+    @admin.display(description="Inscritos / cupo")
+    def ocupacion(self, obj):
+        color = "#c0392b" if obj.inscritos >= obj.cupo else "inherit"
+        return format_html('<span style="color: {}">{} / {}</span>', color, obj.inscritos, obj.cupo)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ControlEscolarDesitApiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'control_escolar_desit_api'
+
+    def ready(self):
+        # Registra los receptores de señales (cachés e índices en memoria)
+        from control_escolar_desit_api import signals  # noqa: F401
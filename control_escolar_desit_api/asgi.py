@@ -0,0 +1,22 @@
+"""
+ASGI config for control_escolar_desit_api project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Needed for long-lived connections such as /eventos/ (server-sent events).
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'control_escolar_desit_api.settings')
+
+application = get_asgi_application()
+
+# Warmup opcional al arrancar el worker (igual que en wsgi.py)
+if os.getenv("WARMUP_AL_ARRANCAR", "").lower() in ("1", "true", "si"):
+    from control_escolar_desit_api.warmup import calentar
+    calentar()
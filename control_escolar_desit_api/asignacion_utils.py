@@ -0,0 +1,208 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+
+from control_escolar_desit_api.horario_utils import HorarioUtils, DIAS_SEMANA
+from control_escolar_desit_api.ocupacion_utils import OcupacionSalones
+
+# Patrones y franjas por defecto cuando el coordinador no manda los suyos
+PATRONES_DEFAULT = [["Lunes", "Miercoles"], ["Martes", "Jueves"], ["Lunes", "Miercoles", "Viernes"], ["Viernes"]]
+FRANJAS_DEFAULT = ["07:00", "08:30", "10:00", "11:30", "13:00", "14:30", "16:00", "17:30", "19:00"]
+
+# Un solo proceso auxiliar: el solver es CPU puro y no debe bloquear al worker web.
+# forkserver y no fork: el worker ya tiene hilos (escritores por lotes, miniaturas)
+# y un fork con hilos corriendo puede dejar al hijo bloqueado en un lock copiado
+_pool = None
+
+def _executor():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("forkserver"))
+    return _pool
+
+class AsignacionUtils:
+
+    @staticmethod
+    def resolver(secciones, fijas, salones, franjas, patrones, segundos):
+        """Asigna salón, días y hora de inicio sin traslapes de salón ni de profesor.
+
+        Trabaja solo con datos planos (sin ORM) para poder correr en otro proceso.
+
+        secciones: [{"id", "profesor", "duracion", "dias", "hora_inicio", "salon"}]
+                   dias/hora_inicio/salon en None = por asignar; lo demás se respeta.
+        fijas:     [{"profesor", "salon", "dias", "hora_inicio", "hora_fin"}] ya ocupadas.
+
+        Heurística voraz (primero las secciones con menos opciones) con
+        reparación: si una sección no cabe, desaloja a la única sección móvil
+        que le estorba y la vuelve a encolar. Se detiene al agotar 'segundos'."""
+        limite = time.monotonic() + segundos
+        n_dias = len(DIAS_SEMANA)
+        ocup_salon = {}     # salon -> [mascara por día]
+        ocup_profesor = {}  # profesor -> [mascara por día]
+        # Secciones ya colocadas (móviles), para poder desalojarlas al reparar
+        colocadas = {}      # id -> (salon, dias_idx, mascara, profesor)
+        duenos = {}         # ("s", salon, dia) / ("p", profesor, dia) -> ids colocados
+
+        def fila(tabla, llave):
+            if llave not in tabla:
+                tabla[llave] = [0] * n_dias
+            return tabla[llave]
+
+        def marcar(salon, profesor, dias_idx, mascara):
+            for d in dias_idx:
+                fila(ocup_salon, salon)[d] |= mascara
+                if profesor:
+                    fila(ocup_profesor, profesor)[d] |= mascara
+
+        for bloque in fijas:
+            dias_idx = [DIAS_SEMANA.index(d) for d in HorarioUtils.dias_materia(bloque["dias"])]
+            mascara = OcupacionSalones.mascara(bloque["hora_inicio"], bloque["hora_fin"])
+            marcar(bloque["salon"], bloque["profesor"], dias_idx, mascara)
+        base_salon = {k: list(v) for k, v in ocup_salon.items()}
+        base_profesor = {k: list(v) for k, v in ocup_profesor.items()}
+
+        patrones_idx = [[DIAS_SEMANA.index(d) for d in HorarioUtils.dias_materia(p)] for p in patrones]
+        franjas_min = [HorarioUtils.minutos(f) for f in franjas]
+
+        def opciones(seccion):
+            if seccion["dias"]:
+                opciones_dias = [[DIAS_SEMANA.index(d) for d in HorarioUtils.dias_materia(seccion["dias"])]]
+            else:
+                opciones_dias = patrones_idx
+            if seccion["hora_inicio"]:
+                opciones_inicio = [HorarioUtils.minutos(seccion["hora_inicio"])]
+            else:
+                opciones_inicio = franjas_min
+            opciones_inicio = [i for i in opciones_inicio if i + seccion["duracion"] <= 24 * 60]
+            opciones_salon = [seccion["salon"]] if seccion["salon"] else salones
+            return opciones_dias, opciones_inicio, opciones_salon
+
+        def candidatos(seccion):
+            opciones_dias, opciones_inicio, opciones_salon = opciones(seccion)
+            for inicio in opciones_inicio:
+                mascara = OcupacionSalones.mascara(inicio, inicio + seccion["duracion"])
+                for dias_idx in opciones_dias:
+                    for salon in opciones_salon:
+                        yield dias_idx, inicio, salon, mascara
+
+        def libre(tabla, llave, dias_idx, mascara):
+            ocupacion = tabla.get(llave)
+            return ocupacion is None or all(ocupacion[d] & mascara == 0 for d in dias_idx)
+
+        def cabe(tabla_salon, tabla_profesor, seccion, salon, dias_idx, mascara):
+            return libre(tabla_salon, salon, dias_idx, mascara) and (
+                not seccion["profesor"] or libre(tabla_profesor, seccion["profesor"], dias_idx, mascara))
+
+        def estorbos(seccion, salon, dias_idx, mascara):
+            ids = set()
+            for d in dias_idx:
+                vecinos = duenos.get(("s", salon, d), set())
+                if seccion["profesor"]:
+                    vecinos = vecinos | duenos.get(("p", seccion["profesor"], d), set())
+                for otro_id in vecinos:
+                    if colocadas[otro_id][2] & mascara:
+                        ids.add(otro_id)
+                        if len(ids) > 1:
+                            return list(ids)
+            return list(ids)
+
+        def colocar(seccion_id, salon, profesor, dias_idx, mascara):
+            colocadas[seccion_id] = (salon, dias_idx, mascara, profesor)
+            marcar(salon, profesor, dias_idx, mascara)
+            for d in dias_idx:
+                duenos.setdefault(("s", salon, d), set()).add(seccion_id)
+                if profesor:
+                    duenos.setdefault(("p", profesor, d), set()).add(seccion_id)
+
+        def desmarcar(desalojado):
+            # Un OR no se deshace: se rearman las filas del salón y profesor afectados
+            salon, dias_idx, _, profesor = colocadas.pop(desalojado)
+            for d in dias_idx:
+                duenos[("s", salon, d)].discard(desalojado)
+                fila(ocup_salon, salon)[d] = base_salon.get(salon, [0] * n_dias)[d]
+                for otro in duenos[("s", salon, d)]:
+                    ocup_salon[salon][d] |= colocadas[otro][2]
+                if profesor:
+                    duenos[("p", profesor, d)].discard(desalojado)
+                    fila(ocup_profesor, profesor)[d] = base_profesor.get(profesor, [0] * n_dias)[d]
+                    for otro in duenos[("p", profesor, d)]:
+                        ocup_profesor[profesor][d] |= colocadas[otro][2]
+
+        def total_opciones(seccion):
+            opciones_dias, opciones_inicio, opciones_salon = opciones(seccion)
+            return len(opciones_dias) * len(opciones_inicio) * len(opciones_salon)
+
+        por_id = {s["id"]: s for s in secciones}
+        # Más restringidas primero: menos candidatos y mayor duración
+        pendientes = deque(s["id"] for s in sorted(secciones, key=lambda s: (total_opciones(s), -s["duracion"])))
+        asignacion = {}
+        desalojos = {}
+        sin_asignar = []
+        agotado = False
+
+        while pendientes:
+            if time.monotonic() > limite:
+                agotado = True
+                sin_asignar.extend(pendientes)
+                break
+            seccion = por_id[pendientes.popleft()]
+            elegido = None
+            for dias_idx, inicio, salon, mascara in candidatos(seccion):
+                if cabe(ocup_salon, ocup_profesor, seccion, salon, dias_idx, mascara):
+                    elegido = (dias_idx, inicio, salon, mascara)
+                    break
+
+            if elegido is None:
+                # Reparación: un candidato que solo choca con UNA sección móvil
+                # (y con ninguna fija) se toma, y la desalojada vuelve a la cola
+                for dias_idx, inicio, salon, mascara in candidatos(seccion):
+                    if not cabe(base_salon, base_profesor, seccion, salon, dias_idx, mascara):
+                        continue
+                    bloqueo = estorbos(seccion, salon, dias_idx, mascara)
+                    if len(bloqueo) == 1 and desalojos.get(bloqueo[0], 0) < 3:
+                        desmarcar(bloqueo[0])
+                        asignacion.pop(bloqueo[0])
+                        desalojos[bloqueo[0]] = desalojos.get(bloqueo[0], 0) + 1
+                        pendientes.append(bloqueo[0])
+                        elegido = (dias_idx, inicio, salon, mascara)
+                        break
+
+            if elegido is None:
+                sin_asignar.append(seccion["id"])
+                continue
+
+            dias_idx, inicio, salon, mascara = elegido
+            colocar(seccion["id"], salon, seccion["profesor"], dias_idx, mascara)
+            fin = inicio + seccion["duracion"]
+            asignacion[seccion["id"]] = {
+                "salon": salon,
+                "dias": [DIAS_SEMANA[d].capitalize() for d in dias_idx],
+                "hora_inicio": "%02d:%02d" % divmod(inicio, 60),
+                "hora_fin": "%02d:%02d" % divmod(fin, 60),
+            }
+
+        return {
+            "asignacion": asignacion,
+            "sin_asignar": sin_asignar,
+            "tiempo_agotado": agotado,
+        }
+
+    @staticmethod
+    def resolver_en_proceso(secciones, fijas, salones, franjas, patrones, segundos):
+        """Corre el solver en un proceso aparte con presupuesto de tiempo.
+
+        El solver ya respeta 'segundos'; el margen extra solo cubre el
+        arranque del proceso y la serialización de datos."""
+        futuro = _executor().submit(
+            AsignacionUtils.resolver, secciones, fijas, salones, franjas, patrones, segundos
+        )
+        try:
+            return futuro.result(timeout=segundos + 5)
+        except FuturesTimeout:
+            futuro.cancel()
+            return {
+                "asignacion": {},
+                "sin_asignar": [s["id"] for s in secciones],
+                "tiempo_agotado": True,
+            }
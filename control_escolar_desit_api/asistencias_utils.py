@@ -0,0 +1,213 @@
+import csv
+import datetime
+import io
+import threading
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from control_escolar_desit_api.escritor_lotes import EscritorPorLotes
+
+class AsistenciaError(Exception):
+    """Check-in inválido (formato, fecha o materia ajena)"""
+    pass
+
+# ====================================================
+#  ESCRITURA POR LOTES
+# ====================================================
+
+def _tablas():
+    from control_escolar_desit_api.models import Asistencias, AsistenciaSesion, Inscripciones
+    return Asistencias._meta.db_table, AsistenciaSesion._meta.db_table, Inscripciones._meta.db_table
+
+def _escribir_postgres(registros):
+    """COPY a una tabla temporal y de ahí un solo INSERT ... ON CONFLICT DO
+    NOTHING; los RETURNING (solo lo realmente nuevo) alimentan los contadores
+    en la misma sentencia. El JOIN con inscripciones descarta a quien no
+    está inscrito. Regresa las llaves escritas."""
+    from control_escolar_desit_api.models import Inscripciones
+    asistencias, sesiones, inscripciones = _tablas()
+    datos = io.StringIO()
+    escritor = csv.writer(datos)
+    for r in registros:
+        escritor.writerow((r["alumno_id"], r["materia_id"], r["sesion"], r["registrada"]))
+    datos.seek(0)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS asistencias_entrada "
+            "(alumno_id bigint, materia_id bigint, sesion date, registrada timestamptz) ON COMMIT DELETE ROWS"
+        )
+        cursor.copy_expert("COPY asistencias_entrada (alumno_id, materia_id, sesion, registrada) FROM STDIN WITH (FORMAT csv)", datos)
+        cursor.execute(f"""
+            WITH nuevas AS (
+                INSERT INTO {asistencias} (alumno_id, materia_id, sesion, registrada)
+                SELECT DISTINCT ON (e.materia_id, e.sesion, e.alumno_id) e.alumno_id, e.materia_id, e.sesion, e.registrada
+                FROM asistencias_entrada e
+                JOIN {inscripciones} i ON i.alumno_id = e.alumno_id AND i.materia_id = e.materia_id AND i.estado = %s
+                ORDER BY e.materia_id, e.sesion, e.alumno_id, e.registrada
+                ON CONFLICT (materia_id, sesion, alumno_id) DO NOTHING
+                RETURNING alumno_id, materia_id, sesion
+            ), contadores AS (
+                INSERT INTO {sesiones} (materia_id, sesion, presentes)
+                SELECT materia_id, sesion, COUNT(*) FROM nuevas GROUP BY materia_id, sesion
+                ON CONFLICT (materia_id, sesion) DO UPDATE SET presentes = {sesiones}.presentes + EXCLUDED.presentes
+            )
+            SELECT alumno_id, materia_id, sesion FROM nuevas
+        """, [Inscripciones.INSCRITO])
+        return {(alumno_id, materia_id, sesion.isoformat()) for alumno_id, materia_id, sesion in cursor.fetchall()}
+
+def _escribir_generico(registros):
+    """MySQL / sqlite: multi-row INSERT con bulk_create. Se bloquean primero
+    los contadores de las sesiones del lote, así dos procesos que escriben la
+    misma sesión se turnan y el contador coincide con las filas insertadas.
+    Regresa las llaves escritas."""
+    from control_escolar_desit_api.models import Asistencias, AsistenciaSesion, Inscripciones
+    nuevos = {}
+    for r in registros:
+        llave = (r["materia_id"], datetime.date.fromisoformat(r["sesion"]), r["alumno_id"])
+        if llave not in nuevos or r["registrada"] < nuevos[llave]:
+            nuevos[llave] = r["registrada"]
+    pares = {(materia_id, sesion) for materia_id, sesion, _ in nuevos}
+    por_par = Q()
+    for materia_id, sesion in pares:
+        por_par |= Q(materia_id=materia_id, sesion=sesion)
+    materia_ids = {materia_id for materia_id, _ in pares}
+    alumno_ids = {alumno_id for _, _, alumno_id in nuevos}
+
+    with transaction.atomic():
+        inscritos = set(Inscripciones.objects.filter(
+            materia_id__in=materia_ids, alumno_id__in=alumno_ids, estado=Inscripciones.INSCRITO
+        ).values_list("materia_id", "alumno_id"))
+        nuevos = {llave: hora for llave, hora in nuevos.items() if (llave[0], llave[2]) in inscritos}
+        if not nuevos:
+            return set()
+        AsistenciaSesion.objects.bulk_create(
+            [AsistenciaSesion(materia_id=m, sesion=s) for m, s in {(m, s) for m, s, _ in nuevos}], ignore_conflicts=True
+        )
+        list(AsistenciaSesion.objects.select_for_update().filter(por_par).order_by("id").values_list("id", flat=True))
+        existentes = set(Asistencias.objects.filter(por_par, alumno_id__in=alumno_ids).values_list("materia_id", "sesion", "alumno_id"))
+        filas = [
+            Asistencias(materia_id=m, sesion=s, alumno_id=a, registrada=hora)
+            for (m, s, a), hora in nuevos.items() if (m, s, a) not in existentes
+        ]
+        Asistencias.objects.bulk_create(filas, batch_size=500)
+        for (materia_id, sesion), presentes in Counter((f.materia_id, f.sesion) for f in filas).items():
+            AsistenciaSesion.objects.filter(materia_id=materia_id, sesion=sesion).update(presentes=F("presentes") + presentes)
+        return {(f.alumno_id, f.materia_id, f.sesion.isoformat()) for f in filas}
+
+def _olvidar(llaves):
+    """Saca llaves de la deduplicación en memoria para que un reintento sí se escriba"""
+    with _lock:
+        for llave in llaves:
+            _recientes.pop(llave, None)
+
+def _escribir(registros):
+    llaves = {(r["alumno_id"], r["materia_id"], r["sesion"]) for r in registros}
+    try:
+        if connection.vendor == "postgresql":
+            escritas = _escribir_postgres(registros)
+        else:
+            escritas = _escribir_generico(registros)
+    except Exception:
+        # Va al respaldo; mientras tanto un reintento del cliente no debe contar como repetido
+        _olvidar(llaves)
+        raise
+    # No inscritos (todavía) o ya en la BD: el reintento vuelve a intentar
+    _olvidar(llaves - escritas)
+    with _lock:
+        _contadores["escritos"] += len(escritas)
+        # Repetidos que ya estaban en la BD o alumnos que no están inscritos
+        _contadores["descartados_bd"] += len(registros) - len(escritas)
+
+escritor = EscritorPorLotes(
+    "asistencias", _escribir, settings.ASISTENCIAS_LOTE, settings.ASISTENCIAS_FLUSH_MS, settings.ASISTENCIAS_RESPALDO
+)
+
+# Contadores del proceso (/metricas-carga/) y llaves recientes para deduplicar en memoria
+_lock = threading.Lock()
+_contadores = Counter()
+_recientes = OrderedDict()
+
+class AsistenciasUtils:
+
+    @staticmethod
+    def normalizar(registro, hoy):
+        """{"alumno", "materia", "sesion"?} -> (alumno_id, materia_id, 'AAAA-MM-DD')"""
+        try:
+            alumno_id, materia_id = int(registro["alumno"]), int(registro["materia"])
+        except (KeyError, TypeError, ValueError):
+            raise AsistenciaError("Cada registro necesita 'alumno' y 'materia' numéricos")
+        sesion = registro.get("sesion") or hoy.isoformat()
+        try:
+            fecha = datetime.date.fromisoformat(str(sesion))
+        except ValueError:
+            raise AsistenciaError("Sesión inválida (AAAA-MM-DD): " + str(sesion))
+        if fecha > hoy:
+            raise AsistenciaError("La sesión no puede ser futura: " + str(sesion))
+        return alumno_id, materia_id, fecha.isoformat()
+
+    @staticmethod
+    def encolar(llaves):
+        """Agrega check-ins ya validados al buffer; regresa (aceptados, duplicados).
+
+        Los repetidos recientes se descartan aquí sin tocar la BD; los que se
+        escapen (otro worker, caché llena) los descarta el índice único al escribir.
+        Una llave que no llega a escribirse se olvida, así el reintento entra."""
+        registrada = timezone.now().isoformat()
+        aceptados = duplicados = 0
+        for alumno_id, materia_id, sesion in llaves:
+            llave = (alumno_id, materia_id, sesion)
+            with _lock:
+                if llave in _recientes:
+                    _recientes.move_to_end(llave)
+                    duplicados += 1
+                    continue
+                _recientes[llave] = True
+                if len(_recientes) > settings.ASISTENCIAS_DEDUP_LLAVES:
+                    _recientes.popitem(last=False)
+            escritor.agregar({"alumno_id": alumno_id, "materia_id": materia_id, "sesion": sesion, "registrada": registrada})
+            aceptados += 1
+        with _lock:
+            _contadores["aceptados"] += aceptados
+            _contadores["duplicados_memoria"] += duplicados
+        return aceptados, duplicados
+
+    @staticmethod
+    def resumen():
+        with _lock:
+            datos = dict(_contadores)
+        datos["pendientes"] = escritor.pendientes()
+        return datos
+
+    @staticmethod
+    def tasas(materia):
+        """Tasa de asistencia de una sección desde los contadores por sesión:
+        presentes / inscritos, por sesión y acumulada (no lee Asistencias)"""
+        from control_escolar_desit_api.models import AsistenciaSesion
+        sesiones = list(AsistenciaSesion.objects.filter(materia_id=materia.id).order_by("sesion").values("sesion", "presentes"))
+        inscritos = materia.inscritos
+        for sesion in sesiones:
+            sesion["tasa"] = round(sesion["presentes"] / inscritos, 4) if inscritos else None
+        presentes = sum(s["presentes"] for s in sesiones)
+        posibles = inscritos * len(sesiones)
+        return {
+            "materia": materia.id,
+            "inscritos": inscritos,
+            "sesiones": sesiones,
+            "presentes": presentes,
+            "tasa": round(presentes / posibles, 4) if posibles else None,
+        }
+
+    @staticmethod
+    def totales_por_materia(materia_ids):
+        """{materia_id: (sesiones, presentes)}; lo usa archivar_periodo"""
+        from control_escolar_desit_api.models import AsistenciaSesion
+        return {
+            fila["materia_id"]: (fila["sesiones"], fila["presentes"] or 0)
+            for fila in AsistenciaSesion.objects.filter(materia_id__in=materia_ids).values("materia_id").annotate(
+                sesiones=Count("id"), presentes=Sum("presentes")
+            )
+        }
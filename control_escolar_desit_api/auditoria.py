@@ -0,0 +1,62 @@
+import contextvars
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from control_escolar_desit_api.escritor_lotes import EscritorPorLotes
+
+# Petición en curso (la guarda UsuarioActualMiddleware); DRF copia el usuario
+# autenticado por token a request.user de la HttpRequest original
+peticion_actual = contextvars.ContextVar("peticion_actual", default=None)
+
+def usuario_actual_id():
+    request = peticion_actual.get()
+    user = getattr(request, "user", None) if request is not None else None
+    if user is not None and user.is_authenticated:
+        return user.id
+    return None
+
+def valores(instancia):
+    """Valores de la fila en tipos JSON (fechas y decimales como texto)"""
+    datos = {}
+    for campo in instancia._meta.concrete_fields:
+        valor = getattr(instancia, campo.attname)
+        try:
+            valor = campo.to_python(valor)
+        except Exception:
+            pass
+        datos[campo.attname] = valor
+    return json.loads(json.dumps(datos, cls=DjangoJSONEncoder))
+
+def diferencias(antes, despues):
+    antes = json.loads(json.dumps(antes, cls=DjangoJSONEncoder))
+    despues = json.loads(json.dumps(despues, cls=DjangoJSONEncoder))
+    return {
+        campo: [antes.get(campo), valor]
+        for campo, valor in despues.items()
+        if campo not in ("update", "creation") and antes.get(campo) != valor
+    }
+
+def _escribir(items):
+    from control_escolar_desit_api.models import Auditoria
+    Auditoria.objects.bulk_create([Auditoria(**item) for item in items], batch_size=len(items))
+
+escritor = EscritorPorLotes(
+    "auditoria", _escribir, settings.AUDITORIA_LOTE, settings.AUDITORIA_FLUSH_MS, settings.AUDITORIA_RESPALDO
+)
+
+def registrar(entidad, entidad_id, accion, cambios):
+    """Encola un evento de auditoría al confirmarse la transacción (si hay
+    rollback no queda registro); no toca la BD en la transacción de la petición"""
+    item = {
+        "entidad": entidad,
+        "entidad_id": entidad_id,
+        "accion": accion,
+        "cambios": cambios,
+        "usuario_id": usuario_actual_id(),
+        "fecha": timezone.now(),
+    }
+    transaction.on_commit(lambda: escritor.agregar(item), robust=True)
@@ -0,0 +1,206 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+
+from control_escolar_desit_api import auditoria
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+from control_escolar_desit_api.models import (
+    Alumnos, Inscripciones, Calificaciones, CalificacionesArchivo, ResumenAcademico, Auditoria,
+)
+
+CALIFICACION_MAXIMA = Decimal("10")
+UN_DECIMAL = Decimal("0.1")
+DOS_DECIMALES = Decimal("0.01")
+
+CAMPOS_RESUMEN = ["materias", "creditos_cursados", "creditos_aprobados", "puntos", "promedio", "update"]
+
+class CalificacionError(Exception):
+    """Error de negocio al capturar (materia, permisos, filas inválidas)"""
+
+    def __init__(self, mensaje, errores=None):
+        super().__init__(mensaje)
+        self.errores = errores or []
+
+def _minima():
+    return Decimal(str(settings.CALIFICACION_MINIMA))
+
+def _upsert(modelo, objetos, unicos, campos):
+    """Un INSERT ... ON CONFLICT DO UPDATE por lote. MySQL resuelve el conflicto
+    con cualquier llave única y no acepta 'unique_fields'"""
+    opciones = {"update_conflicts": True, "update_fields": campos}
+    if connection.features.supports_update_conflicts_with_target:
+        opciones["unique_fields"] = unicos
+    for objeto in objetos:
+        # Se identifica por la llave única, no por el id que traiga de la BD
+        objeto.pk = None
+    modelo.objects.bulk_create(objetos, **opciones)
+
+def _promedio(puntos, creditos):
+    if not creditos:
+        return Decimal("0")
+    return (Decimal(puntos) / creditos).quantize(DOS_DECIMALES, rounding=ROUND_HALF_UP)
+
+class CalificacionesUtils:
+
+    @staticmethod
+    def parsear(valor):
+        """'8.5' / 8.5 / 9 -> Decimal('8.5'); None si no es una calificación válida"""
+        if valor is None or isinstance(valor, bool):
+            return None
+        try:
+            calificacion = Decimal(str(valor).strip())
+        except InvalidOperation:
+            return None
+        if not calificacion.is_finite() or not (0 <= calificacion <= CALIFICACION_MAXIMA):
+            return None
+        if calificacion != calificacion.quantize(UN_DECIMAL):
+            return None
+        return calificacion.quantize(UN_DECIMAL)
+
+    @staticmethod
+    def validar(materia, filas):
+        """Valida la captura completa con una sola consulta a la BD.
+
+        Regresa ({alumno_id: Decimal}, errores); cada error es
+        {"fila", "alumno", "mensaje"}. Solo se califica a inscritos
+        (no a la lista de espera) de la misma materia."""
+        inscritos = set(
+            Inscripciones.objects.filter(materia_id=materia.id, estado=Inscripciones.INSCRITO)
+            .values_list("alumno_id", flat=True)
+        )
+        limpias, errores = {}, []
+        for i, fila in enumerate(filas):
+            alumno = fila.get("alumno") if isinstance(fila, dict) else None
+            try:
+                alumno_id = int(alumno)
+            except (TypeError, ValueError):
+                errores.append({"fila": i, "alumno": alumno, "mensaje": "Alumno inválido"})
+                continue
+            calificacion = CalificacionesUtils.parsear(fila.get("calificacion"))
+            if calificacion is None:
+                errores.append({"fila": i, "alumno": alumno_id, "mensaje": "Calificación inválida (0 a 10, un decimal)"})
+            elif alumno_id in limpias:
+                errores.append({"fila": i, "alumno": alumno_id, "mensaje": "Alumno repetido en la captura"})
+            elif alumno_id not in inscritos:
+                errores.append({"fila": i, "alumno": alumno_id, "mensaje": "El alumno no está inscrito en la materia"})
+            else:
+                limpias[alumno_id] = calificacion
+        return limpias, errores
+
+    @staticmethod
+    def ajustar_resumen(resumen, antes, despues, creditos):
+        """Aplica a 'resumen' el cambio de una calificación (antes=None si es nueva)"""
+        minima = _minima()
+        if antes is None:
+            resumen.materias += 1
+            resumen.creditos_cursados += creditos
+            resumen.puntos += despues * creditos
+        else:
+            resumen.puntos += (despues - antes) * creditos
+        aprobaba = antes is not None and antes >= minima
+        if despues >= minima and not aprobaba:
+            resumen.creditos_aprobados += creditos
+        elif despues < minima and aprobaba:
+            resumen.creditos_aprobados -= creditos
+        resumen.promedio = _promedio(resumen.puntos, resumen.creditos_cursados)
+
+    @staticmethod
+    def capturar(materia, filas, user=None):
+        """Alta o cambio de las calificaciones de una sección.
+
+        Por lote de CALIFICACIONES_LOTE alumnos: un bulk_create con
+        update_conflicts para las calificaciones y otro para los resúmenes,
+        ajustados por diferencia contra la calificación anterior (no se
+        recalcula el historial). Se bloquean las filas de los alumnos, igual
+        que al inscribir, para que dos capturas simultáneas no pisen el
+        mismo resumen. Todo o nada: si hay filas inválidas no se guarda nada."""
+        # Igual que las asistencias: los periodos cerrados ya no se capturan
+        if materia.periodo != PeriodoUtils.actual():
+            raise CalificacionError("La materia no es del periodo actual")
+        limpias, errores = CalificacionesUtils.validar(materia, filas)
+        if errores:
+            raise CalificacionError("Hay filas inválidas", errores)
+
+        alumno_ids = sorted(limpias)
+        lote = settings.CALIFICACIONES_LOTE
+        cambios = []
+        with transaction.atomic():
+            for i in range(0, len(alumno_ids), lote):
+                ids = alumno_ids[i:i + lote]
+                # Orden fijo de bloqueo para no provocar deadlocks entre capturas
+                list(Alumnos.objects.select_for_update().filter(id__in=ids).order_by("id").values_list("id", flat=True))
+                anteriores = dict(
+                    Calificaciones.objects.filter(materia_id=materia.id, alumno_id__in=ids)
+                    .values_list("alumno_id", "calificacion")
+                )
+                resumenes = {r.alumno_id: r for r in ResumenAcademico.objects.filter(alumno_id__in=ids)}
+
+                calificaciones, ajustados = [], []
+                for alumno_id in ids:
+                    antes, despues = anteriores.get(alumno_id), limpias[alumno_id]
+                    if antes == despues:
+                        continue
+                    calificaciones.append(Calificaciones(
+                        alumno_id=alumno_id, materia_id=materia.id, calificacion=despues,
+                        capturada_por_id=user.id if user else None,
+                    ))
+                    resumen = resumenes.setdefault(alumno_id, ResumenAcademico(alumno_id=alumno_id))
+                    CalificacionesUtils.ajustar_resumen(resumen, antes, despues, materia.creditos)
+                    ajustados.append(resumen)
+                    cambios.append((alumno_id, antes, despues))
+
+                if calificaciones:
+                    _upsert(Calificaciones, calificaciones, ["alumno", "materia"], ["calificacion", "capturada_por", "update"])
+                    _upsert(ResumenAcademico, ajustados, ["alumno"], CAMPOS_RESUMEN)
+
+        for alumno_id, antes, despues in cambios:
+            auditoria.registrar("calificaciones", materia.id, Auditoria.CREAR if antes is None else Auditoria.EDITAR, {
+                "alumno_id": alumno_id, "calificacion": [str(antes) if antes is not None else None, str(despues)],
+            })
+        creadas = sum(1 for _, antes, _ in cambios if antes is None)
+        return {"creadas": creadas, "actualizadas": len(cambios) - creadas, "sin_cambio": len(alumno_ids) - len(cambios)}
+
+    @staticmethod
+    def recalcular(alumno_ids):
+        """Reconstruye los resúmenes desde cero (calificaciones vivas y archivadas).
+
+        Para cuando cambian los créditos de una materia ya calificada o para
+        verificar/rehacer los agregados con 'recalcular_resumenes'."""
+        alumno_ids = sorted(set(alumno_ids))
+        if not alumno_ids:
+            return 0
+        minima = _minima()
+        with transaction.atomic():
+            # Mismo bloqueo que capturar(): nadie ajusta estos resúmenes mientras se rehacen
+            existentes = list(
+                Alumnos.objects.select_for_update().filter(id__in=alumno_ids).order_by("id").values_list("id", flat=True)
+            )
+            puntos = ExpressionWrapper(F("calificacion") * F("materia__creditos"), output_field=DecimalField())
+            vivas = Calificaciones.objects.filter(alumno_id__in=existentes).values("alumno_id").annotate(
+                materias=Count("id"),
+                creditos_cursados=Sum("materia__creditos"),
+                creditos_aprobados=Sum("materia__creditos", filter=Q(calificacion__gte=minima)),
+                puntos=Sum(puntos),
+            )
+            puntos = ExpressionWrapper(F("calificacion") * F("creditos"), output_field=DecimalField())
+            archivadas = CalificacionesArchivo.objects.filter(alumno_id__in=existentes).values("alumno_id").annotate(
+                materias=Count("id"),
+                creditos_cursados=Sum("creditos"),
+                creditos_aprobados=Sum("creditos", filter=Q(calificacion__gte=minima)),
+                puntos=Sum(puntos),
+            )
+            resumenes = {a: ResumenAcademico(alumno_id=a, puntos=Decimal("0")) for a in existentes}
+            for fila in list(vivas) + list(archivadas):
+                resumen = resumenes[fila["alumno_id"]]
+                resumen.materias += fila["materias"]
+                resumen.creditos_cursados += fila["creditos_cursados"] or 0
+                resumen.creditos_aprobados += fila["creditos_aprobados"] or 0
+                resumen.puntos += Decimal(fila["puntos"] or 0)
+            for resumen in resumenes.values():
+                resumen.puntos = resumen.puntos.quantize(UN_DECIMAL)
+                resumen.promedio = _promedio(resumen.puntos, resumen.creditos_cursados)
+            if resumenes:
+                _upsert(ResumenAcademico, list(resumenes.values()), ["alumno"], CAMPOS_RESUMEN)
+        return len(existentes)
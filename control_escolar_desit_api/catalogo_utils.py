@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.fields import CharField
+from rest_framework.filters import search_smart_split
+
+from control_escolar_desit_api.horario_utils import HorarioUtils, DIAS_SEMANA
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+
+# Mismos campos que MateriasList.search_fields
+CAMPOS_BUSQUEDA = ("nrc", "nombre", "programa_educativo")
+
+class CatalogoUtils:
+    """Snapshot compacto del catálogo de materias (por periodo) para facetas y búsquedas.
+
+    Se guarda en caché bajo una versión que se incrementa tras el commit de
+    cada escritura de Materias (ver signals.py). Sin caché compartida los
+    demás workers no ven el incremento y sirven lo suyo hasta que vence
+    CATALOGO_CACHE_SEGUNDOS."""
+
+    @staticmethod
+    def version():
+        version = cache.get("catalogo:version")
+        if version is None:
+            version = 1
+            cache.add("catalogo:version", version, None)
+        return version
+
+    @staticmethod
+    def invalidar():
+        try:
+            cache.incr("catalogo:version")
+        except ValueError:
+            cache.set("catalogo:version", 1, None)
+
+    @staticmethod
+    def snapshot(periodo):
+        """Filas de un periodo; None = todos los periodos"""
+        llave = "catalogo:snapshot:" + str(CatalogoUtils.version()) + ":" + (periodo or "todos")
+        filas = cache.get(llave)
+        if filas is None:
+            from control_escolar_desit_api.models import Materias
+            filas = []
+            consulta = Materias.objects.all()
+            if periodo:
+                consulta = consulta.filter(periodo=periodo)
+            consulta = consulta.values_list(
+                "nrc", "nombre", "programa_educativo", "creditos", "dias",
+                "profesor_id", "profesor__user__first_name", "profesor__user__last_name",
+            )
+            for nrc, nombre, programa, creditos, dias, profesor_id, nombre_prof, apellido_prof in consulta:
+                filas.append((
+                    # Texto en minúsculas para replicar el icontains de SearchFilter
+                    tuple((v or "").lower() for v in (nrc, nombre, programa)),
+                    programa,
+                    creditos,
+                    tuple(HorarioUtils.dias_materia(dias)),
+                    profesor_id,
+                    (str(nombre_prof or "") + " " + str(apellido_prof or "")).strip() if profesor_id else None,
+                ))
+            cache.set(llave, filas, settings.CATALOGO_CACHE_SEGUNDOS)
+        return filas
+
+    @staticmethod
+    def terminos(search):
+        """Separa ?search= igual que rest_framework.filters.SearchFilter"""
+        limpio = CharField(trim_whitespace=False, allow_blank=True).run_validation(search or "")
+        return [t.lower() for t in search_smart_split(limpio)]
+
+    @staticmethod
+    def facetas(search, periodo):
+        """Conteos por programa, créditos, día y profesor en una sola pasada.
+        'periodo' es el de PeriodoUtils.de_request (None = todos), igual que el listado"""
+        terminos = CatalogoUtils.terminos(search)
+        llave = "catalogo:facetas:" + str(CatalogoUtils.version()) + ":" + (periodo or "todos") + ":" + " ".join(terminos)
+        resultado = cache.get(llave)
+        if resultado is not None:
+            return resultado
+
+        programas, creditos, dias, profesores = {}, {}, {}, {}
+        total = 0
+        for texto, programa, credito, dias_materia, profesor_id, profesor_nombre in CatalogoUtils.snapshot(periodo):
+            # Cada término debe aparecer en al menos uno de los campos
+            if terminos and not all(any(t in campo for campo in texto) for t in terminos):
+                continue
+            total += 1
+            programas[programa] = programas.get(programa, 0) + 1
+            creditos[credito] = creditos.get(credito, 0) + 1
+            for dia in dias_materia:
+                dias[dia] = dias.get(dia, 0) + 1
+            if profesor_id:
+                if profesor_id not in profesores:
+                    profesores[profesor_id] = {"id": profesor_id, "nombre": profesor_nombre, "total": 0}
+                profesores[profesor_id]["total"] += 1
+
+        resultado = {
+            "total": total,
+            "programa_educativo": [
+                {"valor": p, "total": n} for p, n in sorted(programas.items(), key=lambda i: (-i[1], i[0] or ""))
+            ],
+            "creditos": [{"valor": c, "total": n} for c, n in sorted(creditos.items())],
+            "dias": [{"valor": d, "total": dias[d]} for d in DIAS_SEMANA if d in dias],
+            "profesor": sorted(profesores.values(), key=lambda p: (-p["total"], p["nombre"] or "")),
+        }
+        cache.set(llave, resultado, settings.CATALOGO_CACHE_SEGUNDOS)
+        return resultado
@@ -1,9 +1,20 @@
-from control_escolar_desit_api.models import *
+import asyncio
 import json
-import requests
 import datetime
 import random
 import string
+import threading
+from cachetools import TTLCache
+from django.conf import settings
+
+# 'requests' se importa dentro de las funciones que lo usan. En el servidor
+# no ahorra arranque (rest_framework.compat ya lo importa y urls.py carga
+# todas las vistas); solo lo evitan los procesos que no cargan DRF
+
+# Estado compartido por proceso para validar URLs remotas
+_lock = threading.Lock()
+_session = None
+_cache_urls = TTLCache(maxsize=4096, ttl=settings.URL_IMAGEN_CACHE_SEGUNDOS)
 
 class DataUtils:
 
@@ -65,13 +76,61 @@ class DataUtils:
         return text.startswith('http://') or text.startswith('https://')
 
     @staticmethod
-    def is_url_image(image_url):
+    def http_session():
+        """Sesión compartida con pool de conexiones (keep-alive entre validaciones)"""
+        global _session
+        import requests
+        from requests.adapters import HTTPAdapter
+        if _session is None:
+            with _lock:
+                if _session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=settings.URL_VALIDACION_CONCURRENCIA, max_retries=0)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    _session = session
+        return _session
+
+    @staticmethod
+    def is_url_image(image_url, timeout=None):
+        """True si la URL responde con un content-type de imagen.
+
+        Usa la sesión compartida, timeouts estrictos y recuerda el resultado
+        URL_IMAGEN_CACHE_SEGUNDOS para no repetir el HEAD."""
+        with _lock:
+            if image_url in _cache_urls:
+                return _cache_urls[image_url]
+
+        import requests
         image_formats = ("image/png", "image/jpeg", "image/jpg")
-        r = requests.head(image_url)
-        print("Content type:: "+str(r.headers["content-type"]))
-        if r.headers["content-type"] in image_formats:
-            return True
-        return False
+        try:
+            r = DataUtils.http_session().head(
+                image_url, timeout=timeout or settings.URL_VALIDACION_TIMEOUT, allow_redirects=True
+            )
+            content_type = r.headers.get("content-type", "").split(";")[0].strip().lower()
+            es_imagen = r.ok and content_type in image_formats
+        except requests.RequestException:
+            es_imagen = False
+
+        with _lock:
+            _cache_urls[image_url] = es_imagen
+        return es_imagen
+
+    @staticmethod
+    async def are_urls_images_async(urls, concurrencia=None, timeout=None):
+        """Valida muchas URLs a la vez con concurrencia acotada: {url: bool}"""
+        semaforo = asyncio.Semaphore(concurrencia or settings.URL_VALIDACION_CONCURRENCIA)
+
+        async def validar(url):
+            async with semaforo:
+                return url, await asyncio.to_thread(DataUtils.is_url_image, url, timeout)
+
+        return dict(await asyncio.gather(*(validar(url) for url in dict.fromkeys(urls))))
+
+    @staticmethod
+    def are_urls_images(urls, concurrencia=None, timeout=None):
+        """Versión síncrona de are_urls_images_async para las vistas WSGI"""
+        return asyncio.run(DataUtils.are_urls_images_async(urls, concurrencia, timeout))
 
     @staticmethod
     def getUrl(request):
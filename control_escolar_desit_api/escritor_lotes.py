@@ -0,0 +1,150 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+class EscritorPorLotes:
+    """Cola en memoria que se vacía a la BD desde un hilo en segundo plano.
+
+    Los productores (señales, vistas) solo hacen append; el hilo llama a
+    'escribir(items)' cada 'intervalo_ms' o en cuanto se juntan 'lote'
+    elementos. Si la BD falla, o al apagar el proceso, lo pendiente se
+    agrega a un archivo JSONL de respaldo que se reintenta al arrancar y
+    cada RECUPERAR_CADA segundos."""
+
+    RECUPERAR_CADA = 60
+
+    def __init__(self, nombre, escribir, lote, intervalo_ms, respaldo):
+        self.nombre = nombre
+        self.escribir = escribir
+        self.lote = lote
+        self.intervalo = intervalo_ms / 1000.0
+        self.respaldo = respaldo
+        self._items = []
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo = None
+        self._detenido = False
+
+    def agregar(self, item):
+        with self._lock:
+            self._items.append(item)
+            lleno = len(self._items) >= self.lote
+        self._iniciar()
+        if lleno:
+            self._despertar.set()
+
+    def pendientes(self):
+        with self._lock:
+            return len(self._items)
+
+    def _iniciar(self):
+        if self._hilo is not None:
+            return
+        with self._lock:
+            if self._hilo is not None:
+                return
+            self._hilo = threading.Thread(target=self._ciclo, name="escritor-" + self.nombre, daemon=True)
+            self._hilo.start()
+        atexit.register(self.detener)
+
+    def _ciclo(self):
+        # Ningún error puede terminar el hilo: sin él la cola solo crece
+        recuperado = 0
+        while not self._detenido:
+            if time.monotonic() - recuperado >= self.RECUPERAR_CADA:
+                recuperado = time.monotonic()
+                try:
+                    self._recuperar_respaldo()
+                except Exception:
+                    logger.exception("Escritor %s: falló la recuperación del respaldo", self.nombre)
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            try:
+                self.vaciar()
+            except Exception:
+                logger.exception("Escritor %s: falló el ciclo de escritura", self.nombre)
+            close_old_connections()
+
+    def vaciar(self):
+        """Escribe todo lo pendiente; regresa cuántos elementos se escribieron"""
+        escritos = 0
+        while True:
+            with self._lock:
+                items, self._items = self._items[:self.lote], self._items[self.lote:]
+            if not items:
+                return escritos
+            try:
+                self.escribir(items)
+                escritos += len(items)
+            except Exception:
+                logger.exception("Escritor %s: falló la escritura, se guarda en respaldo", self.nombre)
+                try:
+                    self._guardar_respaldo(items)
+                except OSError:
+                    # Sin BD ni disco: de vuelta a la cola para el siguiente ciclo
+                    logger.exception("Escritor %s: falló el respaldo, %d elementos siguen en memoria", self.nombre, len(items))
+                    with self._lock:
+                        self._items = items + self._items
+                    return escritos
+
+    def detener(self):
+        self._detenido = True
+        self._despertar.set()
+        # Último intento en BD; lo que falle termina en el archivo
+        self.vaciar()
+
+    def _guardar_respaldo(self, items):
+        with open(self.respaldo, "a", encoding="utf-8") as archivo:
+            for item in items:
+                archivo.write(json.dumps(item, cls=DjangoJSONEncoder) + "\n")
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+    def _recuperar_respaldo(self):
+        """Reclama el respaldo y los '.procesando' de procesos que ya no existen.
+
+        El rename es el candado: si dos workers arrancan juntos solo uno gana y
+        al otro le queda FileNotFoundError, que significa 'nada que recuperar'."""
+        for origen in [self.respaldo] + self._huerfanos():
+            procesando = "%s.%d.%d.procesando" % (self.respaldo, os.getpid(), time.time_ns())
+            try:
+                os.rename(origen, procesando)
+            except FileNotFoundError:
+                continue
+            with open(procesando, encoding="utf-8") as archivo:
+                items = [json.loads(linea) for linea in archivo if linea.strip()]
+            with self._lock:
+                self._items = items + self._items
+            # Lo que vuelva a fallar regresa al respaldo (o a la cola si tampoco hay disco)
+            self.vaciar()
+            os.remove(procesando)
+
+    def _huerfanos(self):
+        """'.procesando' cuyo proceso (pid en el nombre) ya terminó a medias"""
+        huerfanos = []
+        for ruta in glob.glob(glob.escape(self.respaldo) + ".*.procesando"):
+            partes = ruta[len(self.respaldo) + 1:-len(".procesando")].split(".")
+            if len(partes) == 2 and partes[0].isdigit() and _proceso_vivo(int(partes[0])):
+                continue
+            huerfanos.append(ruta)
+        return huerfanos
+
+def _proceso_vivo(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,114 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+
+from django.conf import settings
+
+class Suscriptor:
+    """Un cliente SSE conectado: buffer acotado que vive en su event loop"""
+
+    def __init__(self, loop, entidades, capacidad):
+        self.loop = loop
+        self.entidades = entidades
+        self.cola = deque(maxlen=capacidad)
+        self.aviso = asyncio.Event()
+        # Si el cliente no alcanza a leer se descartan los más viejos y se le
+        # pide resincronizar (por /cambios/) en vez de crecer sin límite
+        self.desbordado = False
+
+    def interesa(self, evento):
+        return not self.entidades or evento["entidad"] in self.entidades
+
+    def entregar(self, evento):
+        # Corre siempre en el loop del cliente (call_soon_threadsafe)
+        if len(self.cola) == self.cola.maxlen:
+            self.desbordado = True
+        self.cola.append(evento)
+        self.aviso.set()
+
+
+class Difusor:
+    """Fan-out en proceso de avisos de cambio (entidad, id, versión).
+
+    Las señales publican desde cualquier hilo; cada suscriptor recibe el
+    evento en su propio event loop. Se guarda un historial corto para que un
+    cliente que se reconecta con Last-Event-ID no pierda avisos. Cada
+    proceso tiene su propio difusor: con varios workers, cada cliente solo
+    ve los cambios hechos en su worker (y /cambios/ cubre el resto)."""
+
+    def __init__(self, historial):
+        self._lock = threading.Lock()
+        self._suscriptores = set()
+        self._secuencia = itertools.count(1)
+        self._historial = deque(maxlen=historial)
+
+    def conectados(self):
+        with self._lock:
+            return len(self._suscriptores)
+
+    def suscribir(self, entidades, capacidad, ultimo_id=None):
+        """Se llama desde el loop del cliente; 'ultimo_id' es su Last-Event-ID"""
+        suscriptor = Suscriptor(asyncio.get_running_loop(), entidades, capacidad)
+        with self._lock:
+            if ultimo_id is not None:
+                pendientes = [e for e in self._historial if e["id"] > ultimo_id]
+                ultimo = self._historial[-1]["id"] if self._historial else 0
+                # Hueco: el historial ya no llega hasta su último id, o el id es
+                # de otro proceso (otro worker o uno que ya se reinició)
+                if ultimo_id > ultimo or (self._historial and self._historial[0]["id"] > ultimo_id + 1):
+                    suscriptor.desbordado = True
+                for evento in pendientes:
+                    if suscriptor.interesa(evento):
+                        suscriptor.entregar(evento)
+            self._suscriptores.add(suscriptor)
+        return suscriptor
+
+    def cancelar(self, suscriptor):
+        with self._lock:
+            self._suscriptores.discard(suscriptor)
+
+    def publicar(self, entidad, entidad_id, accion, version):
+        with self._lock:
+            evento = {
+                "id": next(self._secuencia),
+                "entidad": entidad,
+                "entidad_id": entidad_id,
+                "accion": accion,
+                "version": version,
+            }
+            self._historial.append(evento)
+            destinos = [s for s in self._suscriptores if s.interesa(evento)]
+        for suscriptor in destinos:
+            try:
+                suscriptor.loop.call_soon_threadsafe(suscriptor.entregar, evento)
+            except RuntimeError:
+                # Loop cerrado: el cliente ya se fue
+                self.cancelar(suscriptor)
+
+    async def flujo(self, suscriptor, heartbeat):
+        """Texto SSE para un suscriptor; manda un comentario cada 'heartbeat'
+        segundos para que proxies y balanceadores no corten la conexión"""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if not suscriptor.cola and not suscriptor.desbordado:
+                    suscriptor.aviso.clear()
+                    try:
+                        await asyncio.wait_for(suscriptor.aviso.wait(), heartbeat)
+                    except asyncio.TimeoutError:
+                        yield ": ping\n\n"
+                        continue
+                if suscriptor.desbordado:
+                    suscriptor.desbordado = False
+                    yield "event: resync\ndata: {}\n\n"
+                while suscriptor.cola:
+                    evento = suscriptor.cola.popleft()
+                    datos = {k: v for k, v in evento.items() if k != "id"}
+                    yield "id: %d\nevent: cambio\ndata: %s\n\n" % (evento["id"], json.dumps(datos))
+        finally:
+            self.cancelar(suscriptor)
+
+# Instancia única por proceso
+difusor = Difusor(settings.SSE_HISTORIAL)
@@ -0,0 +1,141 @@
+import json
+import unicodedata
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+
+# Orden canónico de la semana (sin acentos, en minúsculas)
+DIAS_SEMANA = ["lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo"]
+
+class HorarioUtils:
+
+    @staticmethod
+    def normalizar_dia(dia):
+        """Convierte 'Miércoles' / 'MIERCOLES' / 'miercoles' a 'miercoles' """
+        if not dia:
+            return ""
+        texto = unicodedata.normalize("NFKD", str(dia))
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+        return texto.strip().lower()
+
+    @staticmethod
+    def dias_materia(dias):
+        """Regresa la lista de días normalizados de una materia.
+
+        El campo 'dias' puede venir como lista o como string JSON
+        (las vistas guardan json.dumps dentro del JSONField)."""
+        if isinstance(dias, str):
+            try:
+                dias = json.loads(dias)
+            except Exception:
+                dias = []
+        if not isinstance(dias, list):
+            return []
+        normalizados = [HorarioUtils.normalizar_dia(d) for d in dias]
+        return [d for d in DIAS_SEMANA if d in normalizados]
+
+    @staticmethod
+    def minutos(hora):
+        """Minutos desde medianoche de un time, de un string 'HH:MM[:SS]' o de un int"""
+        if hora is None or hora == "":
+            return None
+        if isinstance(hora, int):
+            return hora
+        if isinstance(hora, str):
+            partes = hora.split(":")
+            return int(partes[0]) * 60 + int(partes[1])
+        return hora.hour * 60 + hora.minute
+
+    @staticmethod
+    def hora_valida(texto):
+        """Minutos de un 'HH:MM' que viene del cliente, entre 00:00 y 24:00.
+        Lanza ValueError si no lo es (minutos() acepta cualquier número)"""
+        partes = texto.strip().split(":") if isinstance(texto, str) else []
+        if len(partes) != 2 or not all(p.isascii() and p.isdigit() and len(p) <= 2 for p in partes):
+            raise ValueError("Formato de hora inválido (HH:MM)")
+        minutos = int(partes[0]) * 60 + int(partes[1])
+        if int(partes[1]) > 59 or minutos > 24 * 60:
+            raise ValueError("Hora fuera de 00:00 a 24:00")
+        return minutos
+
+    @staticmethod
+    def se_traslapan(dias_a, inicio_a, fin_a, dias_b, inicio_b, fin_b):
+        """True si dos bloques comparten algún día y sus horas se enciman"""
+        if not set(dias_a) & set(dias_b):
+            return False
+        inicio_a, fin_a = HorarioUtils.minutos(inicio_a), HorarioUtils.minutos(fin_a)
+        inicio_b, fin_b = HorarioUtils.minutos(inicio_b), HorarioUtils.minutos(fin_b)
+        if None in (inicio_a, fin_a, inicio_b, fin_b):
+            return False
+        return inicio_a < fin_b and inicio_b < fin_a
+
+    # ------------------------------------------------
+    # Horario semanal por usuario (cacheado)
+    # ------------------------------------------------
+
+    @staticmethod
+    def llave_horario(user_id):
+        # Con el periodo en la llave, el cambio de semestre no sirve horarios viejos
+        return "horario:" + PeriodoUtils.actual() + ":" + str(user_id)
+
+    @staticmethod
+    def invalidar_horarios(user_ids):
+        # Tras el commit: si se borra antes, otra petición puede volver a
+        # cachear el horario viejo mientras la transacción sigue abierta
+        llaves = [HorarioUtils.llave_horario(u) for u in set(user_ids) if u]
+        if llaves:
+            transaction.on_commit(lambda: cache.delete_many(llaves), robust=True)
+
+    @staticmethod
+    def horario_usuario(user):
+        """Rejilla semanal {dia: [bloques]} de un usuario (alumno o maestro).
+
+        Solo consulta las materias del usuario, así que el costo no depende
+        del tamaño del catálogo. El resultado vive en caché hasta que
+        cambia alguna de sus materias o inscripciones (en los demás procesos,
+        sin caché compartida, hasta HORARIO_CACHE_SEGUNDOS)."""
+        llave = HorarioUtils.llave_horario(user.id)
+        horario = cache.get(llave)
+        if horario is None:
+            horario = HorarioUtils.construir_horario(user)
+            cache.set(llave, horario, settings.HORARIO_CACHE_SEGUNDOS)
+        return horario
+
+    @staticmethod
+    def construir_horario(user):
+        from control_escolar_desit_api.models import Materias, Inscripciones
+
+        periodo = PeriodoUtils.actual()
+        campos = ("id", "nrc", "nombre", "seccion", "dias", "hora_inicio", "hora_fin", "salon", "creditos")
+        como_maestro = Materias.objects.filter(profesor__user_id=user.id, periodo=periodo).values(*campos)
+        como_alumno = (
+            Inscripciones.objects.filter(alumno__user_id=user.id, materia__periodo=periodo)
+            .values("estado", *["materia__" + c for c in campos])
+        )
+
+        bloques = []
+        for materia in como_maestro:
+            bloques.append((materia, "maestro"))
+        for inscripcion in como_alumno:
+            materia = {c: inscripcion["materia__" + c] for c in campos}
+            bloques.append((materia, inscripcion["estado"]))
+
+        semana = {dia: [] for dia in DIAS_SEMANA}
+        for materia, rol in bloques:
+            for dia in HorarioUtils.dias_materia(materia["dias"]):
+                semana[dia].append({
+                    "materia": materia["id"],
+                    "nrc": materia["nrc"],
+                    "nombre": materia["nombre"],
+                    "seccion": materia["seccion"],
+                    "hora_inicio": materia["hora_inicio"].strftime("%H:%M") if materia["hora_inicio"] else None,
+                    "hora_fin": materia["hora_fin"].strftime("%H:%M") if materia["hora_fin"] else None,
+                    "salon": materia["salon"],
+                    "creditos": materia["creditos"],
+                    "tipo": rol,
+                })
+        for dia in semana:
+            semana[dia].sort(key=lambda b: b["hora_inicio"] or "")
+        return semana
@@ -0,0 +1,146 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from control_escolar_desit_api.models import Alumnos, Materias, Inscripciones
+from control_escolar_desit_api.horario_utils import HorarioUtils
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+
+class InscripcionError(Exception):
+    """Error de negocio al inscribir (créditos, choque de horario, duplicado)"""
+    pass
+
+class InscripcionesUtils:
+
+    @staticmethod
+    def inscribir(alumno_id, materia_id):
+        """Inscribe a un alumno en una materia o lo manda a lista de espera.
+
+        El lugar se aparta con un UPDATE condicional sobre el contador
+        (inscritos < cupo), así dos peticiones simultáneas nunca pueden
+        tomar el mismo lugar aunque lleguen miles al mismo NRC.
+        Solo se bloquea la fila del alumno para serializar sus propias
+        peticiones (límite de créditos y choques de horario)."""
+        with transaction.atomic():
+            alumno = Alumnos.objects.select_for_update().filter(id=alumno_id).first()
+            if alumno is None:
+                raise InscripcionError("El alumno no existe")
+            materia = Materias.objects.filter(id=materia_id).first()
+            if materia is None:
+                raise InscripcionError("La materia no existe")
+            if materia.periodo != PeriodoUtils.actual():
+                raise InscripcionError("La materia no es del periodo actual")
+
+            # Créditos y choques solo cuentan contra el periodo en curso
+            actuales = list(
+                Inscripciones.objects.filter(alumno_id=alumno_id, materia__periodo=materia.periodo)
+                .select_related("materia")
+            )
+            if any(i.materia_id == materia.id for i in actuales):
+                raise InscripcionError("El alumno ya está inscrito en esta materia")
+
+            # Límite de créditos
+            creditos = sum(i.materia.creditos for i in actuales) + materia.creditos
+            if creditos > settings.MAX_CREDITOS_ALUMNO:
+                raise InscripcionError("Se excede el límite de créditos (" + str(settings.MAX_CREDITOS_ALUMNO) + ")")
+
+            # Choques de horario
+            dias = HorarioUtils.dias_materia(materia.dias)
+            for inscripcion in actuales:
+                otra = inscripcion.materia
+                if HorarioUtils.se_traslapan(dias, materia.hora_inicio, materia.hora_fin,
+                                             HorarioUtils.dias_materia(otra.dias), otra.hora_inicio, otra.hora_fin):
+                    raise InscripcionError("Choque de horario con " + otra.nombre + " (NRC " + otra.nrc + ")")
+
+            # Apartar lugar de forma atómica
+            apartado = Materias.objects.filter(id=materia.id, inscritos__lt=F("cupo")).update(inscritos=F("inscritos") + 1, update=timezone.now())
+            estado = Inscripciones.INSCRITO if apartado else Inscripciones.ESPERA
+
+            try:
+                with transaction.atomic():
+                    inscripcion = Inscripciones.objects.create(alumno_id=alumno_id, materia_id=materia.id, estado=estado)
+            except IntegrityError:
+                # Otra petición del mismo alumno ganó la carrera; al salir del
+                # atomic con excepción también se revierte el contador
+                raise InscripcionError("El alumno ya está inscrito en esta materia")
+
+            return inscripcion
+
+    @staticmethod
+    def dar_de_baja(inscripcion_id):
+        """Elimina la inscripción; si liberaba un lugar se lo pasa al primero en espera.
+
+        Regresa la lista de inscripciones promovidas."""
+        with transaction.atomic():
+            inscripcion = Inscripciones.objects.select_for_update().filter(id=inscripcion_id).first()
+            if inscripcion is None:
+                raise InscripcionError("La inscripción no existe")
+            liberaba_lugar = inscripcion.estado == Inscripciones.INSCRITO
+            # El post_delete libera los lugares de las bajas en cascada; esta ya se libera aquí
+            inscripcion._lugar_liberado = True
+            inscripcion.delete()
+
+            if not liberaba_lugar:
+                return []
+            return InscripcionesUtils.liberar_lugar(inscripcion.materia_id)
+
+    @staticmethod
+    def liberar_lugar(materia_id):
+        """Devuelve un lugar al contador y se lo pasa al primero en espera"""
+        with transaction.atomic():
+            Materias.objects.filter(id=materia_id).update(inscritos=F("inscritos") - 1, update=timezone.now())
+            return InscripcionesUtils.promover_espera(materia_id)
+
+    @staticmethod
+    def promover_espera(materia_id):
+        """Pasa alumnos de la lista de espera a inscritos mientras haya cupo.
+
+        Se usa al dar de baja y cuando se aumenta el cupo de la materia."""
+        promovidas = []
+        with transaction.atomic():
+            while True:
+                siguiente = (
+                    Inscripciones.objects.select_for_update(skip_locked=True)
+                    .filter(materia_id=materia_id, estado=Inscripciones.ESPERA)
+                    .order_by("id")
+                    .first()
+                )
+                if siguiente is None:
+                    break
+                apartado = Materias.objects.filter(id=materia_id, inscritos__lt=F("cupo")).update(inscritos=F("inscritos") + 1, update=timezone.now())
+                if not apartado:
+                    break
+                siguiente.estado = Inscripciones.INSCRITO
+                siguiente.save(update_fields=["estado", "update"])
+                promovidas.append(siguiente)
+        return promovidas
+
+    @staticmethod
+    def posicion_espera(inscripcion):
+        """Lugar (1..n) en la lista de espera de su materia"""
+        if inscripcion.estado != Inscripciones.ESPERA:
+            return None
+        return Inscripciones.objects.filter(
+            materia_id=inscripcion.materia_id, estado=Inscripciones.ESPERA, id__lte=inscripcion.id
+        ).count()
+
+    @staticmethod
+    def posiciones_espera(inscripciones):
+        """{inscripcion_id: lugar} de todas las que están en espera, en una sola
+        consulta (un COUNT condicional por inscripción) en vez de una por fila"""
+        en_espera = [i for i in inscripciones if i.estado == Inscripciones.ESPERA]
+        if not en_espera:
+            return {}
+        conteos = Inscripciones.objects.filter(
+            estado=Inscripciones.ESPERA, materia_id__in={i.materia_id for i in en_espera}
+        ).aggregate(**{
+            "i%d" % i.id: Count("id", filter=Q(materia_id=i.materia_id, id__lte=i.id)) for i in en_espera
+        })
+        return {i.id: conteos["i%d" % i.id] for i in en_espera}
+
+    @staticmethod
+    def creditos_alumno(alumno_id):
+        total = Inscripciones.objects.filter(
+            alumno_id=alumno_id, materia__periodo=PeriodoUtils.actual()
+        ).aggregate(total=Sum("materia__creditos"))["total"]
+        return total or 0
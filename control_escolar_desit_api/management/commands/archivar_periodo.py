@@ -0,0 +1,99 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from control_escolar_desit_api.models import (
+    Materias, Inscripciones, Calificaciones, Eliminaciones, Auditoria,
+    MateriasArchivo, InscripcionesArchivo, CalificacionesArchivo,
+)
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+from control_escolar_desit_api.asistencias_utils import AsistenciasUtils
+from control_escolar_desit_api.signals import archivando
+from control_escolar_desit_api import auditoria
+
+CAMPOS_MATERIA = (
+    "id", "periodo", "nrc", "nombre", "seccion", "dias", "hora_inicio", "hora_fin", "salon",
+    "programa_educativo", "creditos", "profesor_id", "cupo", "inscritos", "creation", "update",
+)
+CAMPOS_INSCRIPCION = ("id", "alumno_id", "materia_id", "estado", "creation", "update")
+CAMPOS_CALIFICACION = ("id", "alumno_id", "materia_id", "calificacion", "capturada_por_id", "creation", "update")
+
+class Command(BaseCommand):
+    help = (
+        "Mueve las materias (con sus inscripciones y calificaciones) de un periodo cerrado a las tablas de archivo, "
+        "por lotes, para que las tablas vivas solo carguen con los periodos vigentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("periodo", help="Periodo a archivar (AAAA-N)")
+        parser.add_argument("--lote", type=int, default=settings.ARCHIVO_LOTE, help="Materias por transacción")
+        parser.add_argument("--dry-run", action="store_true", help="Solo cuenta lo que se movería")
+
+    def handle(self, *args, **options):
+        periodo, lote = options["periodo"], options["lote"]
+        if not PeriodoUtils.valido(periodo):
+            raise CommandError("Periodo inválido (formato AAAA-N)")
+        if periodo == PeriodoUtils.actual():
+            raise CommandError("No se puede archivar el periodo actual (%s)" % periodo)
+        if lote < 1:
+            raise CommandError("--lote debe ser mayor que 0")
+
+        materias = Materias.objects.filter(periodo=periodo)
+        if options["dry_run"]:
+            self.stdout.write("%s: %d materias, %d inscripciones y %d calificaciones por archivar" % (
+                periodo, materias.count(), Inscripciones.objects.filter(materia__periodo=periodo).count(),
+                Calificaciones.objects.filter(materia__periodo=periodo).count(),
+            ))
+            return
+
+        inicio = time.perf_counter()
+        total_materias = total_inscripciones = total_calificaciones = 0
+        while True:
+            # Cada lote en su transacción: copiar y borrar juntos, nunca a medias
+            with transaction.atomic():
+                ids = list(materias.order_by("id").values_list("id", flat=True)[:lote])
+                if not ids:
+                    break
+                # De las asistencias solo se conservan los totales por materia;
+                # los check-ins se van con la materia (CASCADE)
+                asistencia = AsistenciasUtils.totales_por_materia(ids)
+                filas = Materias.objects.filter(id__in=ids).values(*CAMPOS_MATERIA)
+                MateriasArchivo.objects.bulk_create([
+                    MateriasArchivo(
+                        sesiones=asistencia.get(fila["id"], (0, 0))[0], asistencias=asistencia.get(fila["id"], (0, 0))[1], **fila
+                    ) for fila in filas
+                ], ignore_conflicts=True)
+                filas = Inscripciones.objects.filter(materia_id__in=ids).values(*CAMPOS_INSCRIPCION)
+                inscripciones = [InscripcionesArchivo(periodo=periodo, **fila) for fila in filas]
+                InscripcionesArchivo.objects.bulk_create(inscripciones, ignore_conflicts=True)
+                # Las calificaciones se llevan los créditos de su materia: el
+                # ResumenAcademico ya las cuenta y no cambia al archivarlas
+                creditos = dict(Materias.objects.filter(id__in=ids).values_list("id", "creditos"))
+                filas = Calificaciones.objects.filter(materia_id__in=ids).values(*CAMPOS_CALIFICACION)
+                calificaciones = [
+                    CalificacionesArchivo(periodo=periodo, creditos=creditos[fila["materia_id"]], **fila) for fila in filas
+                ]
+                CalificacionesArchivo.objects.bulk_create(calificaciones, ignore_conflicts=True)
+                # Sin señales en Calificaciones: un solo DELETE (y así deja de protegerlas)
+                Calificaciones.objects.filter(materia_id__in=ids).delete()
+                # Con archivando() las señales por objeto no publican bajas ni
+                # recalculan nada; los tombstones sí hacen falta para que los
+                # clientes de /cambios/ suelten las materias, y van en un INSERT
+                with archivando():
+                    Materias.objects.filter(id__in=ids).delete()
+                Eliminaciones.objects.bulk_create([Eliminaciones(entidad="materias", entidad_id=i) for i in ids])
+            total_materias += len(ids)
+            total_inscripciones += len(inscripciones)
+            total_calificaciones += len(calificaciones)
+            self.stdout.write("  %d materias archivadas..." % total_materias)
+
+        if total_materias:
+            auditoria.registrar("materias", 0, Auditoria.ARCHIVAR, {
+                "periodo": periodo, "materias": total_materias,
+                "inscripciones": total_inscripciones, "calificaciones": total_calificaciones,
+            })
+        self.stdout.write("%s: %d materias, %d inscripciones y %d calificaciones archivadas en %.1f s" % (
+            periodo, total_materias, total_inscripciones, total_calificaciones, time.perf_counter() - inicio
+        ))
@@ -0,0 +1,57 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from control_escolar_desit_api.asignacion_utils import AsignacionUtils, PATRONES_DEFAULT, FRANJAS_DEFAULT
+
+class Command(BaseCommand):
+    help = "Mide el tiempo del solver de asignación de salones/horarios con secciones sintéticas (sin BD)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--secciones", type=int, default=600)
+        parser.add_argument("--salones", type=int, default=45)
+        parser.add_argument("--profesores", type=int, default=180)
+        parser.add_argument("--segundos", type=float, default=30)
+        parser.add_argument("--semilla", type=int, default=7)
+        parser.add_argument("--proceso", action="store_true", help="Correr en el proceso auxiliar como lo hace la vista")
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options["semilla"])
+        salones = ["S-" + str(i) for i in range(options["salones"])]
+        secciones = []
+        for i in range(options["secciones"]):
+            secciones.append({
+                "id": i,
+                "profesor": rnd.randrange(options["profesores"]),
+                "duracion": rnd.choice([60, 90, 90, 120]),
+                # ~20% ya trae salón o días fijados por el coordinador
+                "salon": rnd.choice(salones) if rnd.random() < 0.1 else None,
+                "dias": rnd.choice(PATRONES_DEFAULT) if rnd.random() < 0.1 else None,
+                "hora_inicio": None,
+            })
+
+        resolver = AsignacionUtils.resolver_en_proceso if options["proceso"] else AsignacionUtils.resolver
+        inicio = time.perf_counter()
+        resultado = resolver(secciones, [], salones, FRANJAS_DEFAULT, PATRONES_DEFAULT, options["segundos"])
+        duracion = time.perf_counter() - inicio
+
+        # Verificación independiente de traslapes
+        vistos = {}
+        choques = 0
+        for sid, asignada in resultado["asignacion"].items():
+            seccion = secciones[int(sid)]
+            ini = int(asignada["hora_inicio"][:2]) * 60 + int(asignada["hora_inicio"][3:])
+            fin = int(asignada["hora_fin"][:2]) * 60 + int(asignada["hora_fin"][3:])
+            for dia in asignada["dias"]:
+                for llave in (("s", asignada["salon"], dia), ("p", seccion["profesor"], dia)):
+                    for o_ini, o_fin in vistos.get(llave, []):
+                        if ini < o_fin and o_ini < fin:
+                            choques += 1
+                    vistos.setdefault(llave, []).append((ini, fin))
+
+        self.stdout.write("Secciones: %d | Salones: %d | Profesores: %d" % (
+            len(secciones), len(salones), options["profesores"]))
+        self.stdout.write("Asignadas: %d | Sin asignar: %d | Tiempo agotado: %s" % (
+            len(resultado["asignacion"]), len(resultado["sin_asignar"]), resultado["tiempo_agotado"]))
+        self.stdout.write("Tiempo de solución: %.3fs | Traslapes detectados: %d" % (duracion, choques))
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from control_escolar_desit_api.tests.datos import sembrar
+
+# (ruta, campos del dropdown); cada una se mide completa y con ?fields=
+CASOS = [
+    ("/lista-alumnos/", "id,user.first_name,user.last_name"),
+    ("/lista-maestros/", "id,user.first_name,user.last_name"),
+    ("/lista-admins/", "id,user.first_name,user.last_name"),
+    ("/lista-materias/", "id,nrc,nombre"),
+]
+
+class Command(BaseCommand):
+    help = (
+        "Compara tamaño de respuesta y latencia de los listados completos contra ?fields= "
+        "con los campos de un dropdown, sobre una BD de prueba sembrada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=100, help="Registros sembrados y tamaño de página (máx. 100)")
+        parser.add_argument("--repeticiones", type=int, default=50)
+
+    def handle(self, *args, **options):
+        filas, repeticiones = options["filas"], options["repeticiones"]
+        if not 2 <= filas <= 100:
+            raise CommandError("--filas debe estar entre 2 y 100 (max_page_size)")
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        bases = runner.setup_databases()
+        try:
+            with transaction.atomic():
+                datos = sembrar(filas)
+                cliente = APIClient()
+                cliente.force_authenticate(datos["usuarios"]["administrador"])
+                for ruta, campos in CASOS:
+                    completa = self.medir(cliente, ruta, {"page_size": filas}, repeticiones)
+                    parcial = self.medir(cliente, ruta, {"page_size": filas, "fields": campos}, repeticiones)
+                    self.stdout.write("%s (%d filas)" % (ruta, filas))
+                    self.stdout.write("  %-42s %8d bytes  %7.2f ms" % ("completa", *completa))
+                    self.stdout.write("  %-42s %8d bytes  %7.2f ms   (%.0f%% del tamaño, %.1fx más rápida)" % (
+                        "fields=" + campos, *parcial, 100.0 * parcial[0] / completa[0], completa[1] / parcial[1],
+                    ))
+                transaction.set_rollback(True)
+        finally:
+            runner.teardown_databases(bases)
+            teardown_test_environment()
+
+    def medir(self, cliente, ruta, parametros, repeticiones):
+        """(bytes, ms por petición) de la respuesta JSON"""
+        respuesta = cliente.get(ruta, parametros)
+        if respuesta.status_code != 200:
+            raise CommandError("%s respondió %d: %s" % (ruta, respuesta.status_code, getattr(respuesta, "data", "")))
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            cliente.get(ruta, parametros)
+        return len(respuesta.content), (time.perf_counter() - inicio) * 1000 / repeticiones
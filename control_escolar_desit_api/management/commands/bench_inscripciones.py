@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections, DEFAULT_DB_ALIAS
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from control_escolar_desit_api.models import Alumnos, Materias, Inscripciones
+from control_escolar_desit_api.inscripciones_utils import InscripcionesUtils, InscripcionError
+
+class Command(BaseCommand):
+    help = ("Arnés de concurrencia para inscripciones: N alumnos intentan entrar al mismo NRC "
+            "en paralelo, verifica que no haya sobrecupo y reporta throughput. Corre sobre una "
+            "BD de prueba que se crea y se destruye; nunca toca la BD configurada.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alumnos", type=int, default=500)
+        parser.add_argument("--cupo", type=int, default=40)
+        parser.add_argument("--hilos", type=int, default=16)
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite":
+            raise CommandError("SQLite serializa las escrituras; corre el arnés contra PostgreSQL o MySQL")
+
+        # Sin TestCase: los hilos abren sus propias conexiones y deben ver lo confirmado
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        bases = runner.setup_databases()
+        try:
+            self.correr(options)
+        finally:
+            close_old_connections()
+            runner.teardown_databases(bases)
+            teardown_test_environment()
+
+    def correr(self, options):
+        prefijo = "bench-insc-" + str(int(time.time()))
+        materia = Materias.objects.create(nrc=str(int(time.time()))[-5:], nombre=prefijo, cupo=options["cupo"], creditos=1)
+        usuarios = User.objects.bulk_create([
+            User(username=prefijo + "-" + str(i), email=prefijo + "-" + str(i) + "@bench.local", is_active=1)
+            for i in range(options["alumnos"])
+        ])
+        if not usuarios[0].pk:
+            usuarios = list(User.objects.filter(username__startswith=prefijo).order_by("id"))
+        alumnos = Alumnos.objects.bulk_create([Alumnos(user=u) for u in usuarios])
+        if not alumnos[0].pk:
+            alumnos = list(Alumnos.objects.filter(user__username__startswith=prefijo).order_by("id"))
+
+        resultados = {"inscrito": 0, "espera": 0, "error": 0}
+        candado = threading.Lock()
+        conexiones = set()
+
+        def inscribir(alumno_id):
+            try:
+                inscripcion = InscripcionesUtils.inscribir(alumno_id, materia.id)
+                llave = inscripcion.estado
+            except InscripcionError:
+                llave = "error"
+            finally:
+                close_old_connections()
+            with candado:
+                resultados[llave] += 1
+                conexion = connections[DEFAULT_DB_ALIAS]
+                if conexion not in conexiones:
+                    conexion.inc_thread_sharing()
+                    conexiones.add(conexion)
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["hilos"]) as pool:
+            list(pool.map(inscribir, [a.id for a in alumnos]))
+        duracion = time.perf_counter() - inicio
+        # Con CONN_MAX_AGE los hilos dejan conexiones abiertas que impedirían borrar la BD de prueba
+        for conexion in conexiones:
+            conexion.close()
+
+        materia.refresh_from_db()
+        inscritos_reales = Inscripciones.objects.filter(materia=materia, estado=Inscripciones.INSCRITO).count()
+
+        self.stdout.write("Peticiones: %d en %.2fs (%.1f req/s, %d hilos)" % (
+            len(alumnos), duracion, len(alumnos) / duracion, options["hilos"]))
+        self.stdout.write("Inscritos: %d | Lista de espera: %d | Errores: %d" % (
+            resultados["inscrito"], resultados["espera"], resultados["error"]))
+        self.stdout.write("Contador en Materias: %d / cupo %d | Filas inscritas: %d" % (
+            materia.inscritos, materia.cupo, inscritos_reales))
+
+        ok = (materia.inscritos == inscritos_reales
+              and inscritos_reales <= materia.cupo
+              and inscritos_reales == min(materia.cupo, len(alumnos)))
+
+        if not ok:
+            raise CommandError("Sobrecupo o contador inconsistente")
+        self.stdout.write(self.style.SUCCESS("Sin sobrecupo"))
@@ -0,0 +1,57 @@
+import datetime
+import json
+import time
+from decimal import Decimal
+
+import msgpack
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from control_escolar_desit_api.models import Alumnos
+from control_escolar_desit_api.renderers import OrjsonRenderer, MsgpackRenderer
+from control_escolar_desit_api.serializers import AlumnoSerializer
+
+class Command(BaseCommand):
+    help = "Compara tamaño y tiempo de codificación de JSONRenderer, orjson y MessagePack para una página de /lista-alumnos/."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=100)
+        parser.add_argument("--repeticiones", type=int, default=200)
+
+    def handle(self, *args, **options):
+        # Página sintética con la misma forma que la respuesta paginada (sin BD)
+        ahora = timezone.now()
+        alumnos = []
+        for i in range(options["filas"]):
+            user = User(id=i + 1, first_name="Nombre%d" % i, last_name="Apellido Ñúñez %d" % i, email="alumno%d@correo.mx" % i)
+            alumnos.append(Alumnos(
+                id=i + 1, user=user, matricula="2021%05d" % i, curp="GOML000101HPLNRSA%d" % (i % 10),
+                rfc="GOML000101AB%d" % (i % 10), fecha_nacimiento=ahora - datetime.timedelta(days=7000 + i),
+                edad=19, telefono="2221234567", ocupacion="Estudiante", creation=ahora, update=ahora,
+            ))
+        pagina = {
+            "count": options["filas"], "next": None, "previous": None,
+            "results": AlumnoSerializer(alumnos, many=True).data,
+            # Valores que no pasan por el serializer
+            "generado": ahora, "hora": datetime.time(10, 30, 15, 123456), "promedio": Decimal("8.75"),
+        }
+
+        renderers = [("JSONRenderer (json)", JSONRenderer()), ("OrjsonRenderer", OrjsonRenderer()), ("MsgpackRenderer", MsgpackRenderer())]
+        salidas = {}
+        for nombre, renderer in renderers:
+            salida = renderer.render(pagina)
+            inicio = time.perf_counter()
+            for _ in range(options["repeticiones"]):
+                renderer.render(pagina)
+            ms = (time.perf_counter() - inicio) * 1000 / options["repeticiones"]
+            salidas[nombre] = salida
+            self.stdout.write("%-22s %8d bytes  %8.3f ms/página" % (nombre, len(salida), ms))
+
+        referencia = json.loads(salidas["JSONRenderer (json)"])
+        if json.loads(salidas["OrjsonRenderer"]) != referencia:
+            raise CommandError("orjson no produce los mismos valores que JSONRenderer")
+        if msgpack.unpackb(salidas["MsgpackRenderer"], raw=False) != referencia:
+            raise CommandError("MessagePack no produce los mismos valores que JSONRenderer")
+        self.stdout.write(self.style.SUCCESS("Mismos valores en los tres formatos"))
@@ -0,0 +1,57 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from control_escolar_desit_api.validacion_utils import ValidacionUtils, ENTIDADES_CURP
+
+CONSONANTES = "BCDFGHJKLMNPQRSTVWXYZ"
+
+def _curp(azar):
+    base = (
+        azar.choice(string.ascii_uppercase) + azar.choice("AEIOU") + "".join(azar.choices(string.ascii_uppercase, k=2))
+        + "%02d%02d%02d" % (azar.randint(0, 99), azar.randint(1, 12), azar.randint(1, 28))
+        + azar.choice("HM") + azar.choice(sorted(ENTIDADES_CURP))
+        + "".join(azar.choices(CONSONANTES, k=3)) + azar.choice(string.digits + string.ascii_uppercase)
+    )
+    return base + ValidacionUtils.verificador_curp(base)
+
+def _rfc(curp, azar):
+    base = curp[:10] + "".join(azar.choices(string.ascii_uppercase + string.digits, k=2))
+    return base + ValidacionUtils.verificador_rfc(base)
+
+class Command(BaseCommand):
+    help = "Mide el throughput de ValidacionUtils.validar_lote con filas sintéticas (algunas inválidas y repetidas)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=50000)
+        parser.add_argument("--sin-bd", action="store_true", help="Omitir la búsqueda de duplicados en la BD")
+        parser.add_argument("--semilla", type=int, default=7)
+
+    def handle(self, *args, **options):
+        azar = random.Random(options["semilla"])
+        filas = []
+        for i in range(options["filas"]):
+            curp = _curp(azar)
+            filas.append({
+                "matricula": "2%08d" % i,
+                "curp": curp,
+                "rfc": _rfc(curp, azar),
+                "email": "alumno%d@bench.mx" % i,
+            })
+        # ~2% con el verificador alterado y ~1% repetidas
+        for fila in azar.sample(filas, len(filas) // 50):
+            fila["curp"] = fila["curp"][:17] + str((int(fila["curp"][17]) + 1) % 10)
+        for fila in azar.sample(filas, len(filas) // 100):
+            fila["matricula"] = filas[0]["matricula"]
+
+        inicio = time.perf_counter()
+        diagnostico = ValidacionUtils.validar_lote(filas, contra_bd=not options["sin_bd"])
+        segundos = time.perf_counter() - inicio
+
+        invalidas = sum(1 for d in diagnostico if not d["valido"])
+        self.stdout.write("Filas: %d  inválidas: %d" % (len(filas), invalidas))
+        self.stdout.write("Tiempo: %.1f ms  (%.0f filas/s)%s" % (
+            segundos * 1000, len(filas) / segundos, "" if options["sin_bd"] else "  incluye duplicados contra BD"
+        ))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from control_escolar_desit_api.models import BearerTokenAuthentication
+
+class Command(BaseCommand):
+    help = "Elimina los tokens vencidos en lotes para no bloquear la tabla (correr desde cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=1000)
+        parser.add_argument("--pausa", type=float, default=0.1, help="Segundos entre lotes")
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - BearerTokenAuthentication.vigencia()
+        total = 0
+        while True:
+            llaves = list(
+                Token.objects.filter(created__lt=limite).values_list("key", flat=True)[:options["lote"]]
+            )
+            if not llaves:
+                break
+            total += Token.objects.filter(key__in=llaves, created__lt=limite).delete()[0]
+            time.sleep(options["pausa"])
+        self.stdout.write("Tokens vencidos eliminados: %d" % total)
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Se corre en un proceso nuevo para medir un arranque en frío real
+SCRIPT = """
+import json, os, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t_setup = time.perf_counter()
+tiempos = {"django_setup": (t_setup - t0) * 1000}
+if %(warmup)r:
+    from control_escolar_desit_api.warmup import calentar
+    tiempos["warmup_pasos"] = calentar()
+    tiempos["warmup"] = (time.perf_counter() - t_setup) * 1000
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+# Autenticado: una petición anónima se rechaza con 403 antes de llegar a la vista
+usuario = User.objects.filter(**%(usuario)r).order_by("id").first()
+if usuario is None:
+    sys.stdout.write("@@" + json.dumps({"error": "No hay usuario activo para autenticar la petición"}))
+    sys.exit()
+cliente = APIClient(HTTP_HOST=%(host)r)
+cliente.force_authenticate(usuario)
+inicio = time.perf_counter()
+respuesta = cliente.get(%(ruta)r)
+tiempos["primera_peticion"] = (time.perf_counter() - inicio) * 1000
+inicio = time.perf_counter()
+segunda = cliente.get(%(ruta)r)
+tiempos["segunda_peticion"] = (time.perf_counter() - inicio) * 1000
+tiempos["status"] = [respuesta.status_code, segunda.status_code]
+sys.stdout.write("@@" + json.dumps(tiempos))
+"""
+
+class Command(BaseCommand):
+    help = ("Perfil de arranque en frío: desglose de tiempos de import (-X importtime) "
+            "y latencia de la primera petición con y sin warmup.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ruta", default="/lista-materias/")
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument("--usuario", help="Email del usuario que hace la petición; por omisión el primer administrador activo")
+
+    def _correr(self, ruta, warmup, usuario):
+        codigo = SCRIPT % {"warmup": warmup, "ruta": ruta, "host": settings.ALLOWED_HOSTS[0], "usuario": usuario}
+        proceso = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", codigo],
+            capture_output=True, text=True, env=dict(os.environ),
+        )
+        if "@@" not in proceso.stdout:
+            raise CommandError(proceso.stderr[-2000:])
+        tiempos = json.loads(proceso.stdout.split("@@")[-1])
+        if "error" in tiempos:
+            raise CommandError(tiempos["error"])
+        # Solo vale si la vista corrió completa (consultas, serializer y renderer)
+        if tiempos["status"] != [200, 200]:
+            raise CommandError("%s respondió %s; se esperaba 200" % (ruta, tiempos["status"]))
+        return tiempos, proceso.stderr
+
+    def handle(self, *args, **options):
+        usuario = {"is_active": True}
+        if options["usuario"]:
+            usuario["email"] = options["usuario"]
+        else:
+            usuario["groups__name"] = "administrador"
+        frio, importtime = self._correr(options["ruta"], False, usuario)
+        caliente, _ = self._correr(options["ruta"], True, usuario)
+
+        # "import time: self [us] | cumulative | imported package"
+        por_paquete, raices = {}, []
+        for linea in importtime.splitlines():
+            if not linea.startswith("import time:") or "self [us]" in linea:
+                continue
+            propio, acumulado, nombre = linea[len("import time:"):].split("|")
+            paquete = nombre.strip().split(".")[0]
+            por_paquete[paquete] = por_paquete.get(paquete, 0) + int(propio)
+            if not nombre[1:].startswith(" "):
+                raices.append((int(acumulado), nombre.strip()))
+
+        self.stdout.write("== Tiempo de import propio por paquete (ms) ==")
+        for paquete, us in sorted(por_paquete.items(), key=lambda i: -i[1])[:options["top"]]:
+            self.stdout.write("  %-35s %8.1f" % (paquete, us / 1000))
+        self.stdout.write("== Imports de primer nivel más caros, acumulado (ms) ==")
+        for us, nombre in sorted(raices, reverse=True)[:options["top"]]:
+            self.stdout.write("  %-35s %8.1f" % (nombre, us / 1000))
+
+        self.stdout.write("== Primera petición a %s (status %s) ==" % (options["ruta"], frio["status"][0]))
+        self.stdout.write("  django.setup():              %8.1f ms" % frio["django_setup"])
+        self.stdout.write("  Sin warmup, 1a petición:     %8.1f ms" % frio["primera_peticion"])
+        self.stdout.write("  Sin warmup, 2a petición:     %8.1f ms" % frio["segunda_peticion"])
+        self.stdout.write("  Warmup (%s): %.1f ms" % (
+            ", ".join("%s %.1f" % (k, v) for k, v in caliente["warmup_pasos"].items()), caliente["warmup"]))
+        self.stdout.write("  Con warmup, 1a petición:     %8.1f ms" % caliente["primera_peticion"])
+        ganancia = frio["primera_peticion"] - caliente["primera_peticion"]
+        self.stdout.write(self.style.SUCCESS("  Ganancia en la 1a petición: %.1f ms" % ganancia))
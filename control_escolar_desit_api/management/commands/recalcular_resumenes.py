@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from control_escolar_desit_api.models import Alumnos
+from control_escolar_desit_api.calificaciones_utils import CalificacionesUtils
+
+class Command(BaseCommand):
+    help = (
+        "Rehace desde cero los ResumenAcademico (promedio y créditos) a partir de las calificaciones "
+        "vivas y archivadas. La captura los ajusta por diferencia; esto es para verificar o reparar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("alumnos", nargs="*", type=int, help="Ids de alumno; todos si se omite")
+        parser.add_argument("--lote", type=int, default=settings.CALIFICACIONES_LOTE, help="Alumnos por transacción")
+
+    def handle(self, *args, **options):
+        ids = options["alumnos"] or list(Alumnos.objects.order_by("id").values_list("id", flat=True))
+        lote = max(1, options["lote"])
+        inicio, total = time.perf_counter(), 0
+        for i in range(0, len(ids), lote):
+            total += CalificacionesUtils.recalcular(ids[i:i + lote])
+        self.stdout.write("%d resúmenes recalculados en %.1f s" % (total, time.perf_counter() - inicio))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from control_escolar_desit_api.reportes_utils import ReportesUtils, REPORTES
+
+class Command(BaseCommand):
+    help = "Reconstruye los reportes materializados de carga académica (correr desde cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("nombres", nargs="*", help="Reportes a refrescar; todos si se omite: " + ", ".join(REPORTES))
+
+    def handle(self, *args, **options):
+        desconocidos = [n for n in options["nombres"] if n not in REPORTES]
+        if desconocidos:
+            raise CommandError("Reportes desconocidos: " + ", ".join(desconocidos))
+        for nombre in options["nombres"] or REPORTES:
+            inicio = time.perf_counter()
+            ReportesUtils.refrescar([nombre])
+            self.stdout.write("%s: %.1f ms" % (nombre, (time.perf_counter() - inicio) * 1000))
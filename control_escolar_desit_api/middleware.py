@@ -0,0 +1,134 @@
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from control_escolar_desit_api.auditoria import peticion_actual
+from control_escolar_desit_api.perfiles_utils import PerfilesUtils
+
+logger = logging.getLogger(__name__)
+
+
+class UsuarioActualMiddleware:
+    """Deja la petición en un contextvar para saber quién hizo cada cambio"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = peticion_actual.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            peticion_actual.reset(token)
+
+
+class LimiteEsperaMiddleware:
+    """Descarta con 503 las peticiones que esperaron en la cola del proxy
+    más que su presupuesto: para entonces el cliente ya se rindió y hacer
+    todo el trabajo solo alarga la cola (p. ej. en oleadas de login).
+
+    El proxy marca la llegada en DEADLINE_ENCABEZADO ('t=<epoch>' en s, ms o
+    µs, como X-Request-Start de nginx/Heroku). El presupuesto sale del primer
+    prefijo de DEADLINE_RUTAS que coincide con la ruta o de DEADLINE_DEFAULT_MS;
+    0 = sin límite. Los contadores son por proceso (ver /metricas-carga/)."""
+
+    _lock = threading.Lock()
+    contadores = {}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def inicio_en_cola(valor):
+        """Epoch en segundos a partir de 't=1690000000.123' / ms / µs"""
+        try:
+            numero = float(valor.strip().removeprefix("t="))
+        except (AttributeError, ValueError):
+            return None
+        if numero > 1e14:
+            return numero / 1e6
+        if numero > 1e11:
+            return numero / 1e3
+        return numero
+
+    @staticmethod
+    def presupuesto(ruta):
+        for prefijo, milisegundos in settings.DEADLINE_RUTAS:
+            if ruta.startswith(prefijo):
+                return prefijo, milisegundos
+        return "*", settings.DEADLINE_DEFAULT_MS
+
+    @classmethod
+    def contar(cls, grupo, resultado, espera_ms):
+        with cls._lock:
+            fila = cls.contadores.setdefault(grupo, {
+                "servidas": 0, "descartadas": 0, "sin_encabezado": 0, "espera_total_ms": 0.0, "espera_max_ms": 0.0,
+            })
+            fila[resultado] += 1
+            if espera_ms is not None:
+                fila["espera_total_ms"] += espera_ms
+                fila["espera_max_ms"] = max(fila["espera_max_ms"], espera_ms)
+
+    @classmethod
+    def resumen(cls):
+        with cls._lock:
+            resumen = {}
+            for grupo, fila in cls.contadores.items():
+                medidas = fila["servidas"] + fila["descartadas"]
+                resumen[grupo] = dict(
+                    fila,
+                    espera_total_ms=round(fila["espera_total_ms"], 1),
+                    espera_max_ms=round(fila["espera_max_ms"], 1),
+                    espera_promedio_ms=round(fila["espera_total_ms"] / medidas, 1) if medidas else 0.0,
+                )
+            return resumen
+
+    def __call__(self, request):
+        grupo, limite_ms = self.presupuesto(request.path)
+        inicio = self.inicio_en_cola(request.META.get(settings.DEADLINE_ENCABEZADO))
+        if inicio is None:
+            self.contar(grupo, "sin_encabezado", None)
+            return self.get_response(request)
+
+        # Relojes desfasados entre proxy y worker: una espera negativa cuenta como 0
+        espera_ms = max((time.time() - inicio) * 1000, 0.0)
+        if limite_ms and espera_ms > limite_ms:
+            self.contar(grupo, "descartadas", espera_ms)
+            logger.warning("Petición descartada: %s esperó %.0f ms (límite %d ms)", request.path, espera_ms, limite_ms)
+            respuesta = JsonResponse({"message": "Servidor saturado, intente de nuevo"}, status=503)
+            respuesta["Retry-After"] = str(settings.DEADLINE_RETRY_AFTER)
+            return respuesta
+
+        self.contar(grupo, "servidas", espera_ms)
+        return self.get_response(request)
+
+
+class PerfiladorMiddleware:
+    """Perfilado bajo demanda (cProfile + traza SQL) de peticiones sueltas.
+
+    Se activa con el header 'X-Perfilar: 1' enviado con el token de un
+    administrador, o al azar con probabilidad PERFIL_MUESTREO. Apagado solo
+    cuesta buscar un header y comparar un número. Los perfiles quedan en
+    PERFIL_DIRECTORIO (con rotación) y se descargan desde /perfiles/."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def es_admin(request):
+        from control_escolar_desit_api.models import BearerTokenAuthentication
+        try:
+            credenciales = BearerTokenAuthentication().authenticate(request)
+        except Exception:
+            return False
+        return credenciales is not None and credenciales[0].groups.filter(name="administrador").exists()
+
+    def __call__(self, request):
+        solicitado = request.META.get("HTTP_X_PERFILAR") == "1" and self.es_admin(request)
+        if solicitado or (settings.PERFIL_MUESTREO and random.random() < settings.PERFIL_MUESTREO):
+            return PerfilesUtils.perfilar(request, self.get_response)
+        return self.get_response(request)
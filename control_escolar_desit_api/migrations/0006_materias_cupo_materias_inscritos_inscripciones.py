@@ -0,0 +1,39 @@
+# Generated by Django 5.0.2 on 2026-10-19 12:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control_escolar_desit_api', '0005_materias_creditos_materias_profesor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='materias',
+            name='cupo',
+            field=models.IntegerField(default=30),
+        ),
+        migrations.AddField(
+            model_name='materias',
+            name='inscritos',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='Inscripciones',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('estado', models.CharField(choices=[('inscrito', 'Inscrito'), ('espera', 'Lista de espera')], default='inscrito', max_length=10)),
+                ('creation', models.DateTimeField(auto_now_add=True, null=True)),
+                ('update', models.DateTimeField(blank=True, null=True)),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='control_escolar_desit_api.alumnos')),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='control_escolar_desit_api.materias')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['materia', 'estado', 'id'], name='control_esc_materia_6e14ad_idx')],
+                'unique_together': {('alumno', 'materia')},
+            },
+        ),
+    ]
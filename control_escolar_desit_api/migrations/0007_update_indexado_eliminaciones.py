@@ -0,0 +1,61 @@
+# Generated by Django 5.0.2 on 2026-10-19 12:51
+
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Coalesce, Now
+
+
+def rellenar_update(apps, schema_editor):
+    # Las filas viejas nunca tuvieron 'update'; se toma la fecha de creación
+    # para que entren ordenadas en la primera sincronización incremental
+    for modelo in ("Administradores", "Alumnos", "Maestros", "Materias", "Inscripciones"):
+        Modelo = apps.get_model("control_escolar_desit_api", modelo)
+        Modelo.objects.filter(update__isnull=True).update(update=Coalesce(F("creation"), Now()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control_escolar_desit_api', '0006_materias_cupo_materias_inscritos_inscripciones'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='administradores',
+            name='update',
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='alumnos',
+            name='update',
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='inscripciones',
+            name='update',
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='maestros',
+            name='update',
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='materias',
+            name='update',
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Eliminaciones',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entidad', models.CharField(max_length=30)),
+                ('entidad_id', models.BigIntegerField()),
+                ('eliminado', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['entidad', 'id'], name='control_esc_entidad_3bdd52_idx'), models.Index(fields=['entidad', 'eliminado'], name='control_esc_entidad_5e7ba5_idx')],
+            },
+        ),
+        migrations.RunPython(rellenar_update, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.2 on 2026-10-19 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control_escolar_desit_api', '0007_update_indexado_eliminaciones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Auditoria',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entidad', models.CharField(max_length=30)),
+                ('entidad_id', models.BigIntegerField()),
+                ('accion', models.CharField(max_length=10)),
+                ('cambios', models.JSONField(blank=True, null=True)),
+                ('usuario_id', models.BigIntegerField(blank=True, null=True)),
+                ('fecha', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['entidad', 'entidad_id', 'fecha'], name='control_esc_entidad_189146_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.2 on 2026-10-19 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control_escolar_desit_api', '0008_auditoria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReporteSnapshot',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('datos', models.JSONField(default=list)),
+                ('generado', models.DateTimeField()),
+            ],
+        ),
+    ]
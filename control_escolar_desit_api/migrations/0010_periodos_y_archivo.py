@@ -0,0 +1,74 @@
+# Generated by Django 5.0.2 on 2026-10-19 13:10
+
+import control_escolar_desit_api.periodos_utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control_escolar_desit_api', '0009_reportesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InscripcionesArchivo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('periodo', models.CharField(max_length=6)),
+                ('alumno_id', models.BigIntegerField()),
+                ('materia_id', models.BigIntegerField()),
+                ('estado', models.CharField(max_length=10)),
+                ('creation', models.DateTimeField(blank=True, null=True)),
+                ('update', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MateriasArchivo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('periodo', models.CharField(max_length=6)),
+                ('nrc', models.CharField(max_length=5)),
+                ('nombre', models.CharField(max_length=255)),
+                ('seccion', models.CharField(blank=True, max_length=5, null=True)),
+                ('dias', models.JSONField(blank=True, null=True)),
+                ('hora_inicio', models.TimeField(blank=True, null=True)),
+                ('hora_fin', models.TimeField(blank=True, null=True)),
+                ('salon', models.CharField(blank=True, max_length=255, null=True)),
+                ('programa_educativo', models.CharField(blank=True, max_length=255, null=True)),
+                ('creditos', models.IntegerField(default=1)),
+                ('profesor_id', models.BigIntegerField(blank=True, null=True)),
+                ('cupo', models.IntegerField(default=30)),
+                ('inscritos', models.IntegerField(default=0)),
+                ('creation', models.DateTimeField(blank=True, null=True)),
+                ('update', models.DateTimeField(blank=True, null=True)),
+                ('archivado', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='materias',
+            name='periodo',
+            field=models.CharField(default=control_escolar_desit_api.periodos_utils.PeriodoUtils.actual, max_length=6),
+        ),
+        migrations.AlterField(
+            model_name='materias',
+            name='nrc',
+            field=models.CharField(max_length=5),
+        ),
+        migrations.AddConstraint(
+            model_name='materias',
+            constraint=models.UniqueConstraint(fields=('periodo', 'nrc'), name='materia_nrc_unico_por_periodo'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcionesarchivo',
+            index=models.Index(fields=['alumno_id', 'periodo'], name='control_esc_alumno__8143d3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcionesarchivo',
+            index=models.Index(fields=['materia_id'], name='control_esc_materia_d3c763_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='materiasarchivo',
+            index=models.Index(fields=['periodo', 'nrc'], name='control_esc_periodo_fbc1b4_idx'),
+        ),
+    ]
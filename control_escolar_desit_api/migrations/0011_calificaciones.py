@@ -0,0 +1,61 @@
+# Generated by Django 5.0.2 on 2026-10-19 13:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control_escolar_desit_api', '0010_periodos_y_archivo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalificacionesArchivo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('periodo', models.CharField(max_length=6)),
+                ('alumno_id', models.BigIntegerField()),
+                ('materia_id', models.BigIntegerField()),
+                ('calificacion', models.DecimalField(decimal_places=1, max_digits=3)),
+                ('creditos', models.IntegerField(default=0)),
+                ('capturada_por_id', models.BigIntegerField(blank=True, null=True)),
+                ('creation', models.DateTimeField(blank=True, null=True)),
+                ('update', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['alumno_id', 'periodo'], name='control_esc_alumno__5e5cf8_idx'), models.Index(fields=['materia_id'], name='control_esc_materia_201c57_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenAcademico',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('materias', models.IntegerField(default=0)),
+                ('creditos_cursados', models.IntegerField(default=0)),
+                ('creditos_aprobados', models.IntegerField(default=0)),
+                ('puntos', models.DecimalField(decimal_places=1, default=0, max_digits=9)),
+                ('promedio', models.DecimalField(decimal_places=2, default=0, max_digits=4)),
+                ('update', models.DateTimeField(auto_now=True, db_index=True, null=True)),
+                ('alumno', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='control_escolar_desit_api.alumnos')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Calificaciones',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('calificacion', models.DecimalField(decimal_places=1, max_digits=3)),
+                ('creation', models.DateTimeField(auto_now_add=True, null=True)),
+                ('update', models.DateTimeField(auto_now=True, db_index=True, null=True)),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='control_escolar_desit_api.alumnos')),
+                ('capturada_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='control_escolar_desit_api.materias')),
+            ],
+            options={
+                'unique_together': {('alumno', 'materia')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.2 on 2026-10-19 13:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control_escolar_desit_api', '0011_calificaciones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='materiasarchivo',
+            name='asistencias',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='materiasarchivo',
+            name='sesiones',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='Asistencias',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('sesion', models.DateField()),
+                ('registrada', models.DateTimeField()),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='control_escolar_desit_api.alumnos')),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='control_escolar_desit_api.materias')),
+            ],
+            options={
+                'unique_together': {('materia', 'sesion', 'alumno')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AsistenciaSesion',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('sesion', models.DateField()),
+                ('presentes', models.IntegerField(default=0)),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='control_escolar_desit_api.materias')),
+            ],
+            options={
+                'unique_together': {('materia', 'sesion')},
+            },
+        ),
+    ]
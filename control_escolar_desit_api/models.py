@@ -1,18 +1,79 @@
+import hashlib
+from datetime import timedelta
+
+from django.core.cache import cache
 from django.db import models
 from django.db.models.signals import post_save
+from django.utils import timezone
+from rest_framework import exceptions
 from django.dispatch import receiver
 from rest_framework.authentication import TokenAuthentication
 from django.contrib.auth.models import AbstractUser, User
 from django.conf import settings
 
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+
 from django.db import models
 from django.contrib.auth.models import User
 
 from rest_framework.authentication import TokenAuthentication
 
 class BearerTokenAuthentication(TokenAuthentication):
+    """Token Bearer con expiración deslizante.
+
+    El token vence TOKEN_EXPIRACION_HORAS después de su último uso
+    renovado: cuando ya pasó la mitad de su vida se mueve 'created' a
+    ahora. Con caché compartida la validación se cachea unos segundos para
+    no consultar la tabla de tokens en cada petición (TOKEN_CACHE_SEGUNDOS
+    es 0 con la caché en memoria); la expiración se revisa con el
+    'created' que ya viene en la misma fila, sin consultas extra."""
     keyword = "Bearer"
 
+    @staticmethod
+    def llave_cache(key):
+        return "token:" + hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def vigencia():
+        return timedelta(hours=settings.TOKEN_EXPIRACION_HORAS)
+
+    @staticmethod
+    def expirado(token):
+        return token.created < timezone.now() - BearerTokenAuthentication.vigencia()
+
+    @staticmethod
+    def olvidar(key):
+        cache.delete(BearerTokenAuthentication.llave_cache(key))
+
+    def authenticate_credentials(self, key):
+        llave = self.llave_cache(key)
+        cachear = settings.TOKEN_CACHE_SEGUNDOS > 0
+        token = cache.get(llave) if cachear else None
+        if token is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+
+        # También con la copia cacheada: las señales la desalojan cuando el
+        # User cambia o se borra (signals.py, TOKENS)
+        if not token.user.is_active:
+            cache.delete(llave)
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        if self.expirado(token):
+            cache.delete(llave)
+            raise exceptions.AuthenticationFailed('Token expired.')
+
+        # Renovación deslizante: a lo más una escritura por media vida del token
+        if token.created < timezone.now() - self.vigencia() / 2:
+            token.created = timezone.now()
+            type(token).objects.filter(key=token.key).update(created=token.created)
+
+        if cachear:
+            cache.set(llave, token, settings.TOKEN_CACHE_SEGUNDOS)
+        return (token.user, token)
+
 
 class Administradores(models.Model):
     id = models.BigAutoField(primary_key=True)
@@ -23,7 +84,7 @@ class Administradores(models.Model):
     edad = models.IntegerField(null=True, blank=True)
     ocupacion = models.CharField(max_length=255,null=True, blank=True)
     creation = models.DateTimeField(auto_now_add=True, null=True, blank=True)
-    update = models.DateTimeField(null=True, blank=True)
+    update = models.DateTimeField(auto_now=True, null=True, blank=True, db_index=True)
 
     def __str__(self):
         return "Perfil del admin "+self.user.first_name+" "+self.user.last_name
@@ -39,7 +100,7 @@ class Alumnos(models.Model):
     telefono = models.CharField(max_length=255, null=True, blank=True)
     ocupacion = models.CharField(max_length=255,null=True, blank=True)
     creation = models.DateTimeField(auto_now_add=True, null=True, blank=True)
-    update = models.DateTimeField(null=True, blank=True)
+    update = models.DateTimeField(auto_now=True, null=True, blank=True, db_index=True)
 
     def __str__(self):
         return "Perfil del alumno "+self.user.first_name+" "+self.user.last_name
@@ -56,14 +117,14 @@ class Maestros(models.Model):
     area_investigacion = models.CharField(max_length=255,null=True, blank=True)
     materias_json = models.TextField(null=True, blank=True)
     creation = models.DateTimeField(auto_now_add=True, null=True, blank=True)
-    update = models.DateTimeField(null=True, blank=True)
+    update = models.DateTimeField(auto_now=True, null=True, blank=True, db_index=True)
 
     def __str__(self):
         return "Perfil del maestro "+self.user.first_name+" "+self.user.last_name
 
 class Materias(models.Model):
     id = models.BigAutoField(primary_key=True)
-    nrc = models.CharField(max_length=5, unique=True, null=False, blank=False)
+    nrc = models.CharField(max_length=5, null=False, blank=False) # Único por periodo (ver Meta)
     nombre = models.CharField(max_length=255, null=False, blank=False)
     seccion = models.CharField(max_length=5, null=True, blank=True)
     dias = models.JSONField(null=True, blank=True) # Guardará array: ["Lunes", "Miercoles"]
@@ -73,9 +134,222 @@ class Materias(models.Model):
     programa_educativo = models.CharField(max_length=255, null=True, blank=True)
     creditos = models.IntegerField(default=1)
     profesor = models.ForeignKey('Maestros', on_delete=models.SET_NULL, null=True, blank=True)
+    cupo = models.IntegerField(default=30)
+    inscritos = models.IntegerField(default=0) # Contador de lugares ocupados (se actualiza con F())
+    periodo = models.CharField(max_length=6, default=PeriodoUtils.actual) # 'AAAA-N'; los cerrados se archivan
     
     creation = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    update = models.DateTimeField(auto_now=True, null=True, blank=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            # El índice (periodo, nrc) también sirve a las consultas del periodo actual
+            models.UniqueConstraint(fields=["periodo", "nrc"], name="materia_nrc_unico_por_periodo"),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} - {self.nrc} ({self.periodo})"
+
+class Inscripciones(models.Model):
+    INSCRITO = "inscrito"
+    ESPERA = "espera"
+    ESTADOS = (
+        (INSCRITO, "Inscrito"),
+        (ESPERA, "Lista de espera"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    alumno = models.ForeignKey('Alumnos', on_delete=models.CASCADE)
+    materia = models.ForeignKey('Materias', on_delete=models.CASCADE)
+    estado = models.CharField(max_length=10, choices=ESTADOS, default=INSCRITO)
+    creation = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    update = models.DateTimeField(auto_now=True, null=True, blank=True, db_index=True)
+
+    class Meta:
+        unique_together = (("alumno", "materia"),)
+        indexes = [
+            models.Index(fields=["materia", "estado", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.alumno_id} - {self.materia_id} ({self.estado})"
+
+class Calificaciones(models.Model):
+    # Una por alumno y materia; se captura por sección en lote (calificaciones_utils.py)
+    id = models.BigAutoField(primary_key=True)
+    alumno = models.ForeignKey('Alumnos', on_delete=models.CASCADE)
+    # PROTECT: una sección con calificaciones no se borra, se archiva con su periodo
+    materia = models.ForeignKey('Materias', on_delete=models.PROTECT)
+    calificacion = models.DecimalField(max_digits=3, decimal_places=1) # 0.0 - 10.0
+    capturada_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    creation = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    update = models.DateTimeField(auto_now=True, null=True, blank=True, db_index=True)
+
+    class Meta:
+        unique_together = (("alumno", "materia"),)
+
+    def __str__(self):
+        return f"{self.alumno_id} - {self.materia_id}: {self.calificacion}"
+
+class ResumenAcademico(models.Model):
+    # Agregados por alumno (vivos + archivados); cada captura los ajusta por diferencia
+    id = models.BigAutoField(primary_key=True)
+    alumno = models.OneToOneField('Alumnos', on_delete=models.CASCADE)
+    materias = models.IntegerField(default=0)
+    creditos_cursados = models.IntegerField(default=0)
+    creditos_aprobados = models.IntegerField(default=0)
+    puntos = models.DecimalField(max_digits=9, decimal_places=1, default=0) # Σ calificación × créditos
+    promedio = models.DecimalField(max_digits=4, decimal_places=2, default=0) # Ponderado por créditos
+    update = models.DateTimeField(auto_now=True, null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.alumno_id}: {self.promedio} ({self.creditos_aprobados} créditos)"
+
+class Asistencias(models.Model):
+    # Un registro por alumno, materia y sesión; se escriben en lotes (asistencias_utils.py)
+    id = models.BigAutoField(primary_key=True)
+    alumno = models.ForeignKey('Alumnos', on_delete=models.CASCADE)
+    materia = models.ForeignKey('Materias', on_delete=models.CASCADE)
+    sesion = models.DateField() # Día de la clase
+    registrada = models.DateTimeField() # Cuándo llegó el check-in
+
+    class Meta:
+        # El único también deduplica y sirve a las consultas por sección
+        unique_together = (("materia", "sesion", "alumno"),)
+
+    def __str__(self):
+        return f"{self.alumno_id} - {self.materia_id} ({self.sesion})"
+
+class AsistenciaSesion(models.Model):
+    # Contador de presentes por materia y sesión; la tasa se lee de aquí, no de Asistencias
+    id = models.BigAutoField(primary_key=True)
+    materia = models.ForeignKey('Materias', on_delete=models.CASCADE)
+    sesion = models.DateField()
+    presentes = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (("materia", "sesion"),)
+
+    def __str__(self):
+        return f"{self.materia_id} ({self.sesion}): {self.presentes}"
+
+class Eliminaciones(models.Model):
+    # Tombstones para la sincronización incremental (/cambios/)
+    id = models.BigAutoField(primary_key=True)
+    entidad = models.CharField(max_length=30)
+    entidad_id = models.BigIntegerField()
+    eliminado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["entidad", "id"]),
+            models.Index(fields=["entidad", "eliminado"]),
+        ]
+
+    def __str__(self):
+        return f"{self.entidad} {self.entidad_id} eliminado"
+
+class Auditoria(models.Model):
+    # Bitácora append-only; se escribe en lotes desde auditoria.py
+    CREAR = "crear"
+    EDITAR = "editar"
+    ELIMINAR = "eliminar"
+    ARCHIVAR = "archivar"  # Un evento por corrida de archivar_periodo (entidad_id = 0)
+
+    id = models.BigAutoField(primary_key=True)
+    entidad = models.CharField(max_length=30)
+    entidad_id = models.BigIntegerField()
+    accion = models.CharField(max_length=10)
+    cambios = models.JSONField(null=True, blank=True)
+    usuario_id = models.BigIntegerField(null=True, blank=True) # Sin FK: la bitácora sobrevive al usuario
+    fecha = models.DateTimeField(db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["entidad", "entidad_id", "fecha"]),
+        ]
+
+    def __str__(self):
+        return f"{self.accion} {self.entidad} {self.entidad_id}"
+
+class ReporteSnapshot(models.Model):
+    # Reportes materializados (ver reportes_utils.py); una fila por reporte
+    id = models.BigAutoField(primary_key=True)
+    nombre = models.CharField(max_length=50, unique=True)
+    datos = models.JSONField(default=list)
+    generado = models.DateTimeField()
+
+    def __str__(self):
+        return f"Reporte {self.nombre} ({self.generado})"
+
+# ====================================================
+#  ARCHIVO DE PERIODOS CERRADOS (archivar_periodo)
+#  Sin FKs: el histórico no depende de que el alumno o el profesor sigan existiendo
+# ====================================================
+
+class MateriasArchivo(models.Model):
+    id = models.BigIntegerField(primary_key=True) # Mismo id que tenía en Materias
+    periodo = models.CharField(max_length=6)
+    nrc = models.CharField(max_length=5)
+    nombre = models.CharField(max_length=255)
+    seccion = models.CharField(max_length=5, null=True, blank=True)
+    dias = models.JSONField(null=True, blank=True)
+    hora_inicio = models.TimeField(null=True, blank=True)
+    hora_fin = models.TimeField(null=True, blank=True)
+    salon = models.CharField(max_length=255, null=True, blank=True)
+    programa_educativo = models.CharField(max_length=255, null=True, blank=True)
+    creditos = models.IntegerField(default=1)
+    profesor_id = models.BigIntegerField(null=True, blank=True)
+    cupo = models.IntegerField(default=30)
+    inscritos = models.IntegerField(default=0)
+    sesiones = models.IntegerField(default=0) # Sesiones con asistencia registrada
+    asistencias = models.IntegerField(default=0) # Suma de presentes de esas sesiones
+    creation = models.DateTimeField(null=True, blank=True)
     update = models.DateTimeField(null=True, blank=True)
+    archivado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["periodo", "nrc"]),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} - {self.nrc} ({self.periodo}, archivada)"
+
+class InscripcionesArchivo(models.Model):
+    id = models.BigIntegerField(primary_key=True) # Mismo id que tenía en Inscripciones
+    periodo = models.CharField(max_length=6)
+    alumno_id = models.BigIntegerField()
+    materia_id = models.BigIntegerField() # -> MateriasArchivo.id
+    estado = models.CharField(max_length=10)
+    creation = models.DateTimeField(null=True, blank=True)
+    update = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["alumno_id", "periodo"]),
+            models.Index(fields=["materia_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.alumno_id} - {self.materia_id} ({self.periodo}, archivada)"
+
+class CalificacionesArchivo(models.Model):
+    id = models.BigIntegerField(primary_key=True) # Mismo id que tenía en Calificaciones
+    periodo = models.CharField(max_length=6)
+    alumno_id = models.BigIntegerField()
+    materia_id = models.BigIntegerField() # -> MateriasArchivo.id
+    calificacion = models.DecimalField(max_digits=3, decimal_places=1)
+    creditos = models.IntegerField(default=0) # Créditos de la materia al archivar (ya no cambian)
+    capturada_por_id = models.BigIntegerField(null=True, blank=True)
+    creation = models.DateTimeField(null=True, blank=True)
+    update = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["alumno_id", "periodo"]),
+            models.Index(fields=["materia_id"]),
+        ]
 
     def __str__(self):
-        return f"{self.nombre} - {self.nrc}"
\ No newline at end of file
+        return f"{self.alumno_id} - {self.materia_id}: {self.calificacion} ({self.periodo}, archivada)"
@@ -0,0 +1,167 @@
+import threading
+import time
+
+from django.conf import settings
+
+from control_escolar_desit_api.horario_utils import HorarioUtils, DIAS_SEMANA
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+from control_escolar_desit_api.version_utils import VersionCompartida
+
+# Resolución de la rejilla: 96 franjas de 15 minutos por día
+MINUTOS_FRANJA = 15
+FRANJAS_DIA = 24 * 60 // MINUTOS_FRANJA
+
+class OcupacionSalones:
+    """Matriz de ocupación salón × día × franja en memoria.
+
+    Cada (salón, día) es un entero usado como arreglo de bits (bit i = franja i
+    ocupada), así una consulta de salones libres es un AND por salón y día.
+    Solo considera el periodo actual. Se construye desde la BD y se mantiene
+    con las señales de Materias (tras el commit). Cada proceso (worker) tiene
+    su propia copia: los cambios de otros llegan por la versión compartida, o
+    a más tardar al vencer INDICES_TTL_SEGUNDOS."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._construido = False
+        self._construido_en = 0.0
+        self._periodo = None
+        self._version = None
+        self._compartida = VersionCompartida("ocupacion")
+        self._materias = {}   # materia_id -> (salon, [indices de día], mascara)
+        self._salones = {}    # salon -> [mascara por día]
+        self._por_salon = {}  # salon -> set(materia_id)
+
+    # ------------------------------------------------
+    # Construcción y mantenimiento
+    # ------------------------------------------------
+
+    @staticmethod
+    def mascara(hora_inicio, hora_fin):
+        """Bits de las franjas que cubre [inicio, fin)"""
+        inicio = HorarioUtils.minutos(hora_inicio)
+        fin = HorarioUtils.minutos(hora_fin)
+        if inicio is None or fin is None or fin <= inicio:
+            return 0
+        # Acotado al día: un inicio de 24:00 o más no cubre ninguna franja
+        primera = min(max(inicio // MINUTOS_FRANJA, 0), FRANJAS_DIA)
+        ultima = min(-(-fin // MINUTOS_FRANJA), FRANJAS_DIA)
+        if ultima <= primera:
+            return 0
+        return ((1 << (ultima - primera)) - 1) << primera
+
+    def construir(self):
+        from control_escolar_desit_api.models import Materias
+        # La versión se lee antes que las filas: un cambio a media construcción dispara otra
+        version = self._compartida.leer()
+        self._periodo = PeriodoUtils.actual()
+        filas = Materias.objects.filter(periodo=self._periodo).exclude(salon__isnull=True).exclude(salon="").values(
+            "id", "salon", "dias", "hora_inicio", "hora_fin"
+        )
+        with self._lock:
+            self._materias, self._salones, self._por_salon = {}, {}, {}
+            for fila in filas:
+                self._agregar(fila["id"], fila["salon"], fila["dias"], fila["hora_inicio"], fila["hora_fin"])
+            self._version = version
+            self._construido_en = time.monotonic()
+            self._construido = True
+
+    def asegurar_construido(self):
+        # Al cambiar de periodo la rejilla se rearma con las materias del nuevo
+        if (not self._construido or self._periodo != PeriodoUtils.actual()
+                or time.monotonic() - self._construido_en > settings.INDICES_TTL_SEGUNDOS
+                or self._compartida.leer() != self._version):
+            self.construir()
+
+    def actualizar_materia(self, materia):
+        """Recalcula solo los salones que toca la materia (antes y después).
+        Se llama tras el commit; avisa a los demás workers."""
+        version = self._compartida.incrementar()
+        if not self._construido:
+            return
+        with self._lock:
+            self._quitar(materia.id)
+            if materia.salon and materia.periodo == self._periodo:
+                self._agregar(materia.id, materia.salon, materia.dias, materia.hora_inicio, materia.hora_fin)
+            self._adoptar(version)
+
+    def quitar_materia(self, materia_id):
+        version = self._compartida.incrementar()
+        if not self._construido:
+            return
+        with self._lock:
+            self._quitar(materia_id)
+            self._adoptar(version)
+
+    def _adoptar(self, version):
+        # Si nadie más cambió desde nuestra versión, el cambio local basta y no hay que rearmar
+        if self._version is not None and version == self._version + 1:
+            self._version = version
+
+    def _agregar(self, materia_id, salon, dias, hora_inicio, hora_fin):
+        salon = salon.strip()
+        indices = [DIAS_SEMANA.index(d) for d in HorarioUtils.dias_materia(dias)]
+        mascara = OcupacionSalones.mascara(hora_inicio, hora_fin)
+        self._materias[materia_id] = (salon, indices, mascara)
+        self._por_salon.setdefault(salon, set()).add(materia_id)
+        fila = self._salones.setdefault(salon, [0] * len(DIAS_SEMANA))
+        for i in indices:
+            fila[i] |= mascara
+
+    def _quitar(self, materia_id):
+        registro = self._materias.pop(materia_id, None)
+        if registro is None:
+            return
+        salon = registro[0]
+        restantes = self._por_salon.get(salon, set())
+        restantes.discard(materia_id)
+        if not restantes:
+            self._por_salon.pop(salon, None)
+            self._salones.pop(salon, None)
+            return
+        # Un OR no se puede "deshacer": se rearma la fila con las materias que quedan
+        fila = [0] * len(DIAS_SEMANA)
+        for otra in restantes:
+            _, indices, mascara = self._materias[otra]
+            for i in indices:
+                fila[i] |= mascara
+        self._salones[salon] = fila
+
+    # ------------------------------------------------
+    # Consultas
+    # ------------------------------------------------
+
+    def salones_libres(self, dias, hora_inicio, hora_fin):
+        self.asegurar_construido()
+        indices = [DIAS_SEMANA.index(d) for d in HorarioUtils.dias_materia(dias)]
+        consulta = OcupacionSalones.mascara(hora_inicio, hora_fin)
+        with self._lock:
+            return sorted(
+                salon for salon, fila in self._salones.items()
+                if all(fila[i] & consulta == 0 for i in indices)
+            )
+
+    def utilizacion(self, hora_apertura, hora_cierre, dias_habiles):
+        """Minutos ocupados por semana y % respecto a la jornada de cada salón"""
+        self.asegurar_construido()
+        jornada = OcupacionSalones.mascara(hora_apertura, hora_cierre)
+        indices = [DIAS_SEMANA.index(d) for d in HorarioUtils.dias_materia(dias_habiles)]
+        disponibles = jornada.bit_count() * len(indices)
+        reporte = []
+        with self._lock:
+            for salon, fila in sorted(self._salones.items()):
+                ocupadas = sum(fila[i].bit_count() for i in range(len(DIAS_SEMANA)))
+                en_jornada = sum((fila[i] & jornada).bit_count() for i in indices)
+                reporte.append({
+                    "salon": salon,
+                    "materias": len(self._por_salon.get(salon, ())),
+                    "minutos_semana": ocupadas * MINUTOS_FRANJA,
+                    "porcentaje": round(100.0 * en_jornada / disponibles, 1) if disponibles else 0.0,
+                    "por_dia": {
+                        DIAS_SEMANA[i]: fila[i].bit_count() * MINUTOS_FRANJA for i in range(len(DIAS_SEMANA)) if fila[i]
+                    },
+                })
+        return reporte
+
+# Instancia única por proceso
+ocupacion = OcupacionSalones()
@@ -0,0 +1,116 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import time
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# <epoch ms>_<método>_<ruta>; sin '/' ni '..' para poder servirlo tal cual
+NOMBRE_VALIDO = re.compile(r"^\d{13}_[A-Z]+_[\w\-]*$")
+
+class TrazaSQL:
+    """execute_wrapper que anota cada consulta con su duración"""
+
+    def __init__(self):
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append({
+                "sql": sql,
+                "ms": round((time.perf_counter() - inicio) * 1000, 2),
+                "many": many,
+            })
+
+
+class PerfilesUtils:
+
+    @staticmethod
+    def directorio():
+        os.makedirs(settings.PERFIL_DIRECTORIO, exist_ok=True)
+        return settings.PERFIL_DIRECTORIO
+
+    @staticmethod
+    def perfilar(request, get_response):
+        """Corre la petición bajo cProfile y con traza SQL; guarda ambos y
+        regresa la respuesta con el nombre del perfil en X-Perfil"""
+        traza = TrazaSQL()
+        perfil = cProfile.Profile()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(traza):
+            perfil.enable()
+            try:
+                respuesta = get_response(request)
+            finally:
+                perfil.disable()
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+
+        ruta = re.sub(r"[^\w\-]+", "-", request.path).strip("-")[:60]
+        nombre = "%d_%s_%s" % (time.time() * 1000, request.method, ruta)
+        consultas = traza.consultas
+        try:
+            PerfilesUtils.guardar(nombre, perfil, {
+                "ruta": request.get_full_path(),
+                "metodo": request.method,
+                "status": respuesta.status_code,
+                "duracion_ms": round(duracion_ms, 1),
+                "sql_ms": round(sum(c["ms"] for c in consultas), 1),
+                "consultas": consultas,
+            })
+        except OSError:
+            # Sin disco no hay perfil, pero la petición no debe fallar por eso
+            logger.exception("No se pudo guardar el perfil %s", nombre)
+            return respuesta
+        respuesta["X-Perfil"] = nombre
+        return respuesta
+
+    @staticmethod
+    def guardar(nombre, perfil, detalle):
+        directorio = PerfilesUtils.directorio()
+        perfil.dump_stats(os.path.join(directorio, nombre + ".prof"))
+        # Resumen legible (top por tiempo acumulado) junto a la traza SQL
+        texto = io.StringIO()
+        pstats.Stats(perfil, stream=texto).sort_stats("cumulative").print_stats(settings.PERFIL_TOP_FUNCIONES)
+        detalle["resumen"] = texto.getvalue()
+        with open(os.path.join(directorio, nombre + ".json"), "w", encoding="utf-8") as archivo:
+            json.dump(detalle, archivo, ensure_ascii=False, default=str)
+        PerfilesUtils.rotar()
+
+    @staticmethod
+    def rotar():
+        """Conserva solo los PERFIL_MAX_ARCHIVOS perfiles más recientes"""
+        nombres = PerfilesUtils.nombres()
+        for nombre in nombres[settings.PERFIL_MAX_ARCHIVOS:]:
+            for extension in (".prof", ".json"):
+                try:
+                    os.remove(os.path.join(settings.PERFIL_DIRECTORIO, nombre + extension))
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def nombres():
+        """Perfiles guardados, del más reciente al más antiguo"""
+        if not os.path.isdir(settings.PERFIL_DIRECTORIO):
+            return []
+        nombres = {
+            os.path.splitext(archivo)[0] for archivo in os.listdir(settings.PERFIL_DIRECTORIO)
+            if archivo.endswith(".json")
+        }
+        return sorted((n for n in nombres if NOMBRE_VALIDO.match(n)), reverse=True)
+
+    @staticmethod
+    def ruta_archivo(nombre, extension):
+        if not NOMBRE_VALIDO.match(nombre or "") or extension not in (".prof", ".json"):
+            return None
+        ruta = os.path.join(settings.PERFIL_DIRECTORIO, nombre + extension)
+        return ruta if os.path.exists(ruta) else None
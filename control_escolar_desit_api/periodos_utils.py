@@ -0,0 +1,32 @@
+import re
+
+from django.conf import settings
+from django.utils import timezone
+
+# 'AAAA-N': N = 1 (enero-junio), 2 (julio-diciembre), 3 (verano / intensivo)
+PERIODO_REGEX = re.compile(r"^\d{4}-[1-3]$")
+
+class PeriodoUtils:
+
+    @staticmethod
+    def actual():
+        """Periodo vigente: PERIODO_ACTUAL si está configurado, si no por fecha"""
+        if settings.PERIODO_ACTUAL:
+            return settings.PERIODO_ACTUAL
+        hoy = timezone.localdate()
+        return "%d-%d" % (hoy.year, 1 if hoy.month <= 6 else 2)
+
+    @staticmethod
+    def valido(periodo):
+        return isinstance(periodo, str) and PERIODO_REGEX.match(periodo) is not None
+
+    @staticmethod
+    def de_request(request):
+        """?periodo= de la petición; por defecto el actual y 'todos' = sin filtro (None).
+        Lanza ValueError si el formato no es válido."""
+        periodo = request.GET.get("periodo") or PeriodoUtils.actual()
+        if periodo == "todos":
+            return None
+        if not PeriodoUtils.valido(periodo):
+            raise ValueError("Periodo inválido (formato AAAA-N)")
+        return periodo
@@ -0,0 +1,196 @@
+import hashlib
+import io
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from control_escolar_desit_api.utils import Utils
+
+logger = logging.getLogger(__name__)
+
+# Extensión con la que se guarda cada tipo detectado
+EXTENSIONES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "application/pdf": ".pdf",
+    "video/mp4": ".mp4",
+    "video/x-m4v": ".m4v",
+    "video/webm": ".webm",
+}
+
+class ArchivoDemasiadoGrande(Exception):
+    pass
+
+class ImagenDemasiadoGrande(Exception):
+    pass
+
+def _pixeles(imagen):
+    ancho, alto = imagen.size
+    return ancho * alto
+
+def revisar_dimensiones(primero):
+    """Rechaza imágenes de más de IMAGEN_MAX_PIXELES con la cabecera del
+    primer bloque (Image.open solo lee la cabecera, no decodifica). Si la
+    cabecera no está completa ahí, lo revisa generar_miniatura."""
+    from PIL import Image
+    try:
+        imagen = Image.open(io.BytesIO(primero))
+    except Image.DecompressionBombError:
+        raise ImagenDemasiadoGrande()
+    except Exception:
+        return
+    if _pixeles(imagen) > settings.IMAGEN_MAX_PIXELES:
+        raise ImagenDemasiadoGrande()
+
+class LocalStorage:
+    """Archivos en MEDIA_ROOT (desarrollo y pruebas)"""
+
+    def __init__(self, raiz, url_base):
+        self.raiz = raiz
+        self.url_base = url_base
+
+    def _ruta(self, nombre):
+        ruta = os.path.normpath(os.path.join(self.raiz, nombre))
+        if not ruta.startswith(os.path.normpath(self.raiz) + os.sep):
+            raise ValueError("Nombre de archivo inválido")
+        return ruta
+
+    def escritor(self, nombre, content_type):
+        ruta = self._ruta(nombre)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        return open(ruta, "wb")
+
+    def abrir(self, nombre):
+        return open(self._ruta(nombre), "rb")
+
+    def existe(self, nombre):
+        return os.path.exists(self._ruta(nombre))
+
+    def eliminar(self, nombre):
+        if self.existe(nombre):
+            os.remove(self._ruta(nombre))
+
+    def url(self, nombre):
+        return self.url_base + nombre
+
+
+class GCSStorage:
+    """Google Cloud Storage con subida resumible por bloques (producción)"""
+
+    def __init__(self, bucket):
+        # Import diferido: google-cloud-storage es pesado y solo se usa aquí
+        from google.cloud import storage
+        self.bucket = storage.Client().bucket(bucket)
+
+    def escritor(self, nombre, content_type):
+        return self.bucket.blob(nombre).open("wb", content_type=content_type, chunk_size=settings.ARCHIVOS_CHUNK_BYTES)
+
+    def abrir(self, nombre):
+        return self.bucket.blob(nombre).open("rb", chunk_size=settings.ARCHIVOS_CHUNK_BYTES)
+
+    def existe(self, nombre):
+        return self.bucket.blob(nombre).exists()
+
+    def eliminar(self, nombre):
+        self.bucket.blob(nombre).delete()
+
+    def url(self, nombre):
+        return "https://storage.googleapis.com/" + self.bucket.name + "/" + nombre
+
+
+class StorageBridge:
+
+    _backend = None
+    # Pillow suelta el GIL al decodificar/redimensionar: bastan hilos
+    _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="miniaturas")
+
+    @staticmethod
+    def backend():
+        if StorageBridge._backend is None:
+            if settings.ARCHIVOS_BACKEND == "gcs":
+                StorageBridge._backend = GCSStorage(settings.GCS_BUCKET)
+            else:
+                StorageBridge._backend = LocalStorage(os.path.join(settings.MEDIA_ROOT, "archivos"), settings.MEDIA_URL + "archivos/")
+        return StorageBridge._backend
+
+    @staticmethod
+    def guardar_upload(archivo, carpeta="general"):
+        """Copia un UploadedFile al backend por bloques, sin leerlo completo.
+
+        Django ya manda a disco los uploads grandes (FILE_UPLOAD_MAX_MEMORY_SIZE);
+        aquí solo viaja un bloque a la vez, detectando el tipo real con los
+        primeros bytes y calculando el sha256 en el camino."""
+        if archivo.size and archivo.size > settings.ARCHIVOS_MAX_BYTES:
+            raise ArchivoDemasiadoGrande()
+
+        bloques = archivo.chunks(settings.ARCHIVOS_CHUNK_BYTES)
+        primero = next(bloques, b"")
+        content_type = Utils.mimeFromBytes(primero[:32])
+        if content_type.startswith("image/"):
+            revisar_dimensiones(primero)
+        nombre = carpeta + "/" + uuid.uuid4().hex + EXTENSIONES.get(content_type, "")
+
+        backend = StorageBridge.backend()
+        digest = hashlib.sha256()
+        tamano = 0
+        with backend.escritor(nombre, content_type) as destino:
+            for bloque in _encadenar(primero, bloques):
+                tamano += len(bloque)
+                if tamano > settings.ARCHIVOS_MAX_BYTES:
+                    break
+                digest.update(bloque)
+                destino.write(bloque)
+        if tamano > settings.ARCHIVOS_MAX_BYTES:
+            backend.eliminar(nombre)
+            raise ArchivoDemasiadoGrande()
+
+        miniatura = None
+        if content_type.startswith("image/"):
+            miniatura = StorageBridge.nombre_miniatura(nombre)
+            StorageBridge._pool.submit(StorageBridge.generar_miniatura, nombre, miniatura).add_done_callback(_reportar_error)
+
+        return {
+            "nombre": nombre,
+            "url": backend.url(nombre),
+            "content_type": content_type,
+            "tamano": tamano,
+            "sha256": digest.hexdigest(),
+            "miniatura": miniatura,
+        }
+
+    @staticmethod
+    def nombre_miniatura(nombre):
+        return os.path.splitext(nombre)[0] + "_thumb.jpg"
+
+    @staticmethod
+    def generar_miniatura(nombre, destino):
+        from PIL import Image
+
+        backend = StorageBridge.backend()
+        with backend.abrir(nombre) as origen:
+            imagen = Image.open(origen)
+            if _pixeles(imagen) > settings.IMAGEN_MAX_PIXELES:
+                raise ImagenDemasiadoGrande(nombre)
+            # draft() decodifica JPEG a escala reducida: no se carga la imagen completa
+            imagen.draft("RGB", settings.MINIATURA_TAMANO)
+            imagen.thumbnail(settings.MINIATURA_TAMANO)
+            salida = io.BytesIO()
+            imagen.convert("RGB").save(salida, "JPEG", quality=80)
+        with backend.escritor(destino, "image/jpeg") as archivo:
+            archivo.write(salida.getvalue())
+
+
+def _encadenar(primero, resto):
+    if primero:
+        yield primero
+    for bloque in resto:
+        yield bloque
+
+def _reportar_error(futuro):
+    if futuro.exception() is not None:
+        logger.error("No se pudo generar la miniatura", exc_info=futuro.exception())
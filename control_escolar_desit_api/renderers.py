@@ -0,0 +1,66 @@
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Mismas reglas que el JSONEncoder de DRF para fechas, horas, decimales,
+# timedelta, UUID, QuerySets, etc. (datetime con milisegundos y 'Z' en UTC)
+_encoder = JSONEncoder()
+
+def _default(obj):
+    return _encoder.default(obj)
+
+# orjson serializaría datetime por su cuenta (microsegundos, '+00:00');
+# con PASSTHROUGH pasa por _default y queda idéntico al JSONRenderer
+OPCIONES_ORJSON = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class OrjsonRenderer(JSONRenderer):
+    """JSONRenderer con orjson: mismo media type y misma salida, menos CPU."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        opciones = OPCIONES_ORJSON
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            opciones |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=_default, option=opciones)
+        # Igual que JSONRenderer: U+2028/U+2029 escapados para poder incrustarse en JS
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MsgpackRenderer(BaseRenderer):
+    """MessagePack (Accept: application/msgpack). Fechas y decimales se
+    codifican igual que en JSON para que el cliente vea los mismos valores."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class OrjsonParser(BaseParser):
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MsgpackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except Exception as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
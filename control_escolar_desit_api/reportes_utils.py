@@ -0,0 +1,155 @@
+import threading
+
+from django.db import transaction
+from django.db.models import Count, Sum, Q
+from django.utils import timezone
+
+from control_escolar_desit_api.horario_utils import HorarioUtils, DIAS_SEMANA
+from control_escolar_desit_api.ocupacion_utils import OcupacionSalones, MINUTOS_FRANJA
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+
+# ====================================================
+#  AGREGACIONES (corren en SQL; 'claves' limita a las filas afectadas)
+# ====================================================
+
+def _materias():
+    # Los reportes son del periodo actual; los cerrados viven en MateriasArchivo
+    from control_escolar_desit_api.models import Materias
+    return Materias.objects.filter(periodo=PeriodoUtils.actual())
+
+def _filtrar(queryset, campo, claves):
+    if claves is None:
+        return queryset
+    filtro = Q(**{campo + "__in": [c for c in claves if c is not None]})
+    if None in claves:
+        filtro |= Q(**{campo + "__isnull": True})
+    return queryset.filter(filtro)
+
+def carga_docente(claves=None):
+    consulta = _filtrar(_materias().filter(profesor__isnull=False), "profesor_id", claves).values(
+        "profesor_id", "profesor__id_trabajador", "profesor__user__first_name", "profesor__user__last_name"
+    ).annotate(materias=Count("id"), creditos=Sum("creditos"), cupo=Sum("cupo"))
+    return [{
+        "profesor_id": fila["profesor_id"],
+        "id_trabajador": fila["profesor__id_trabajador"],
+        "nombre": (str(fila["profesor__user__first_name"] or "") + " " + str(fila["profesor__user__last_name"] or "")).strip(),
+        "materias": fila["materias"],
+        "creditos": fila["creditos"] or 0,
+        "cupo": fila["cupo"] or 0,
+    } for fila in consulta]
+
+def secciones_programa(claves=None):
+    consulta = _filtrar(_materias(), "programa_educativo", claves).values("programa_educativo").annotate(
+        secciones=Count("id"),
+        creditos=Sum("creditos"),
+        cupo=Sum("cupo"),
+        sin_profesor=Count("id", filter=Q(profesor__isnull=True)),
+    )
+    return [{
+        "programa_educativo": fila["programa_educativo"],
+        "secciones": fila["secciones"],
+        "creditos": fila["creditos"] or 0,
+        "cupo": fila["cupo"] or 0,
+        "sin_profesor": fila["sin_profesor"],
+    } for fila in consulta]
+
+def utilizacion_salones(claves=None):
+    """Conteos en SQL; los minutos salen de la rejilla de bits porque 'dias'
+    se guarda como texto JSON y no se puede desarmar en SQL de forma portable"""
+    base = _filtrar(_materias().exclude(salon__isnull=True).exclude(salon=""), "salon", claves)
+    filas = {
+        fila["salon"]: {"salon": fila["salon"], "materias": fila["materias"], "creditos": fila["creditos"] or 0, "minutos_semana": 0}
+        for fila in base.values("salon").annotate(materias=Count("id"), creditos=Sum("creditos"))
+    }
+    rejilla = {}
+    for salon, dias, hora_inicio, hora_fin in base.values_list("salon", "dias", "hora_inicio", "hora_fin"):
+        mascara = OcupacionSalones.mascara(hora_inicio, hora_fin)
+        por_dia = rejilla.setdefault(salon, [0] * len(DIAS_SEMANA))
+        for dia in HorarioUtils.dias_materia(dias):
+            por_dia[DIAS_SEMANA.index(dia)] |= mascara
+    for salon, por_dia in rejilla.items():
+        filas[salon]["minutos_semana"] = sum(m.bit_count() for m in por_dia) * MINUTOS_FRANJA
+    return list(filas.values())
+
+# nombre -> (campo que identifica la fila, agregación, orden de presentación)
+REPORTES = {
+    "carga_docente": ("profesor_id", carga_docente, lambda f: (-f["creditos"], f["nombre"])),
+    "secciones_programa": ("programa_educativo", secciones_programa, lambda f: (-f["secciones"], f["programa_educativo"] or "")),
+    "utilizacion_salones": ("salon", utilizacion_salones, lambda f: (-f["minutos_semana"], f["salon"])),
+}
+
+# Claves tocadas por la transacción en curso de cada hilo, por reporte
+_pendientes = threading.local()
+
+def _llave(nombre):
+    # Un snapshot por reporte y periodo: al cambiar de semestre se arma uno nuevo
+    return nombre + ":" + PeriodoUtils.actual()
+
+class ReportesUtils:
+    """Reportes de carga académica materializados en ReporteSnapshot.
+
+    Leer un reporte es leer una sola fila ya ordenada. Las escrituras de
+    Materias de una transacción juntan las filas que tocaron (profesor,
+    programa y salón de antes y después) y tras el commit se recalculan una
+    sola vez; 'refrescar_reportes' los reconstruye completos."""
+
+    @staticmethod
+    def refrescar(nombres=None):
+        from control_escolar_desit_api.models import ReporteSnapshot
+        for nombre in nombres or REPORTES:
+            _, agregacion, orden = REPORTES[nombre]
+            ReporteSnapshot.objects.update_or_create(
+                nombre=_llave(nombre),
+                defaults={"datos": sorted(agregacion(), key=orden), "generado": timezone.now()},
+            )
+
+    @staticmethod
+    def refrescar_filas(nombre, claves):
+        """Sustituye en el snapshot solo las filas cuyas claves cambiaron"""
+        from control_escolar_desit_api.models import ReporteSnapshot
+        campo, agregacion, orden = REPORTES[nombre]
+        with transaction.atomic():
+            snapshot = ReporteSnapshot.objects.select_for_update().filter(nombre=_llave(nombre)).first()
+            if snapshot is None:
+                # Nunca se ha generado: lo arma completo quien lo pida primero
+                return
+            filas = [f for f in snapshot.datos if f[campo] not in claves] + agregacion(claves)
+            snapshot.datos = sorted(filas, key=orden)
+            snapshot.generado = timezone.now()
+            snapshot.save(update_fields=["datos", "generado"])
+
+    @staticmethod
+    def actualizar_materia(antes, despues):
+        """'antes'/'despues' son dicts con profesor_id, programa_educativo y salon.
+
+        Se llama dentro de la transacción: acumula las claves y deja un solo
+        refresco tras el commit, así un guardado masivo no reescribe el
+        snapshot (bajo select_for_update) una vez por fila."""
+        claves = getattr(_pendientes, "claves", None)
+        if claves is None:
+            claves = _pendientes.claves = {nombre: set() for nombre in REPORTES}
+        for nombre, (campo, _, _) in REPORTES.items():
+            claves[nombre] |= {fila.get(campo) for fila in (antes, despues) if fila}
+        # Un on_commit por llamada: el primero que corre vacía lo acumulado y
+        # los demás no encuentran nada. Si hubo rollback las claves sobrantes
+        # solo causan un recálculo de más, nunca datos viejos
+        transaction.on_commit(ReportesUtils.refrescar_pendientes, robust=True)
+
+    @staticmethod
+    def refrescar_pendientes():
+        claves = getattr(_pendientes, "claves", None)
+        _pendientes.claves = None
+        for nombre, por_refrescar in (claves or {}).items():
+            if nombre == "utilizacion_salones":
+                por_refrescar -= {None, ""}
+            if por_refrescar:
+                ReportesUtils.refrescar_filas(nombre, por_refrescar)
+
+    @staticmethod
+    def obtener(nombre):
+        from control_escolar_desit_api.models import ReporteSnapshot
+        snapshot = ReporteSnapshot.objects.filter(nombre=_llave(nombre)).values("datos", "generado").first()
+        if snapshot is None:
+            ReportesUtils.refrescar([nombre])
+            snapshot = ReporteSnapshot.objects.filter(nombre=_llave(nombre)).values("datos", "generado").first()
+        return snapshot
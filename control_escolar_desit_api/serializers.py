@@ -2,6 +2,22 @@ from django.contrib.auth.models import User
 from rest_framework import serializers
 from .models import *
 
+class CamposMixin:
+    """campos=[...] deja en la salida solo esos campos; 'user.first_name'
+    recorta también el serializer anidado ('user' solo lo deja completo)"""
+    def __init__(self, *args, campos=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if campos is None:
+            return
+        propios = {campo.split(".", 1)[0] for campo in campos}
+        for nombre in set(self.fields) - propios:
+            self.fields.pop(nombre)
+        for nombre, campo in self.fields.items():
+            anidados = {c.split(".", 1)[1] for c in campos if c.startswith(nombre + ".")}
+            if anidados and nombre not in campos and isinstance(campo, serializers.Serializer):
+                for sub in set(campo.fields) - anidados:
+                    campo.fields.pop(sub)
+
 class UserSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
     first_name = serializers.CharField(required=True)
@@ -12,25 +28,52 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ('id','first_name','last_name', 'email')
 
-class AdminSerializer(serializers.ModelSerializer):
+class AdminSerializer(CamposMixin, serializers.ModelSerializer):
     user=UserSerializer(read_only=True)
     class Meta:
         model = Administradores
         fields = '__all__'
         
-class AlumnoSerializer(serializers.ModelSerializer):
+class AlumnoSerializer(CamposMixin, serializers.ModelSerializer):
     user=UserSerializer(read_only=True)
     class Meta:
         model = Alumnos
         fields = "__all__"
 
-class MaestroSerializer(serializers.ModelSerializer):
+class MaestroSerializer(CamposMixin, serializers.ModelSerializer):
     user=UserSerializer(read_only=True)
     class Meta:
         model = Maestros
         fields = '__all__'
 
-class MateriaSerializer(serializers.ModelSerializer):
+class MateriaSerializer(CamposMixin, serializers.ModelSerializer):
     class Meta:
         model = Materias
         fields = '__all__'
+
+class InscripcionSerializer(serializers.ModelSerializer):
+    nrc = serializers.CharField(source='materia.nrc', read_only=True)
+    nombre_materia = serializers.CharField(source='materia.nombre', read_only=True)
+    creditos = serializers.IntegerField(source='materia.creditos', read_only=True)
+    class Meta:
+        model = Inscripciones
+        fields = '__all__'
+
+class CalificacionSerializer(serializers.ModelSerializer):
+    nrc = serializers.CharField(source='materia.nrc', read_only=True)
+    nombre_materia = serializers.CharField(source='materia.nombre', read_only=True)
+    creditos = serializers.IntegerField(source='materia.creditos', read_only=True)
+    periodo = serializers.CharField(source='materia.periodo', read_only=True)
+    class Meta:
+        model = Calificaciones
+        fields = '__all__'
+
+class ResumenAcademicoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResumenAcademico
+        exclude = ('id',)
+
+class AuditoriaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Auditoria
+        fields = '__all__'
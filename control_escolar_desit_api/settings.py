@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 import os
 
@@ -34,11 +35,14 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',     # CORS debe ir antes de CommonMiddleware
+    'control_escolar_desit_api.middleware.LimiteEsperaMiddleware',  # Después de CORS: el 503 lleva sus headers
+    'control_escolar_desit_api.middleware.PerfiladorMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'control_escolar_desit_api.middleware.UsuarioActualMiddleware',
 ]
 
 # Configuración de CORS: define orígenes permitidos y quita CORS_ORIGIN_ALLOW_ALL
@@ -63,6 +67,16 @@ import os
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Subida de archivos por bloques: 'local' (MEDIA_ROOT) o 'gcs' (Google Cloud Storage)
+ARCHIVOS_BACKEND = os.getenv("ARCHIVOS_BACKEND", "local")
+GCS_BUCKET = os.getenv("GCS_BUCKET")
+ARCHIVOS_CHUNK_BYTES = 256 * 1024          # múltiplo de 256 KB como pide GCS
+ARCHIVOS_MAX_BYTES = int(os.getenv("ARCHIVOS_MAX_BYTES", 50 * 1024 * 1024))
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024  # arriba de 1 MB Django lo manda a disco
+MINIATURA_TAMANO = (256, 256)
+# Imágenes más grandes (ancho x alto) se rechazan: decodificarlas para la miniatura no cabe en memoria
+IMAGEN_MAX_PIXELES = int(os.getenv("IMAGEN_MAX_PIXELES", 40_000_000))
+
 STATIC_URL = "/static/"
 # STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 # TEMPLATES[0]["DIRS"] = [os.path.join(BASE_DIR, "templates")]
@@ -85,6 +99,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'control_escolar_desit_api.wsgi.application'
+ASGI_APPLICATION = 'control_escolar_desit_api.asgi.application'
 
 DATABASES = {
     'default2': {
@@ -120,6 +135,114 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Caché: en memoria por proceso por defecto. Con varios workers conviene
+# apuntar CACHE_BACKEND a un backend compartido (p. ej. DatabaseCache o Redis)
+# para que las invalidaciones lleguen a todos.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv("CACHE_LOCATION", 'control-escolar'),
+    }
+}
+# Con la caché en memoria las invalidaciones no llegan a los demás workers:
+# los TTL por defecto de lo que se invalida por señales son cortos
+CACHE_POR_PROCESO = CACHES['default']['BACKEND'].endswith("LocMemCache")
+
+# Horario semanal por usuario (se invalida con señales tras el commit)
+HORARIO_CACHE_SEGUNDOS = int(os.getenv("HORARIO_CACHE_SEGUNDOS", 60 if CACHE_POR_PROCESO else 3600))
+
+# Snapshot del catálogo de materias (facetas); se invalida tras cada escritura
+CATALOGO_CACHE_SEGUNDOS = int(os.getenv("CATALOGO_CACHE_SEGUNDOS", 60 if CACHE_POR_PROCESO else 3600))
+
+# Validación de alumnos: formato de matrícula (vacío = sin regla; p. ej. r"^\d{9}$")
+# y valores por IN al buscar duplicados en BD
+MATRICULA_REGEX = os.getenv("MATRICULA_REGEX", "")
+LOTE_VALIDACION_BD = int(os.getenv("LOTE_VALIDACION_BD", 900))
+VALIDACION_MAX_FILAS = int(os.getenv("VALIDACION_MAX_FILAS", 50000))
+
+# Eventos en vivo (/eventos/): buffer por cliente, historial para Last-Event-ID,
+# segundos entre heartbeats y conexiones abiertas por proceso
+SSE_BUFFER_EVENTOS = int(os.getenv("SSE_BUFFER_EVENTOS", 200))
+SSE_HISTORIAL = int(os.getenv("SSE_HISTORIAL", 1000))
+SSE_HEARTBEAT_SEGUNDOS = int(os.getenv("SSE_HEARTBEAT_SEGUNDOS", 15))
+SSE_MAX_CLIENTES = int(os.getenv("SSE_MAX_CLIENTES", 500))
+
+# Descarte por tiempo en cola (LimiteEsperaMiddleware). El proxy debe mandar
+# X-Request-Start: t=<epoch>; presupuesto en ms por prefijo de ruta (el primero que coincide)
+DEADLINE_ENCABEZADO = os.getenv("DEADLINE_ENCABEZADO", "HTTP_X_REQUEST_START")
+DEADLINE_RUTAS = [
+    ("/login/", int(os.getenv("DEADLINE_LOGIN_MS", 8000))),
+    ("/lista-", int(os.getenv("DEADLINE_LISTAS_MS", 3000))),
+    ("/eventos/", 0),
+]
+DEADLINE_DEFAULT_MS = int(os.getenv("DEADLINE_DEFAULT_MS", 10000))
+DEADLINE_RETRY_AFTER = int(os.getenv("DEADLINE_RETRY_AFTER", 2))
+
+# Perfilado bajo demanda (PerfiladorMiddleware): fracción de peticiones a perfilar
+# al azar (0 = solo con 'X-Perfilar: 1' de un admin), carpeta y perfiles a conservar.
+# En App Engine solo /tmp es escribible.
+PERFIL_MUESTREO = float(os.getenv("PERFIL_MUESTREO", 0))
+PERFIL_DIRECTORIO = os.getenv("PERFIL_DIRECTORIO", os.path.join(tempfile.gettempdir(), "perfiles"))
+PERFIL_MAX_ARCHIVOS = int(os.getenv("PERFIL_MAX_ARCHIVOS", 50))
+PERFIL_TOP_FUNCIONES = int(os.getenv("PERFIL_TOP_FUNCIONES", 40))
+
+# Periodo académico vigente ('AAAA-N'); vacío = se calcula por fecha (ene-jun = 1, jul-dic = 2)
+PERIODO_ACTUAL = os.getenv("PERIODO_ACTUAL", "")
+# Materias por lote al archivar un periodo cerrado (archivar_periodo)
+ARCHIVO_LOTE = int(os.getenv("ARCHIVO_LOTE", 200))
+
+# Índices en memoria (ocupación de salones, typeahead): cada worker rearma el suyo
+# cuando otro publica una versión nueva en la caché, y a más tardar cada INDICES_TTL_SEGUNDOS
+INDICES_TTL_SEGUNDOS = int(os.getenv("INDICES_TTL_SEGUNDOS", 300))
+
+# Sugerencias por defecto y máximas del typeahead (/typeahead/)
+TYPEAHEAD_LIMITE = int(os.getenv("TYPEAHEAD_LIMITE", 10))
+TYPEAHEAD_LIMITE_MAX = int(os.getenv("TYPEAHEAD_LIMITE_MAX", 25))
+
+# Jornada usada en el reporte de utilización de salones
+JORNADA_APERTURA = os.getenv("JORNADA_APERTURA", "07:00")
+JORNADA_CIERRE = os.getenv("JORNADA_CIERRE", "21:00")
+DIAS_HABILES = ["Lunes", "Martes", "Miercoles", "Jueves", "Viernes"]
+
+# Sincronización incremental (/cambios/): tamaño de página y margen para no
+# saltarse escrituras cuyo 'update' se asignó antes de que su transacción confirmara
+CAMBIOS_LIMITE = int(os.getenv("CAMBIOS_LIMITE", 500))
+CAMBIOS_MARGEN_SEGUNDOS = int(os.getenv("CAMBIOS_MARGEN_SEGUNDOS", 2))
+
+# Tokens Bearer: vida (se renueva al usarse) y segundos de caché de la validación.
+# La caché de tokens solo con caché compartida: en memoria, el logout o la
+# desactivación solo la limpiarían en el worker que los atendió
+TOKEN_EXPIRACION_HORAS = int(os.getenv("TOKEN_EXPIRACION_HORAS", 24))
+TOKEN_CACHE_SEGUNDOS = 0 if CACHE_POR_PROCESO else int(os.getenv("TOKEN_CACHE_SEGUNDOS", 60))
+
+# Validación de URLs remotas (DataUtils.is_url_image): (conexión, lectura) en segundos
+URL_VALIDACION_TIMEOUT = (2, 3)
+URL_VALIDACION_CONCURRENCIA = 10
+URL_IMAGEN_CACHE_SEGUNDOS = 600
+
+# Bitácora de auditoría: se escribe en lotes de AUDITORIA_LOTE o cada AUDITORIA_FLUSH_MS;
+# si la BD no responde (o al apagar) lo pendiente va al archivo de respaldo (en /tmp:
+# en App Engine el directorio de la app es de solo lectura)
+AUDITORIA_LOTE = int(os.getenv("AUDITORIA_LOTE", 200))
+AUDITORIA_FLUSH_MS = int(os.getenv("AUDITORIA_FLUSH_MS", 500))
+AUDITORIA_RESPALDO = os.getenv("AUDITORIA_RESPALDO", os.path.join(tempfile.gettempdir(), "auditoria_pendiente.jsonl"))
+
+# Inscripciones: límite de créditos por alumno (materias inscritas + lista de espera)
+MAX_CREDITOS_ALUMNO = int(os.getenv("MAX_CREDITOS_ALUMNO", 40))
+
+# Calificaciones: mínima aprobatoria (escala 0-10) y filas por bulk upsert
+CALIFICACION_MINIMA = os.getenv("CALIFICACION_MINIMA", "6")
+CALIFICACIONES_LOTE = int(os.getenv("CALIFICACIONES_LOTE", 500))
+
+# Asistencias: los check-ins se juntan en memoria y se escriben cada ASISTENCIAS_FLUSH_MS
+# o en lotes de ASISTENCIAS_LOTE (COPY en Postgres); lo que no se pudo escribir va al respaldo
+ASISTENCIAS_LOTE = int(os.getenv("ASISTENCIAS_LOTE", 2000))
+ASISTENCIAS_FLUSH_MS = int(os.getenv("ASISTENCIAS_FLUSH_MS", 1000))
+ASISTENCIAS_RESPALDO = os.getenv("ASISTENCIAS_RESPALDO", os.path.join(tempfile.gettempdir(), "asistencias_pendientes.jsonl"))
+ASISTENCIAS_MAX_REGISTROS = int(os.getenv("ASISTENCIAS_MAX_REGISTROS", 5000))
+# Llaves (alumno, materia, sesión) recientes por proceso para descartar repetidos sin tocar la BD
+ASISTENCIAS_DEDUP_LLAVES = int(os.getenv("ASISTENCIAS_DEDUP_LLAVES", 200000))
+
 REST_FRAMEWORK = {
     'COERCE_DECIMAL_TO_STRING': False,
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -131,4 +254,16 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    # JSON con orjson por defecto; MessagePack con Accept: application/msgpack
+    'DEFAULT_RENDERER_CLASSES': (
+        'control_escolar_desit_api.renderers.OrjsonRenderer',
+        'control_escolar_desit_api.renderers.MsgpackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'control_escolar_desit_api.renderers.OrjsonParser',
+        'control_escolar_desit_api.renderers.MsgpackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
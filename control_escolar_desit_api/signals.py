@@ -0,0 +1,284 @@
+import contextlib
+import contextvars
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from control_escolar_desit_api.models import BearerTokenAuthentication, Administradores, Alumnos, Maestros, Materias, Inscripciones, Calificaciones, Eliminaciones, Auditoria
+from control_escolar_desit_api.horario_utils import HorarioUtils
+from control_escolar_desit_api.ocupacion_utils import ocupacion
+from control_escolar_desit_api.catalogo_utils import CatalogoUtils
+from control_escolar_desit_api.typeahead_utils import typeahead
+from control_escolar_desit_api.reportes_utils import ReportesUtils
+from control_escolar_desit_api.calificaciones_utils import CalificacionesUtils
+from control_escolar_desit_api.inscripciones_utils import InscripcionesUtils
+from control_escolar_desit_api.eventos import difusor
+from control_escolar_desit_api import auditoria
+
+# ====================================================
+#  ARCHIVO DE PERIODOS (archivar_periodo)
+# ====================================================
+
+# Las materias de un periodo cerrado se mueven al archivo, no se eliminan: con
+# esto activo sus bajas no generan auditoría ELIMINAR, evento 'eliminar', ni
+# recálculos de horarios, índices o reportes (que solo ven el periodo actual).
+# El comando escribe los tombstones por lote y un solo evento de auditoría.
+_archivando = contextvars.ContextVar("archivando", default=False)
+
+@contextlib.contextmanager
+def archivando():
+    token = _archivando.set(True)
+    try:
+        yield
+    finally:
+        _archivando.reset(token)
+
+# ====================================================
+#  MATERIAS
+# ====================================================
+
+@receiver(pre_save, sender=Materias)
+@receiver(pre_save, sender=Alumnos)
+@receiver(pre_save, sender=Maestros)
+def guardar_estado_anterior(sender, instance, **kwargs):
+    # Guardamos el estado previo para saber a quién más afecta el cambio
+    # (p. ej. el profesor anterior cuando se reasigna la materia) y para
+    # el diff de la auditoría
+    instance._estado_anterior = None
+    if instance.pk:
+        instance._estado_anterior = sender.objects.filter(pk=instance.pk).values().first()
+
+@receiver(post_save, sender=Materias)
+@receiver(post_delete, sender=Materias)
+def materia_cambio(sender, instance, **kwargs):
+    if _archivando.get():
+        return
+    profesores = [instance.profesor_id]
+    anterior = getattr(instance, "_estado_anterior", None)
+    if anterior:
+        profesores.append(anterior["profesor_id"])
+
+    user_ids = list(Maestros.objects.filter(id__in=[p for p in profesores if p]).values_list("user_id", flat=True))
+    user_ids += list(Inscripciones.objects.filter(materia_id=instance.pk).values_list("alumno__user_id", flat=True))
+    HorarioUtils.invalidar_horarios(user_ids)
+
+@receiver(post_save, sender=Materias)
+@receiver(post_delete, sender=Materias)
+def materia_catalogo(sender, instance, **kwargs):
+    # Tras el commit: si la versión sube antes, otra petición puede guardar las
+    # filas previas al commit bajo la versión nueva
+    transaction.on_commit(CatalogoUtils.invalidar, robust=True)
+
+# Los índices en memoria se tocan tras el commit: un rollback no debe dejarlos adelantados
+@receiver(post_save, sender=Materias)
+def materia_ocupacion(sender, instance, **kwargs):
+    transaction.on_commit(lambda: ocupacion.actualizar_materia(instance), robust=True)
+
+@receiver(post_delete, sender=Materias)
+def materia_ocupacion_baja(sender, instance, **kwargs):
+    if _archivando.get():
+        return
+    materia_id = instance.pk
+    transaction.on_commit(lambda: ocupacion.quitar_materia(materia_id), robust=True)
+
+@receiver(post_save, sender=Materias)
+@receiver(post_delete, sender=Materias)
+def materia_reportes(sender, instance, **kwargs):
+    # Junta las filas tocadas; el recálculo va tras el commit, una vez por
+    # transacción, para que las agregaciones vean las filas ya escritas
+    if _archivando.get():
+        return
+    despues = {"profesor_id": instance.profesor_id, "programa_educativo": instance.programa_educativo, "salon": instance.salon}
+    ReportesUtils.actualizar_materia(getattr(instance, "_estado_anterior", None), despues)
+
+@receiver(post_save, sender=Materias)
+def materia_calificaciones(sender, instance, created, **kwargs):
+    # Los resúmenes se ajustan por diferencia; si cambian los créditos de una
+    # materia ya calificada se rehacen los de sus alumnos
+    antes = getattr(instance, "_estado_anterior", None)
+    if created or not antes or int(antes["creditos"]) == int(instance.creditos):
+        return
+    alumno_ids = list(Calificaciones.objects.filter(materia_id=instance.pk).values_list("alumno_id", flat=True))
+    if alumno_ids:
+        transaction.on_commit(lambda: CalificacionesUtils.recalcular(alumno_ids), robust=True)
+
+# ====================================================
+#  INSCRIPCIONES
+# ====================================================
+
+@receiver(post_save, sender=Inscripciones)
+@receiver(post_delete, sender=Inscripciones)
+def inscripcion_cambio(sender, instance, **kwargs):
+    if _archivando.get():
+        return
+    user_id = Alumnos.objects.filter(id=instance.alumno_id).values_list("user_id", flat=True).first()
+    HorarioUtils.invalidar_horarios([user_id])
+
+@receiver(post_delete, sender=Inscripciones)
+def inscripcion_libera_lugar(sender, instance, origin=None, **kwargs):
+    # Bajas en cascada (se borra el alumno o su User): sin esto el contador
+    # nunca baja y el lugar se pierde. dar_de_baja() libera el suyo por su
+    # cuenta, y si se borra la materia no hay lugar que devolver.
+    if instance.estado != Inscripciones.INSCRITO or getattr(instance, "_lugar_liberado", False):
+        return
+    if getattr(origin, "model", type(origin)) is Materias:
+        return
+    InscripcionesUtils.liberar_lugar(instance.materia_id)
+
+# ====================================================
+#  SINCRONIZACIÓN INCREMENTAL ('update' y tombstones)
+# ====================================================
+
+# Cambios del User que se ven en los perfiles (nombre, correo, activo)
+CAMPOS_USER_PERFIL = {"first_name", "last_name", "email", "is_active"}
+
+@receiver(post_save, sender=User)
+def user_actualiza_perfil(sender, instance, created, update_fields=None, **kwargs):
+    # El login guarda solo last_login: eso no cambia el perfil
+    if created or (update_fields is not None and not CAMPOS_USER_PERFIL & set(update_fields)):
+        return
+    ahora = timezone.now()
+    for modelo in (Administradores, Alumnos, Maestros):
+        modelo.objects.filter(user_id=instance.pk).update(update=ahora)
+
+ENTIDADES_SYNC = {
+    Administradores: "admins",
+    Alumnos: "alumnos",
+    Maestros: "maestros",
+    Materias: "materias",
+}
+
+@receiver(post_delete, sender=Administradores)
+@receiver(post_delete, sender=Alumnos)
+@receiver(post_delete, sender=Maestros)
+@receiver(post_delete, sender=Materias)
+def registrar_eliminacion(sender, instance, **kwargs):
+    if _archivando.get():
+        return
+    Eliminaciones.objects.create(entidad=ENTIDADES_SYNC[sender], entidad_id=instance.pk)
+
+# ====================================================
+#  AUDITORÍA (se encola tras el commit; la escritura es en lotes)
+# ====================================================
+
+ENTIDADES_AUDITADAS = {
+    Alumnos: "alumnos",
+    Maestros: "maestros",
+    Materias: "materias",
+    User: "usuarios",
+}
+
+def _cambio_de_perfil(update_fields):
+    return update_fields is None or bool(CAMPOS_USER_PERFIL & set(update_fields))
+
+@receiver(pre_save, sender=User)
+def user_estado_anterior(sender, instance, update_fields=None, **kwargs):
+    instance._estado_anterior = None
+    if instance.pk and _cambio_de_perfil(update_fields):
+        instance._estado_anterior = User.objects.filter(pk=instance.pk).values(*CAMPOS_USER_PERFIL).first()
+
+@receiver(post_save, sender=Alumnos)
+@receiver(post_save, sender=Maestros)
+@receiver(post_save, sender=Materias)
+@receiver(post_save, sender=User)
+def auditar_guardado(sender, instance, created, update_fields=None, **kwargs):
+    entidad = ENTIDADES_AUDITADAS[sender]
+    if sender is User:
+        if not created and not _cambio_de_perfil(update_fields):
+            return
+        despues = {campo: getattr(instance, campo) for campo in CAMPOS_USER_PERFIL}
+    else:
+        despues = auditoria.valores(instance)
+
+    if created:
+        auditoria.registrar(entidad, instance.pk, Auditoria.CREAR, despues)
+        return
+    cambios = auditoria.diferencias(getattr(instance, "_estado_anterior", None) or {}, despues)
+    if cambios:
+        auditoria.registrar(entidad, instance.pk, Auditoria.EDITAR, cambios)
+
+@receiver(post_delete, sender=Alumnos)
+@receiver(post_delete, sender=Maestros)
+@receiver(post_delete, sender=Materias)
+def auditar_eliminacion(sender, instance, **kwargs):
+    if _archivando.get():
+        return
+    auditoria.registrar(ENTIDADES_AUDITADAS[sender], instance.pk, Auditoria.ELIMINAR, auditoria.valores(instance))
+
+# ====================================================
+#  TYPEAHEAD (índice de prefijos en memoria)
+# ====================================================
+
+@receiver(post_save, sender=Alumnos)
+def alumno_typeahead(sender, instance, **kwargs):
+    transaction.on_commit(lambda: typeahead.actualizar_persona("alumnos", instance), robust=True)
+
+@receiver(post_save, sender=Maestros)
+def maestro_typeahead(sender, instance, **kwargs):
+    transaction.on_commit(lambda: typeahead.actualizar_persona("maestros", instance), robust=True)
+
+@receiver(post_save, sender=Materias)
+def materia_typeahead(sender, instance, **kwargs):
+    transaction.on_commit(lambda: typeahead.actualizar_materia(instance), robust=True)
+
+@receiver(post_save, sender=User)
+def user_typeahead(sender, instance, created, update_fields=None, **kwargs):
+    # Un User recién creado todavía no tiene perfil: lo indexa el post_save del perfil
+    if not created and _cambio_de_perfil(update_fields):
+        transaction.on_commit(lambda: typeahead.actualizar_usuario(instance), robust=True)
+
+@receiver(post_delete, sender=Alumnos)
+@receiver(post_delete, sender=Maestros)
+@receiver(post_delete, sender=Materias)
+def typeahead_baja(sender, instance, **kwargs):
+    if _archivando.get():
+        return
+    entidad, entidad_id = ENTIDADES_AUDITADAS[sender], instance.pk
+    transaction.on_commit(lambda: typeahead.quitar(entidad, entidad_id), robust=True)
+
+# ====================================================
+#  EVENTOS EN VIVO (SSE, /eventos/)
+# ====================================================
+
+@receiver(post_save, sender=Administradores)
+@receiver(post_save, sender=Alumnos)
+@receiver(post_save, sender=Maestros)
+@receiver(post_save, sender=Materias)
+def publicar_cambio(sender, instance, created, **kwargs):
+    version = instance.update.isoformat() if instance.update else None
+    accion = "crear" if created else "editar"
+    transaction.on_commit(lambda: difusor.publicar(ENTIDADES_SYNC[sender], instance.pk, accion, version), robust=True)
+
+@receiver(post_delete, sender=Administradores)
+@receiver(post_delete, sender=Alumnos)
+@receiver(post_delete, sender=Maestros)
+@receiver(post_delete, sender=Materias)
+def publicar_eliminacion(sender, instance, **kwargs):
+    if _archivando.get():
+        return
+    entidad_id = instance.pk
+    transaction.on_commit(lambda: difusor.publicar(ENTIDADES_SYNC[sender], entidad_id, "eliminar", None), robust=True)
+
+# ====================================================
+#  TOKENS (caché de la validación Bearer)
+# ====================================================
+
+# El token cacheado trae una copia del User: si se desactiva o se borra, la
+# copia seguiría pasando el chequeo de is_active hasta que venza la caché
+@receiver(post_save, sender=User)
+def user_olvida_tokens(sender, instance, created, update_fields=None, **kwargs):
+    if created or not _cambio_de_perfil(update_fields):
+        return
+    llaves = list(Token.objects.filter(user_id=instance.pk).values_list("key", flat=True))
+    for llave in llaves:
+        transaction.on_commit(lambda llave=llave: BearerTokenAuthentication.olvidar(llave), robust=True)
+
+# Cubre el logout y el borrado del User (el token se va en cascada)
+@receiver(post_delete, sender=Token)
+def token_olvidado(sender, instance, **kwargs):
+    llave = instance.key
+    transaction.on_commit(lambda: BearerTokenAuthentication.olvidar(llave), robust=True)
@@ -0,0 +1,68 @@
+import datetime
+
+from django.contrib.auth.models import Group, User
+from django.utils import timezone
+
+from control_escolar_desit_api.models import (
+    Administradores, Alumnos, Maestros, Materias, Inscripciones, Calificaciones, AsistenciaSesion, Auditoria,
+)
+
+# Datos sembrados para las pruebas de consultas y los benchmarks (bench_campos)
+
+def sembrar(n):
+    """n registros de cada entidad; regresa los ids que usan los parámetros"""
+    marca = "qb%d" % n
+    grupos = {nombre: Group.objects.get_or_create(name=nombre)[0] for nombre in ("administrador", "maestro", "alumno")}
+    usuarios = {}
+    for rol in grupos:
+        User.objects.bulk_create([
+            User(username="%s-%s-%d" % (marca, rol, i), email="%s-%s-%d@qb.local" % (marca, rol, i),
+                 first_name="Ana%d" % i, last_name="Apellido%d" % i, is_active=True)
+            for i in range(n)
+        ])
+        usuarios[rol] = list(User.objects.filter(username__startswith="%s-%s-" % (marca, rol)).order_by("id"))
+        grupos[rol].user_set.add(*usuarios[rol])
+    User.objects.filter(id=usuarios["administrador"][0].id).update(is_staff=True, is_superuser=True)
+
+    Administradores.objects.bulk_create([Administradores(user=u, clave_admin="A%d" % i) for i, u in enumerate(usuarios["administrador"])])
+    Maestros.objects.bulk_create([
+        Maestros(user=u, id_trabajador="T%d" % i, materias_json='["Algoritmos"]') for i, u in enumerate(usuarios["maestro"])
+    ])
+    Alumnos.objects.bulk_create([Alumnos(user=u, matricula="2%08d" % i) for i, u in enumerate(usuarios["alumno"])])
+    admins = list(Administradores.objects.filter(user__in=usuarios["administrador"]).order_by("id").values_list("id", flat=True))
+    maestros = list(Maestros.objects.filter(user__in=usuarios["maestro"]).order_by("id").values_list("id", flat=True))
+    alumnos = list(Alumnos.objects.filter(user__in=usuarios["alumno"]).order_by("id").values_list("id", flat=True))
+
+    Materias.objects.bulk_create([
+        Materias(
+            nrc="%05d" % i, nombre="Algoritmos %d" % i, seccion="1", dias='["Lunes", "Miercoles"]',
+            hora_inicio=datetime.time(7 + i % 12), hora_fin=datetime.time(8 + i % 12), salon="S%d" % (i % 7),
+            programa_educativo="P%d" % (i % 3), creditos=1 + i % 5, cupo=n, profesor_id=maestros[i % len(maestros)],
+        ) for i in range(n)
+    ])
+    materias = list(Materias.objects.filter(nrc__in=["%05d" % i for i in range(n)]).order_by("id").values_list("id", flat=True))
+
+    # Todos en la primera materia; el primer alumno además en lista de espera de las demás
+    Inscripciones.objects.bulk_create(
+        [Inscripciones(alumno_id=a, materia_id=materias[0]) for a in alumnos]
+        + [Inscripciones(alumno_id=alumnos[0], materia_id=m, estado=Inscripciones.ESPERA) for m in materias[1:]]
+        + [Inscripciones(alumno_id=a, materia_id=materias[1], estado=Inscripciones.ESPERA) for a in alumnos[1:]]
+    )
+    Materias.objects.filter(id=materias[0]).update(inscritos=n)
+    Calificaciones.objects.bulk_create([Calificaciones(alumno_id=a, materia_id=materias[0], calificacion=8) for a in alumnos])
+    hoy = timezone.localdate()
+    AsistenciaSesion.objects.bulk_create([
+        AsistenciaSesion(materia_id=materias[0], sesion=hoy - datetime.timedelta(days=i), presentes=n) for i in range(n)
+    ])
+    Auditoria.objects.bulk_create([
+        Auditoria(entidad="alumnos", entidad_id=a, accion=Auditoria.EDITAR, cambios={}, fecha=timezone.now()) for a in alumnos
+    ])
+    return {
+        "n": n,
+        "usuarios": {rol: lista[0] for rol, lista in usuarios.items()},
+        "admin": admins[0],
+        "materia": materias[0],
+        "alumnos_csv": ",".join(map(str, alumnos)),
+        "maestros_csv": ",".join(map(str, maestros)),
+        "materias_csv": ",".join(map(str, materias)),
+    }
@@ -0,0 +1,113 @@
+import datetime
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.utils import timezone
+
+from control_escolar_desit_api import asistencias_utils
+from control_escolar_desit_api.asistencias_utils import AsistenciasUtils
+from control_escolar_desit_api.models import Alumnos, Maestros, Materias, Inscripciones, Asistencias, AsistenciaSesion
+
+# ====================================================
+#  CHECK-INS: DEDUPLICACIÓN Y ESCRITURA POR LOTES
+# ====================================================
+
+class AsistenciasLotesTests(TestCase):
+    """encolar() con el escritor en pausa: los lotes se escriben a mano con
+    _escribir(), que en Postgres usa COPY y en las demás el bulk_create"""
+
+    @classmethod
+    def setUpTestData(cls):
+        maestro = Maestros.objects.create(user=User.objects.create(username="prof", email="prof@x.com"))
+        cls.materia = Materias.objects.create(nrc="20001", nombre="Redes", seccion="1", profesor=maestro)
+        cls.alumnos = [
+            Alumnos.objects.create(user=User.objects.create(username="a%d" % i, email="a%d@x.com" % i)) for i in range(4)
+        ]
+        # 0 y 1 inscritos, 2 en lista de espera, 3 sin inscripción
+        Inscripciones.objects.create(alumno=cls.alumnos[0], materia=cls.materia)
+        Inscripciones.objects.create(alumno=cls.alumnos[1], materia=cls.materia)
+        Inscripciones.objects.create(alumno=cls.alumnos[2], materia=cls.materia, estado=Inscripciones.ESPERA)
+        cls.hoy = timezone.localdate()
+
+    def setUp(self):
+        asistencias_utils._recientes.clear()
+        self.encolados = []
+        parche = mock.patch.object(asistencias_utils.escritor, "agregar", side_effect=self.encolados.append)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def llave(self, alumno, dias_atras=0):
+        return (alumno.id, self.materia.id, (self.hoy - datetime.timedelta(days=dias_atras)).isoformat())
+
+    def vaciar(self):
+        """Escribe lo encolado como lo haría el hilo del escritor"""
+        lote, self.encolados[:] = list(self.encolados), []
+        asistencias_utils._escribir(lote)
+
+    def assertPresentesCuadran(self):
+        for sesion in AsistenciaSesion.objects.filter(materia=self.materia):
+            filas = Asistencias.objects.filter(materia=self.materia, sesion=sesion.sesion).count()
+            self.assertEqual(sesion.presentes, filas, sesion.sesion)
+
+    def test_deduplica_en_memoria(self):
+        self.assertEqual(AsistenciasUtils.encolar([self.llave(self.alumnos[0])] * 3), (1, 2))
+        self.assertEqual(AsistenciasUtils.encolar([self.llave(self.alumnos[0]), self.llave(self.alumnos[1])]), (1, 1))
+        self.assertEqual(len(self.encolados), 2)
+
+    def test_descarta_no_inscritos_y_los_olvida(self):
+        llaves = [self.llave(a) for a in self.alumnos]
+        AsistenciasUtils.encolar(llaves)
+        self.vaciar()
+        self.assertEqual(
+            set(Asistencias.objects.values_list("alumno_id", flat=True)), {self.alumnos[0].id, self.alumnos[1].id}
+        )
+        self.assertPresentesCuadran()
+        # Lista de espera y sin inscripción no quedan como repetidos: el reintento entra
+        self.assertEqual(AsistenciasUtils.encolar(llaves), (2, 2))
+
+    def test_presentes_igual_a_filas_insertadas(self):
+        AsistenciasUtils.encolar([self.llave(self.alumnos[0]), self.llave(self.alumnos[0], 1)])
+        self.vaciar()
+        # Otro worker (sin la llave en memoria) manda repetidos de lo ya escrito
+        asistencias_utils._recientes.clear()
+        AsistenciasUtils.encolar([self.llave(self.alumnos[0]), self.llave(self.alumnos[1]), self.llave(self.alumnos[1], 1)])
+        self.vaciar()
+        self.assertEqual(Asistencias.objects.count(), 4)
+        self.assertEqual(
+            dict(AsistenciaSesion.objects.filter(materia=self.materia).values_list("sesion", "presentes")),
+            {self.hoy: 2, self.hoy - datetime.timedelta(days=1): 2},
+        )
+        self.assertPresentesCuadran()
+
+    def test_falla_al_escribir_olvida_las_llaves(self):
+        llave = self.llave(self.alumnos[0])
+        AsistenciasUtils.encolar([llave])
+        with mock.patch.object(asistencias_utils, "_escribir_postgres", side_effect=DatabaseError), \
+                mock.patch.object(asistencias_utils, "_escribir_generico", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.vaciar()
+        self.assertNotIn(llave, asistencias_utils._recientes)
+        self.assertEqual(AsistenciasUtils.encolar([llave]), (1, 0))
+        self.vaciar()
+        self.assertEqual(Asistencias.objects.count(), 1)
+        self.assertPresentesCuadran()
+
+    def registros(self, *llaves):
+        registrada = timezone.now().isoformat()
+        return [{"alumno_id": a, "materia_id": m, "sesion": s, "registrada": registrada} for a, m, s in llaves]
+
+    def test_ruta_generica(self):
+        llaves = [self.llave(self.alumnos[0]), self.llave(self.alumnos[1]), self.llave(self.alumnos[3])]
+        escritas = asistencias_utils._escribir_generico(self.registros(*llaves, llaves[0]))
+        self.assertEqual(escritas, set(llaves[:2]))
+        self.assertEqual(asistencias_utils._escribir_generico(self.registros(*llaves)), set())
+        self.assertPresentesCuadran()
+
+    @skipUnless(connection.vendor == "postgresql", "COPY solo existe en Postgres")
+    def test_ruta_copy(self):
+        llaves = [self.llave(self.alumnos[0]), self.llave(self.alumnos[1]), self.llave(self.alumnos[3])]
+        escritas = asistencias_utils._escribir_postgres(self.registros(*llaves, llaves[0]))
+        self.assertEqual(escritas, set(llaves[:2]))
+        self.assertPresentesCuadran()
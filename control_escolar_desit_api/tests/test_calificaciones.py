@@ -0,0 +1,108 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from control_escolar_desit_api import auditoria
+from control_escolar_desit_api.models import (
+    Alumnos, Maestros, Materias, Inscripciones, CalificacionesArchivo, ResumenAcademico,
+)
+from control_escolar_desit_api.calificaciones_utils import CalificacionesUtils
+
+# ====================================================
+#  RESUMEN ACADÉMICO: AJUSTE POR DIFERENCIA VS. RECÁLCULO
+# ====================================================
+
+@override_settings(CALIFICACION_MINIMA="6")
+class ResumenAcademicoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        maestro = Maestros.objects.create(user=User.objects.create(username="prof", email="prof@x.com"))
+        cls.algoritmos = Materias.objects.create(nrc="10001", nombre="Algoritmos", seccion="1", creditos=4, profesor=maestro)
+        cls.redes = Materias.objects.create(nrc="10002", nombre="Redes", seccion="1", creditos=3, profesor=maestro)
+        cls.ana = Alumnos.objects.create(user=User.objects.create(username="ana", email="ana@x.com"))
+        cls.luis = Alumnos.objects.create(user=User.objects.create(username="luis", email="luis@x.com"))
+        for alumno in (cls.ana, cls.luis):
+            for materia in (cls.algoritmos, cls.redes):
+                Inscripciones.objects.create(alumno=alumno, materia=materia)
+
+    def capturar(self, materia, *filas):
+        return CalificacionesUtils.capturar(materia, [{"alumno": a.id, "calificacion": c} for a, c in filas])
+
+    def resumen(self, alumno):
+        r = ResumenAcademico.objects.get(alumno=alumno)
+        return {
+            "materias": r.materias, "creditos_cursados": r.creditos_cursados,
+            "creditos_aprobados": r.creditos_aprobados, "puntos": r.puntos, "promedio": r.promedio,
+        }
+
+    def recalculado(self, alumno):
+        """Resumen que deja recalcular_resumenes; restaura el incremental"""
+        incremental = self.resumen(alumno)
+        call_command("recalcular_resumenes", str(alumno.id), stdout=mock.Mock())
+        recalculado = self.resumen(alumno)
+        ResumenAcademico.objects.filter(alumno=alumno).update(**incremental)
+        return recalculado
+
+    def test_calificacion_nueva(self):
+        resultado = self.capturar(self.algoritmos, (self.ana, 8), (self.luis, "5.5"))
+        self.assertEqual(resultado, {"creadas": 2, "actualizadas": 0, "sin_cambio": 0})
+        self.assertEqual(self.resumen(self.ana), {
+            "materias": 1, "creditos_cursados": 4, "creditos_aprobados": 4,
+            "puntos": Decimal("32.0"), "promedio": Decimal("8.00"),
+        })
+        self.assertEqual(self.resumen(self.luis)["creditos_aprobados"], 0)
+
+    def test_cambio_de_calificacion(self):
+        self.capturar(self.algoritmos, (self.ana, 8))
+        self.capturar(self.redes, (self.ana, 10))
+        resultado = self.capturar(self.algoritmos, (self.ana, 9))
+        self.assertEqual(resultado, {"creadas": 0, "actualizadas": 1, "sin_cambio": 0})
+        self.assertEqual(self.resumen(self.ana), {
+            "materias": 2, "creditos_cursados": 7, "creditos_aprobados": 7,
+            "puntos": Decimal("66.0"), "promedio": Decimal("9.43"),
+        })
+        self.assertEqual(self.capturar(self.algoritmos, (self.ana, 9))["sin_cambio"], 1)
+
+    def test_cruza_la_minima(self):
+        self.capturar(self.algoritmos, (self.ana, 9))
+        self.capturar(self.algoritmos, (self.ana, 5))
+        self.assertEqual(self.resumen(self.ana)["creditos_aprobados"], 0)
+        self.assertEqual(self.resumen(self.ana), self.recalculado(self.ana))
+        self.capturar(self.algoritmos, (self.ana, 6))
+        self.assertEqual(self.resumen(self.ana)["creditos_aprobados"], 4)
+        self.assertEqual(self.resumen(self.ana), self.recalculado(self.ana))
+
+    def test_cambio_de_creditos_recalcula(self):
+        self.capturar(self.algoritmos, (self.ana, 8), (self.luis, 4))
+        materia = Materias.objects.get(id=self.algoritmos.id)
+        materia.creditos = 6
+        # El recálculo corre tras el commit; la auditoría no debe arrancar su hilo aquí
+        with mock.patch.object(auditoria.escritor, "agregar"), self.captureOnCommitCallbacks(execute=True):
+            materia.save()
+        self.assertEqual(self.resumen(self.ana), {
+            "materias": 1, "creditos_cursados": 6, "creditos_aprobados": 6,
+            "puntos": Decimal("48.0"), "promedio": Decimal("8.00"),
+        })
+        self.assertEqual(self.resumen(self.luis)["creditos_cursados"], 6)
+
+    def test_incremental_igual_a_recalcular(self):
+        # Con historial archivado: el ajuste parte del resumen recalculado
+        CalificacionesArchivo.objects.create(
+            id=1, periodo="2020-1", alumno_id=self.ana.id, materia_id=999, calificacion=Decimal("7.5"), creditos=5,
+        )
+        CalificacionesUtils.recalcular([self.ana.id, self.luis.id])
+        capturas = [
+            (self.algoritmos, [(self.ana, "8.5"), (self.luis, 6)]),
+            (self.redes, [(self.ana, 3), (self.luis, "9.9")]),
+            (self.algoritmos, [(self.ana, "5.9"), (self.luis, 10)]),
+            (self.redes, [(self.ana, 7), (self.luis, 0)]),
+        ]
+        for materia, filas in capturas:
+            self.capturar(materia, *filas)
+            for alumno in (self.ana, self.luis):
+                with self.subTest(materia=materia.nrc, alumno=alumno.id):
+                    self.assertEqual(self.resumen(alumno), self.recalculado(alumno))
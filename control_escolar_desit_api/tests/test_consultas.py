@@ -0,0 +1,206 @@
+import re
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from django.urls.resolvers import RegexPattern
+from rest_framework.test import APIClient
+
+from control_escolar_desit_api import warmup
+from control_escolar_desit_api.ocupacion_utils import ocupacion
+from control_escolar_desit_api.typeahead_utils import typeahead
+from control_escolar_desit_api.tests.datos import sembrar
+
+# ====================================================
+#  PRESUPUESTO DE CONSULTAS POR RUTA
+# ====================================================
+
+# (ruta de urls.py, rol, parámetros, máximo de consultas). Los listados piden
+# una página del tamaño de los datos sembrados, así que el conteo debe ser el
+# mismo con N chico y N grande; 'd' son los ids sembrados.
+RUTAS = [
+    ("admin/", "administrador", lambda d: {"id": d["admin"]}, 2),
+    ("alumnos/", "administrador", lambda d: {"ids": d["alumnos_csv"]}, 2),  # + rol para el lote
+    ("maestros/", "administrador", lambda d: {"ids": d["maestros_csv"]}, 2),
+    ("lista-admins/", "administrador", lambda d: {"page_size": d["n"]}, 3),
+    ("lista-maestros/", "administrador", lambda d: {"page_size": d["n"]}, 3),
+    ("lista-alumnos/", "administrador", lambda d: {"page_size": d["n"]}, 3),
+    # ?fields= (CamposParcialesMixin): mismas consultas, solo las columnas pedidas
+    ("lista-alumnos/", "administrador", lambda d: {"page_size": d["n"], "fields": "id,user.first_name"}, 3),
+    ("lista-maestros/", "administrador", lambda d: {"page_size": d["n"], "fields": "id,id_trabajador"}, 3),
+    ("materias/", "administrador", lambda d: {"ids": d["materias_csv"]}, 2),
+    ("lista-materias/", "administrador", lambda d: {"page_size": d["n"]}, 3),
+    ("facetas-materias/", "alumno", lambda d: {}, 2),
+    ("inscripciones/", "alumno", lambda d: {}, 4),
+    ("calificaciones/", "maestro", lambda d: {"materia": d["materia"]}, 6),
+    ("calificaciones/", "alumno", lambda d: {}, 6),
+    ("asistencias/", "maestro", lambda d: {"materia": d["materia"]}, 5),
+    ("horario/", "alumno", lambda d: {}, 3),
+    ("salones-libres/", "administrador", lambda d: {"dias": "Lunes", "hora_inicio": "07:00", "hora_fin": "09:00"}, 2),
+    ("ocupacion-salones/", "administrador", lambda d: {}, 2),
+    ("reportes/", "administrador", lambda d: {"nombre": "carga_docente"}, 10),  # en frío: genera el snapshot
+    ("typeahead/", "administrador", lambda d: {"q": "a"}, 4),
+    ("cambios/", "administrador", lambda d: {"entidad": "alumnos", "updated_since": "2000-01-01T00:00:00Z"}, 5),
+    ("auditoria/", "administrador", lambda d: {"page_size": d["n"]}, 3),
+    ("me/", "alumno", lambda d: {}, 4),
+    ("total-usuarios/", "administrador", lambda d: {}, 3),
+    ("metricas-carga/", "administrador", lambda d: {}, 1),
+    ("perfiles/", "administrador", lambda d: {}, 1),
+    ("_ah/warmup", None, lambda d: {}, 6),
+]
+
+# Changelists del admin de Django (sesión de superusuario)
+CHANGELISTS = [
+    ("django-admin/control_escolar_desit_api/administradores/", 4),
+    ("django-admin/control_escolar_desit_api/alumnos/", 4),
+    ("django-admin/control_escolar_desit_api/maestros/", 4),
+    ("django-admin/control_escolar_desit_api/materias/", 6),
+]
+
+# Rutas que no se miden, con el motivo
+EXCLUIDAS = {
+    "validar-alumnos/": "solo POST",
+    "asignar-horarios/": "solo POST",
+    "eventos/": "flujo SSE que no termina",
+    "archivos/": "descarga en streaming desde el almacenamiento",
+    "login/": "solo POST",
+    "logout/": "borra el token",
+    "django-admin/": "se mide con CHANGELISTS",
+}
+
+CHICO, GRANDE = 3, 30
+
+def _patron(sql):
+    """SQL sin literales, para agrupar las consultas repetidas (N+1)"""
+    sql = re.sub(r"'[^']*'", "?", sql)
+    sql = re.sub(r'"s\d+_x\d+"', '"?"', sql)  # nombres de savepoint
+    sql = re.sub(r"\b\d+\b", "?", sql)
+    return re.sub(r"\(\s*\?(\s*,\s*\?)*\s*\)", "(...)", sql)
+
+def _reporte_sql(sql_chico, sql_grande):
+    """Cada consulta de la corrida grande; marca con !! los patrones que aparecen
+    más veces que en la corrida chica y con * los que se repiten"""
+    veces_chico = Counter(_patron(sql) for sql in sql_chico)
+    veces_grande = Counter(_patron(sql) for sql in sql_grande)
+    lineas, vistos = [], set()
+    for sql in sql_grande:
+        patron = _patron(sql)
+        if patron in vistos:
+            continue
+        vistos.add(patron)
+        marca = "  "
+        if veces_grande[patron] > veces_chico[patron]:
+            marca = "!!"
+        elif veces_grande[patron] > 1:
+            marca = " *"
+        lineas.append("  %s x%-3d %s" % (marca, veces_grande[patron], sql[:300]))
+    return "\n".join(lineas)
+
+# Caché propia: las respuestas cacheadas no deben esconder consultas
+@override_settings(CACHES={"default": {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "pruebas-consultas",
+}})
+class PresupuestoConsultasTests(TestCase):
+    """Cada GET de urls.py se llama con CHICO y GRANDE registros sembrados; falla
+    si pasa de su presupuesto o si sus consultas crecen con los datos (N+1)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.medidas = {n: cls.medir(n) for n in (CHICO, GRANDE)}
+
+    @classmethod
+    def medir(cls, n):
+        """{índice en RUTAS o ruta de CHANGELISTS: [sql]} con n registros sembrados"""
+        resultados = {}
+        with transaction.atomic():
+            datos = sembrar(n)
+            clientes = {None: APIClient()}
+            for rol, user in datos["usuarios"].items():
+                clientes[rol] = APIClient()
+                clientes[rol].force_authenticate(user)
+            for i, (ruta, rol, parametros, _) in enumerate(RUTAS):
+                resultados[i] = cls.llamar(clientes[rol], "/" + ruta, parametros(datos))
+            sesion = APIClient()
+            sesion.force_login(datos["usuarios"]["administrador"])
+            for ruta, _ in CHANGELISTS:
+                resultados[ruta] = cls.llamar(sesion, "/" + ruta, {})
+            transaction.set_rollback(True)
+        return resultados
+
+    @staticmethod
+    def llamar(cliente, ruta, parametros):
+        # En frío: sin caché ni índices en memoria de la llamada anterior
+        cache.clear()
+        ocupacion._construido = False
+        typeahead._construido = False
+        warmup._hecho = False
+        with CaptureQueriesContext(connection) as capturadas:
+            respuesta = cliente.get(ruta, parametros)
+        if respuesta.status_code >= 400:
+            raise AssertionError("%s respondió %d: %s" % (ruta, respuesta.status_code, getattr(respuesta, "data", "")))
+        return [q["sql"] for q in capturadas.captured_queries]
+
+    def revisar(self, llave, ruta, rol, presupuesto):
+        sql_chico, sql_grande = self.medidas[CHICO][llave], self.medidas[GRANDE][llave]
+        with self.subTest(ruta=ruta, rol=rol, llave=llave):
+            reporte = _reporte_sql(sql_chico, sql_grande)
+            self.assertLessEqual(len(sql_grande), presupuesto, "pasa de su presupuesto\n" + reporte)
+            self.assertEqual(len(sql_grande), len(sql_chico), "crece con los datos (N+1)\n" + reporte)
+
+    def test_rutas_con_presupuesto(self):
+        """Toda ruta de urls.py debe tener presupuesto o estar en EXCLUIDAS"""
+        conocidas = {ruta for ruta, _, _, _ in RUTAS} | set(EXCLUIDAS)
+        faltantes = []
+        for patron in get_resolver().url_patterns:
+            if isinstance(patron.pattern, RegexPattern):
+                continue  # static() de MEDIA_URL, solo existe con DEBUG
+            ruta = str(patron.pattern)
+            if ruta not in conocidas and not (isinstance(patron, URLResolver) and ruta in EXCLUIDAS):
+                faltantes.append(ruta)
+        self.assertEqual(faltantes, [], "sin presupuesto en RUTAS ni motivo en EXCLUIDAS")
+
+    def test_presupuesto_api(self):
+        for i, (ruta, rol, _, presupuesto) in enumerate(RUTAS):
+            self.revisar(i, ruta, rol, presupuesto)
+
+    def test_presupuesto_changelists_admin(self):
+        for ruta, presupuesto in CHANGELISTS:
+            self.revisar(ruta, ruta, "superusuario", presupuesto)
+
+    # ----------------------------------------------------
+    # Campos parciales (?fields=): columnas y JOIN del SELECT
+    # ----------------------------------------------------
+
+    def listado(self, ruta, campos, tabla):
+        """Columnas (tabla, columna) del SELECT de la página medida con n grande"""
+        i = next(i for i, (r, _, parametros, _) in enumerate(RUTAS) if r == ruta and parametros({"n": 0}).get("fields") == campos)
+        desde = "FROM " + connection.ops.quote_name(tabla)
+        sql = next(q for q in self.medidas[GRANDE][i] if desde in q and "COUNT(" not in q)
+        columnas = re.findall(r"(\S+)\.(\S+?)(?:,|\s+FROM)", sql[:sql.index(desde) + 5])
+        return sql, {(t.strip('"`'), c.strip('"`')) for t, c in columnas}
+
+    def test_campos_parciales_con_user(self):
+        alumnos, user = "control_escolar_desit_api_alumnos", "auth_user"
+        sql, columnas = self.listado("lista-alumnos/", "id,user.first_name", alumnos)
+        self.assertIn("JOIN " + connection.ops.quote_name(user), sql)
+        self.assertEqual(columnas, {(alumnos, "id"), (alumnos, "user_id"), (user, "id"), (user, "first_name")})
+
+    def test_campos_parciales_sin_user(self):
+        maestros = "control_escolar_desit_api_maestros"
+        # El JOIN a auth_user sigue (filtro is_active y orden), pero no trae columnas de user
+        _, columnas = self.listado("lista-maestros/", "id,id_trabajador", maestros)
+        self.assertEqual(columnas, {(maestros, "id"), (maestros, "id_trabajador")})
+
+    def test_campo_no_permitido(self):
+        cliente = APIClient()
+        cliente.force_authenticate(sembrar(2)["usuarios"]["administrador"])
+        for ruta in ("/lista-alumnos/", "/alumnos/"):
+            with self.subTest(ruta=ruta), CaptureQueriesContext(connection) as capturadas:
+                respuesta = cliente.get(ruta, {"fields": "id,user.password", "id": 1})
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn("user.password", respuesta.data["message"])
+                # Se rechaza antes de consultar la tabla
+                self.assertFalse([q for q in capturadas.captured_queries if "control_escolar_desit_api_alumnos" in q["sql"]])
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from control_escolar_desit_api import data_utils
+from control_escolar_desit_api.data_utils import DataUtils
+
+# ====================================================
+#  VALIDACIÓN DE URLS DE IMAGEN (servidor HTTP local)
+# ====================================================
+
+# ruta -> (status, content-type, segundos de espera)
+RESPUESTAS = {
+    "/foto.png": (200, "image/png", 0),
+    "/foto.jpg": (200, "image/jpeg; charset=binary", 0),
+    "/pagina": (200, "text/html; charset=utf-8", 0),
+    "/no-existe.png": (404, "image/png", 0),
+    "/lenta.png": (200, "image/png", 1),
+}
+
+class _Servidor(BaseHTTPRequestHandler):
+    peticiones = Counter()
+
+    def do_HEAD(self):
+        self.peticiones[self.path] += 1
+        status, content_type, espera = RESPUESTAS.get(self.path, (404, "text/plain", 0))
+        time.sleep(espera)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class UrlImagenTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Servidor)
+        cls.servidor.daemon_threads = True
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.base = "http://127.0.0.1:%d" % cls.servidor.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        data_utils._cache_urls.clear()
+        _Servidor.peticiones.clear()
+
+    def test_content_type_de_imagen(self):
+        self.assertTrue(DataUtils.is_url_image(self.base + "/foto.png"))
+        self.assertTrue(DataUtils.is_url_image(self.base + "/foto.jpg"))
+
+    def test_content_type_que_no_es_imagen(self):
+        self.assertFalse(DataUtils.is_url_image(self.base + "/pagina"))
+        self.assertFalse(DataUtils.is_url_image(self.base + "/no-existe.png"))
+
+    def test_acierto_de_cache(self):
+        for _ in range(3):
+            self.assertTrue(DataUtils.is_url_image(self.base + "/foto.png"))
+            self.assertFalse(DataUtils.is_url_image(self.base + "/pagina"))
+        self.assertEqual(_Servidor.peticiones, {"/foto.png": 1, "/pagina": 1})
+
+    def test_timeout(self):
+        inicio = time.perf_counter()
+        self.assertFalse(DataUtils.is_url_image(self.base + "/lenta.png", timeout=0.2))
+        self.assertLess(time.perf_counter() - inicio, 0.9)
+
+    def test_sesion_compartida(self):
+        self.assertIs(DataUtils.http_session(), DataUtils.http_session())
+
+    def test_varias_a_la_vez(self):
+        urls = [self.base + "/foto.png", self.base + "/pagina", self.base + "/lenta.png", self.base + "/foto.png"]
+        self.assertEqual(DataUtils.are_urls_images(urls, concurrencia=2, timeout=0.2), {
+            self.base + "/foto.png": True, self.base + "/pagina": False, self.base + "/lenta.png": False,
+        })
+        self.assertEqual(_Servidor.peticiones["/foto.png"], 1)
@@ -0,0 +1,214 @@
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+from control_escolar_desit_api.version_utils import VersionCompartida
+
+# Tipos de documento del índice (mismo nombre que usan /cambios/ y /auditoria/)
+TIPOS = ("alumnos", "maestros", "materias")
+
+def normalizar(texto):
+    """'  José PÉREZ ' -> 'jose perez' (sin acentos, minúsculas, un solo espacio)"""
+    if not texto:
+        return ""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.lower().split())
+
+class IndicePrefijos:
+    """Índice de prefijos en memoria para el typeahead de personas y materias.
+
+    Por tipo hay una lista ordenada de tuplas (termino, id): buscar un prefijo
+    es un bisect más un recorrido de a lo más 'limite' llaves. Cada documento
+    aporta su nombre completo en ambos órdenes, cada palabra suelta y su clave
+    (matrícula, id de trabajador o NRC); de materias solo entran las del
+    periodo actual.
+    Se construye desde la BD y se mantiene con las señales (tras el commit).
+    Cada proceso (worker) tiene su propia copia: los cambios de otros llegan
+    por la versión compartida, o a más tardar al vencer INDICES_TTL_SEGUNDOS."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._construido = False
+        self._construido_en = 0.0
+        self._periodo = None
+        self._version = None
+        self._compartida = VersionCompartida("typeahead")
+        self._llaves = {tipo: [] for tipo in TIPOS}  # tipo -> [(termino, id)] ordenada
+        self._docs = {}        # (tipo, id) -> resultado que regresa la búsqueda
+        self._terminos = {}    # (tipo, id) -> [terminos] para poder quitarlo
+
+    # ------------------------------------------------
+    # Construcción y mantenimiento
+    # ------------------------------------------------
+
+    @staticmethod
+    def terminos_persona(nombre, apellidos, clave):
+        nombre, apellidos = normalizar(nombre), normalizar(apellidos)
+        terminos = {(nombre + " " + apellidos).strip(), (apellidos + " " + nombre).strip(), normalizar(clave)}
+        terminos.update((nombre + " " + apellidos).split())
+        return sorted(t for t in terminos if t)
+
+    @staticmethod
+    def terminos_materia(nrc, nombre):
+        nombre = normalizar(nombre)
+        terminos = {nombre, normalizar(nrc)}
+        terminos.update(nombre.split())
+        return sorted(t for t in terminos if t)
+
+    def construir(self):
+        from control_escolar_desit_api.models import Alumnos, Maestros, Materias
+
+        # La versión se lee antes que las filas: un cambio a media construcción dispara otra
+        version = self._compartida.leer()
+        documentos = []
+        alumnos = Alumnos.objects.filter(user__is_active=1).values_list(
+            "id", "matricula", "user__first_name", "user__last_name"
+        )
+        for pk, matricula, nombre, apellidos in alumnos:
+            documentos.append(self._persona("alumnos", pk, nombre, apellidos, matricula))
+        maestros = Maestros.objects.filter(user__is_active=1).values_list(
+            "id", "id_trabajador", "user__first_name", "user__last_name"
+        )
+        for pk, id_trabajador, nombre, apellidos in maestros:
+            documentos.append(self._persona("maestros", pk, nombre, apellidos, id_trabajador))
+        periodo = PeriodoUtils.actual()
+        for pk, nrc, nombre, seccion in Materias.objects.filter(periodo=periodo).values_list("id", "nrc", "nombre", "seccion"):
+            documentos.append(self._materia(pk, nrc, nombre, seccion))
+
+        llaves, docs, terminos = {tipo: [] for tipo in TIPOS}, {}, {}
+        for (tipo, pk), doc, doc_terminos in documentos:
+            docs[(tipo, pk)] = doc
+            terminos[(tipo, pk)] = doc_terminos
+            llaves[tipo].extend((t, pk) for t in doc_terminos)
+        for lista in llaves.values():
+            lista.sort()
+        with self._lock:
+            self._llaves, self._docs, self._terminos = llaves, docs, terminos
+            self._periodo = periodo
+            self._version = version
+            self._construido_en = time.monotonic()
+            self._construido = True
+
+    def asegurar_construido(self):
+        if (not self._construido or self._periodo != PeriodoUtils.actual()
+                or time.monotonic() - self._construido_en > settings.INDICES_TTL_SEGUNDOS
+                or self._compartida.leer() != self._version):
+            self.construir()
+
+    def _persona(self, tipo, pk, nombre, apellidos, clave):
+        doc = {
+            "tipo": tipo,
+            "id": pk,
+            "nombre": (str(nombre or "") + " " + str(apellidos or "")).strip(),
+            "clave": clave,
+        }
+        return (tipo, pk), doc, IndicePrefijos.terminos_persona(nombre, apellidos, clave)
+
+    def _materia(self, pk, nrc, nombre, seccion):
+        doc = {"tipo": "materias", "id": pk, "nombre": nombre, "clave": nrc, "seccion": seccion}
+        return ("materias", pk), doc, IndicePrefijos.terminos_materia(nrc, nombre)
+
+    # Las actualizaciones se llaman tras el commit y avisan a los demás workers
+
+    def actualizar_persona(self, tipo, perfil):
+        """Alta/cambio de un Alumnos o Maestros; los inactivos salen del índice"""
+        if not perfil.user.is_active:
+            self.quitar(tipo, perfil.pk)
+            return
+        version = self._compartida.incrementar()
+        if not self._construido:
+            return
+        clave = perfil.matricula if tipo == "alumnos" else perfil.id_trabajador
+        self._reemplazar(*self._persona(tipo, perfil.pk, perfil.user.first_name, perfil.user.last_name, clave), version)
+
+    def actualizar_usuario(self, user):
+        """Cambio de nombre o baja lógica de un User: re-indexa sus perfiles"""
+        from control_escolar_desit_api.models import Alumnos, Maestros
+        for tipo, modelo in (("alumnos", Alumnos), ("maestros", Maestros)):
+            for perfil in modelo.objects.filter(user_id=user.pk):
+                perfil.user = user
+                self.actualizar_persona(tipo, perfil)
+
+    def actualizar_materia(self, materia):
+        if materia.periodo != PeriodoUtils.actual():
+            self.quitar("materias", materia.pk)
+            return
+        version = self._compartida.incrementar()
+        if not self._construido:
+            return
+        self._reemplazar(*self._materia(materia.pk, materia.nrc, materia.nombre, materia.seccion), version)
+
+    def quitar(self, tipo, pk):
+        version = self._compartida.incrementar()
+        if not self._construido:
+            return
+        with self._lock:
+            self._quitar((tipo, pk))
+            self._adoptar(version)
+
+    def _reemplazar(self, llave_doc, doc, terminos, version):
+        with self._lock:
+            self._quitar(llave_doc)
+            self._docs[llave_doc] = doc
+            self._terminos[llave_doc] = terminos
+            tipo, pk = llave_doc
+            for termino in terminos:
+                insort(self._llaves[tipo], (termino, pk))
+            self._adoptar(version)
+
+    def _adoptar(self, version):
+        # Si nadie más cambió desde nuestra versión, el cambio local basta y no hay que rearmar
+        if self._version is not None and version == self._version + 1:
+            self._version = version
+
+    def _quitar(self, llave_doc):
+        tipo, pk = llave_doc
+        lista = self._llaves[tipo]
+        self._docs.pop(llave_doc, None)
+        for termino in self._terminos.pop(llave_doc, ()):
+            i = bisect_left(lista, (termino, pk))
+            if i < len(lista) and lista[i] == (termino, pk):
+                del lista[i]
+
+    # ------------------------------------------------
+    # Consultas
+    # ------------------------------------------------
+
+    def buscar(self, prefijo, limite=10, tipos=TIPOS):
+        """Primeros 'limite' documentos con algún término que empiece con 'prefijo'.
+
+        Sale en orden alfabético por término, así una coincidencia exacta
+        (p. ej. la matrícula completa) queda primero. Cada documento aparece
+        una sola vez."""
+        prefijo = normalizar(prefijo)
+        if not prefijo:
+            return []
+        self.asegurar_construido()
+        candidatos = []
+        with self._lock:
+            for tipo in tipos:
+                lista, vistos = self._llaves[tipo], set()
+                i = bisect_left(lista, (prefijo,))
+                while i < len(lista) and len(vistos) < limite:
+                    termino, pk = lista[i]
+                    i += 1
+                    if not termino.startswith(prefijo):
+                        break
+                    if pk not in vistos:
+                        vistos.add(pk)
+                        candidatos.append((termino, tipo, pk))
+            # Cada tipo aporta a lo más 'limite'; se mezclan por término
+            candidatos.sort()
+            return [self._docs[(tipo, pk)] for _, tipo, pk in candidatos[:limite]]
+
+    def tamano(self):
+        with self._lock:
+            return {"terminos": sum(len(l) for l in self._llaves.values()), "documentos": len(self._docs)}
+
+# Instancia única por proceso
+typeahead = IndicePrefijos()
@@ -2,12 +2,13 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from control_escolar_desit_api.views import users, alumnos, maestros, auth, materias_view # <--- IMPORTAR materias_view
+from control_escolar_desit_api.views import users, alumnos, maestros, auth, materias_view, inscripciones, horario, salones, asignacion, cambios, archivos, warmup, auditoria, typeahead, reportes, eventos, metricas, perfiles, calificaciones, asistencias # <--- IMPORTAR materias_view
 
 urlpatterns = [
     # --- GESTIÓN (CRUD) ---
     path('admin/', users.AdminView.as_view()),
     path('alumnos/', alumnos.AlumnosView.as_view()),
+    path('validar-alumnos/', alumnos.ValidarAlumnosView.as_view()), # Diagnóstico CURP/RFC/matrícula por lote
     path('maestros/', maestros.MaestrosView.as_view()),
     
     # --- LISTADOS AVANZADOS ---
@@ -18,12 +19,46 @@ urlpatterns = [
     # --- MATERIAS ---
     path('materias/', materias_view.MateriasView.as_view()), # CRUD (Post, Put, Delete, Get one)
     path('lista-materias/', materias_view.MateriasList.as_view()), # Listado (Page, Sort, Filter)
+    path('facetas-materias/', materias_view.MateriasFacetas.as_view()), # Conteos por programa, créditos, días y profesor
+
+    # --- INSCRIPCIONES ---
+    path('inscripciones/', inscripciones.InscripcionesView.as_view()), # Inscribir, baja, listar (con lista de espera)
+
+    # --- CALIFICACIONES ---
+    path('calificaciones/', calificaciones.CalificacionesView.as_view()), # Captura por sección (bulk upsert) y resumen del alumno
+
+    # --- ASISTENCIAS ---
+    path('asistencias/', asistencias.AsistenciasView.as_view()), # Check-ins en lote (buffer + COPY) y tasa por sección ?materia=
     
+    # --- HORARIOS ---
+    path('horario/', horario.HorarioView.as_view()), # Rejilla semanal del usuario (cacheada)
+    path('salones-libres/', salones.SalonesLibresView.as_view()), # Salones libres en días/horas
+    path('ocupacion-salones/', salones.OcupacionSalonesView.as_view()), # Utilización por salón
+    path('asignar-horarios/', asignacion.AsignarHorariosView.as_view()), # Solver de salón/horario (dry-run por defecto)
+
+    # --- REPORTES ---
+    path('reportes/', reportes.ReportesView.as_view()), # Snapshots materializados ?nombre=
+
+    # --- BÚSQUEDA ---
+    path('typeahead/', typeahead.TypeaheadView.as_view()), # Sugerencias por prefijo ?q=&tipos=&limite=
+
+    # --- SINCRONIZACIÓN ---
+    path('cambios/', cambios.CambiosView.as_view()), # Changefeed ?entidad=&updated_since= / ?cursor=
+    path('eventos/', eventos.EventosView.as_view()), # SSE de avisos de cambio ?token=&entidades=
+    path('auditoria/', auditoria.AuditoriaAll.as_view()), # Bitácora ?entidad=&entidad_id=&desde=&hasta=
+
+    # --- ARCHIVOS ---
+    path('archivos/', archivos.ArchivosView.as_view()), # Subida por bloques a almacenamiento (local / GCS)
+
     # --- SISTEMA ---
     path('me/', users.UserProfileView.as_view()), # Perfil
     path('total-usuarios/', users.TotalUsers.as_view()),
     path('login/', auth.CustomAuthToken.as_view()),
     path('logout/', auth.Logout.as_view()),
+    path('metricas-carga/', metricas.MetricasCargaView.as_view()), # Contadores del descarte por tiempo en cola
+    path('perfiles/', perfiles.PerfilesView.as_view()), # Perfiles cProfile + SQL (header X-Perfilar: 1)
+    path('_ah/warmup', warmup.WarmupView.as_view()), # Warmup de App Engine (inbound_services: warmup)
+    path('django-admin/', admin.site.urls), # Admin de Django ('admin/' ya es la API de administradores)
 ]
 
 if settings.DEBUG:
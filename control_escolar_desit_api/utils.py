@@ -1,6 +1,9 @@
 import random
 import string
 import base64
+import json
+import mimetypes
+import os
 
 class Utils:
 
@@ -16,22 +19,50 @@ class Utils:
         digits = string.digits
         return ''.join(random.choice(digits) for i in range(numberLength))
 
+    @staticmethod
+    def decodeJsonField(data, field):
+        """Convierte un campo guardado como string JSON (materias_json, dias) a lista """
+        if isinstance(data.get(field), str):
+            try:
+                data[field] = json.loads(data[field])
+            except Exception:
+                data[field] = []
+        return data
+
     @staticmethod
     def requestRawFileToB64(file):
         file_b64 = str(base64.b64encode(file.read()).decode())
         return file_b64
 
+    # Firmas (magic bytes) de los formatos que aceptamos
+    MAGIC_BYTES = (
+        (b"\xff\xd8\xff", "image/jpeg"),
+        (b"\x89PNG\r\n\x1a\n", "image/png"),
+        (b"GIF87a", "image/gif"),
+        (b"GIF89a", "image/gif"),
+        (b"%PDF-", "application/pdf"),
+        (b"PK\x03\x04", "application/zip"),
+        (b"\x1a\x45\xdf\xa3", "video/webm"),
+    )
+
+    @staticmethod
+    def mimeFromBytes(head):
+        """Detecta el tipo por los primeros bytes del archivo (no por el nombre)"""
+        for firma, content_type in Utils.MAGIC_BYTES:
+            if head.startswith(firma):
+                return content_type
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return "image/webp"
+        if head[4:8] == b"ftyp":
+            return "video/x-m4v" if head[8:11] == b"M4V" else "video/mp4"
+        return "application/octet-stream"
+
     @staticmethod
     def mimeFromFilename(filename):
-        content_type = ""
-        if '.mp4' in filename:
-            content_type = "video/mp4"
-        elif '.m4v' in filename:
-            content_type = "video/mp4"
-        else:
-            content_type = "application/octet-stream"
-        
-        return content_type
+        extension = os.path.splitext(filename or "")[1].lower()
+        if extension in (".mp4", ".m4v"):
+            return "video/mp4"
+        return mimetypes.guess_type("x" + extension)[0] or "application/octet-stream"
 
     @staticmethod
     def requestFileToB64(logo):
@@ -0,0 +1,186 @@
+import datetime
+import re
+
+from django.conf import settings
+from django.db.models.functions import Lower
+
+# ====================================================
+#  FORMATOS (RENAPO / SAT)
+# ====================================================
+
+# CURP: 4 letras, fecha AAMMDD, sexo, entidad, 3 consonantes internas,
+# homoclave (dígito si nació antes de 2000, letra después) y dígito verificador
+CURP_REGEX = re.compile(r"^([A-Z][AEIOUX][A-Z]{2})(\d{6})([HMX])([A-Z]{2})([B-DF-HJ-NP-TV-Z]{3})([0-9A-Z])(\d)$")
+ENTIDADES_CURP = frozenset((
+    "AS", "BC", "BS", "CC", "CL", "CM", "CS", "CH", "DF", "DG", "GT", "GR", "HG", "JC", "MC", "MN",
+    "MS", "NT", "NL", "OC", "PL", "QT", "QR", "SP", "SL", "SR", "TC", "TS", "TL", "VZ", "YN", "ZS", "NE",
+))
+# RFC: 4 letras (persona física) o 3 (moral), fecha AAMMDD y homoclave de 3
+RFC_REGEX = re.compile(r"^([A-ZÑ&]{3,4})(\d{6})([A-Z0-9]{2})([0-9A])$")
+
+# Valor de cada carácter para los dígitos verificadores
+VALORES_CURP = {c: i for i, c in enumerate("0123456789ABCDEFGHIJKLMNÑOPQRSTUVWXYZ")}
+VALORES_RFC = {c: i for i, c in enumerate("0123456789ABCDEFGHIJKLMN&OPQRSTUVWXYZ Ñ")}
+
+MENSAJES = {
+    "formato": "Formato inválido",
+    "fecha": "Fecha inválida",
+    "entidad": "Entidad federativa inválida",
+    "verificador": "Dígito verificador incorrecto",
+    "duplicado_lote": "Repetido dentro del lote",
+    "duplicado_bd": "Ya registrado",
+}
+
+# Regex compiladas de settings (MATRICULA_REGEX)
+_patrones = {}
+
+# Fechas AAMMDD válidas (100 años); se arma una vez y después es un lookup
+_fechas = None
+
+def _fechas_validas():
+    global _fechas
+    if _fechas is None:
+        dia, fin, fechas = datetime.date(2000, 1, 1), datetime.date(2100, 1, 1), set()
+        while dia < fin:
+            fechas.add(dia.strftime("%y%m%d"))
+            dia += datetime.timedelta(days=1)
+        _fechas = frozenset(fechas)
+    return _fechas
+
+class ValidacionUtils:
+
+    @staticmethod
+    def verificador_curp(curp17):
+        suma = sum(VALORES_CURP.get(c, 0) * (18 - i) for i, c in enumerate(curp17))
+        return str((10 - suma % 10) % 10)
+
+    @staticmethod
+    def verificador_rfc(rfc_sin_verificador):
+        # Las personas morales (12 caracteres) se alinean con un espacio al inicio
+        base = rfc_sin_verificador.rjust(12)
+        suma = sum(VALORES_RFC.get(c, 0) * (13 - i) for i, c in enumerate(base))
+        digito = 11 - suma % 11
+        return "0" if digito == 11 else "A" if digito == 10 else str(digito)
+
+    @staticmethod
+    def validar_curp(curp):
+        """Lista de códigos de error (vacía si la CURP es válida)"""
+        partes = CURP_REGEX.match(curp)
+        if partes is None:
+            return ["formato"]
+        errores = []
+        if partes.group(2) not in _fechas_validas():
+            errores.append("fecha")
+        if partes.group(4) not in ENTIDADES_CURP:
+            errores.append("entidad")
+        if ValidacionUtils.verificador_curp(curp[:17]) != curp[17]:
+            errores.append("verificador")
+        return errores
+
+    @staticmethod
+    def validar_rfc(rfc):
+        partes = RFC_REGEX.match(rfc)
+        if partes is None:
+            return ["formato"]
+        errores = []
+        if partes.group(2) not in _fechas_validas():
+            errores.append("fecha")
+        if ValidacionUtils.verificador_rfc(rfc[:-1]) != rfc[-1]:
+            errores.append("verificador")
+        return errores
+
+    @staticmethod
+    def validar_matricula(matricula):
+        # La matrícula institucional no tiene dígito verificador: solo formato, si se configuró
+        patron = settings.MATRICULA_REGEX
+        if not patron:
+            return []
+        if patron not in _patrones:
+            _patrones[patron] = re.compile(patron)
+        return [] if _patrones[patron].match(matricula) else ["formato"]
+
+    # ------------------------------------------------
+    # Lotes
+    # ------------------------------------------------
+
+    @staticmethod
+    def normalizar_fila(fila):
+        return {
+            "matricula": str(fila.get("matricula") or "").strip(),
+            "curp": str(fila.get("curp") or "").strip().upper(),
+            "rfc": str(fila.get("rfc") or "").strip().upper(),
+            "email": str(fila.get("email") or "").strip().lower(),
+        }
+
+    @staticmethod
+    def existentes(valores, excluir_alumno_id=None):
+        """Valores ya registrados en la BD: un IN por campo y bloque de
+        LOTE_VALIDACION_BD valores (en vez de un exists() por fila)"""
+        from django.contrib.auth.models import User
+        from control_escolar_desit_api.models import Alumnos
+
+        bloque = settings.LOTE_VALIDACION_BD
+        encontrados = {campo: set() for campo in valores}
+        for campo, conjunto in valores.items():
+            lista = sorted(conjunto)
+            for i in range(0, len(lista), bloque):
+                parte = lista[i:i + bloque]
+                if campo == "email":
+                    # Los del lote ya vienen en minúsculas; en la BD pueden no estarlo
+                    consulta = User.objects.annotate(email_minusculas=Lower("email")).filter(email_minusculas__in=parte)
+                    if excluir_alumno_id:
+                        consulta = consulta.exclude(alumnos__id=excluir_alumno_id)
+                    encontrados[campo].update(v.lower() for v in consulta.values_list("email", flat=True))
+                else:
+                    consulta = Alumnos.objects.filter(**{campo + "__in": parte})
+                    if excluir_alumno_id:
+                        consulta = consulta.exclude(id=excluir_alumno_id)
+                    encontrados[campo].update(consulta.values_list(campo, flat=True))
+        return encontrados
+
+    @staticmethod
+    def validar_lote(filas, contra_bd=True, excluir_alumno_id=None):
+        """Diagnóstico por fila: formatos, dígitos verificadores y duplicados.
+
+        Los duplicados dentro del lote se detectan con un índice en memoria
+        (valor -> primera fila que lo usó) y contra la BD con un IN por campo
+        y bloque. Regresa [{"fila", "valido", "errores": [{campo, codigo, mensaje}]}]."""
+        validadores = {
+            "matricula": ValidacionUtils.validar_matricula,
+            "curp": ValidacionUtils.validar_curp,
+            "rfc": ValidacionUtils.validar_rfc,
+        }
+        normalizadas = [ValidacionUtils.normalizar_fila(f) for f in filas]
+        errores = [[] for _ in normalizadas]
+        primera = {campo: {} for campo in ("matricula", "curp", "rfc", "email")}
+
+        for i, fila in enumerate(normalizadas):
+            for campo, valor in fila.items():
+                if not valor:
+                    continue
+                if campo in validadores:
+                    for codigo in validadores[campo](valor):
+                        errores[i].append((campo, codigo, None))
+                anterior = primera[campo].setdefault(valor, i)
+                if anterior != i:
+                    errores[i].append((campo, "duplicado_lote", anterior))
+
+        if contra_bd:
+            registrados = ValidacionUtils.existentes(
+                {campo: set(indice) for campo, indice in primera.items()}, excluir_alumno_id
+            )
+            for i, fila in enumerate(normalizadas):
+                for campo, valor in fila.items():
+                    if valor and valor in registrados[campo]:
+                        errores[i].append((campo, "duplicado_bd", None))
+
+        diagnostico = []
+        for i, lista in enumerate(errores):
+            detalle = []
+            for campo, codigo, otra in lista:
+                error = {"campo": campo, "codigo": codigo, "mensaje": MENSAJES[codigo]}
+                if otra is not None:
+                    error["fila_original"] = otra
+                detalle.append(error)
+            diagnostico.append({"fila": i, "valido": not detalle, "errores": detalle})
+        return diagnostico
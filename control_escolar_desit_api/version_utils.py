@@ -0,0 +1,23 @@
+from django.core.cache import cache
+
+class VersionCompartida:
+    """Contador en la caché que avisa a los demás workers que un índice en
+    memoria cambió. Con una caché compartida (CACHE_BACKEND) el aviso llega a
+    todos; con LocMem solo al propio proceso y el TTL del índice acota lo viejo."""
+
+    def __init__(self, llave):
+        self.llave = "version:" + llave
+
+    def leer(self):
+        return cache.get(self.llave, 0)
+
+    def incrementar(self):
+        """Regresa la versión nueva"""
+        if cache.add(self.llave, 1, timeout=None):
+            return 1
+        try:
+            return cache.incr(self.llave)
+        except ValueError:
+            # Expulsada entre el add y el incr
+            cache.set(self.llave, 1, timeout=None)
+            return 1
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db.models import *
 from django.db import transaction
 from control_escolar_desit_api.serializers import UserSerializer, AlumnoSerializer
@@ -7,31 +8,48 @@ from rest_framework.response import Response
 from django.contrib.auth.models import Group
 from django.shortcuts import get_object_or_404
 # Importamos la configuración desde users.py
-from .users import StandardResultsPagination, IsAdminMaestroOrAlumno
+from control_escolar_desit_api.validacion_utils import ValidacionUtils
+from .users import StandardResultsPagination, IsAdmin, IsAdminOrMaestro, IsAdminMaestroOrAlumno, respuesta_por_ids, revisar_permisos, CamposParcialesMixin, CAMPOS_USER
 
 # LISTA AVANZADA (Paginación + Search + Sort)
-class AlumnosAll(generics.ListAPIView):
+class AlumnosAll(CamposParcialesMixin, generics.ListAPIView):
     permission_classes = (permissions.IsAuthenticated, IsAdminMaestroOrAlumno) 
     serializer_class = AlumnoSerializer 
-    queryset = Alumnos.objects.filter(user__is_active=1).order_by("id") 
+    queryset = Alumnos.objects.filter(user__is_active=1).select_related("user").order_by("id") 
     pagination_class = StandardResultsPagination
     filter_backends = (filters.OrderingFilter, filters.SearchFilter)
     ordering_fields = ['id', 'matricula', 'user__first_name', 'user__last_name']
     ordering = ['user__last_name']
     search_fields = ['user__first_name', 'user__last_name', 'matricula', 'curp']
+    campos_permitidos = (
+        "id", "matricula", "curp", "rfc", "fecha_nacimiento", "edad", "telefono", "ocupacion", "creation", "update",
+    ) + CAMPOS_USER
 
 # CRUD (Crear, Editar, Eliminar)
-class AlumnosView(generics.CreateAPIView):
+class AlumnosView(CamposParcialesMixin, generics.CreateAPIView):
+    campos_permitidos = AlumnosAll.campos_permitidos
+
     def get(self, request, *args, **kwargs):
-        alumno = get_object_or_404(Alumnos, id=request.GET.get("id"))
-        return Response(AlumnoSerializer(alumno).data, 200)
+        try:
+            campos = self.campos_pedidos(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, 400)
+        queryset = self.limitar(Alumnos.objects.select_related("user"), campos)
+        if request.GET.get("ids"):
+            revisar_permisos(self, request, (permissions.IsAuthenticated, IsAdminOrMaestro))
+            return respuesta_por_ids(request.GET["ids"], queryset, AlumnoSerializer, campos=campos)
+        alumno = get_object_or_404(queryset, id=request.GET.get("id"))
+        return Response(AlumnoSerializer(alumno, campos=campos).data, 200)
 
     @transaction.atomic
     def post(self, request, *args, **kwargs):
         user = UserSerializer(data=request.data)
         if user.is_valid():
-            if User.objects.filter(email=request.data['email']).exists():
+            if User.objects.filter(email__iexact=request.data['email'].strip()).exists():
                 return Response({"message": "Email ya registrado"}, 400)
+            errores = ValidacionUtils.validar_lote([request.data])[0]["errores"]
+            if errores:
+                return Response({"message": "Datos del alumno inválidos", "errores": errores}, 400)
 
             user = User.objects.create(
                 username=request.data['email'], email=request.data['email'],
@@ -53,9 +71,14 @@ class AlumnosView(generics.CreateAPIView):
     @transaction.atomic
     def put(self, request, *args, **kwargs):
         alumno = get_object_or_404(Alumnos, id=request.data["id"])
+        # Mismas reglas que al registrar; sus propios valores no cuentan como duplicados
+        fila = {campo: request.data.get(campo) for campo in ("matricula", "curp", "rfc")}
+        errores = ValidacionUtils.validar_lote([fila], excluir_alumno_id=alumno.id)[0]["errores"]
+        if errores:
+            return Response({"message": "Datos del alumno inválidos", "errores": errores}, 400)
         alumno.matricula = request.data["matricula"]
-        alumno.curp = request.data["curp"]
-        alumno.rfc = request.data["rfc"]
+        alumno.curp = request.data["curp"].upper()
+        alumno.rfc = request.data["rfc"].upper()
         alumno.fecha_nacimiento = request.data["fecha_nacimiento"]
         alumno.edad = request.data["edad"]
         alumno.telefono = request.data["telefono"]
@@ -70,4 +93,26 @@ class AlumnosView(generics.CreateAPIView):
     def delete(self, request, *args, **kwargs):
         alumno = get_object_or_404(Alumnos, id=request.GET.get("id"))
         alumno.user.delete()
-        return Response({"message": "Alumno eliminado"}, 200)
\ No newline at end of file
+        return Response({"message": "Alumno eliminado"}, 200)
+
+# VALIDACIÓN POR LOTES (POST /validar-alumnos/)
+# {"alumnos": [{"matricula", "curp", "rfc", "email"}, ...]} -> diagnóstico por fila, sin guardar nada
+class ValidarAlumnosView(generics.CreateAPIView):
+    permission_classes = (permissions.IsAuthenticated, IsAdmin)
+
+    def post(self, request, *args, **kwargs):
+        filas = request.data.get("alumnos")
+        if not isinstance(filas, list) or not all(isinstance(f, dict) for f in filas):
+            return Response({"message": "Se espera 'alumnos' como lista de objetos"}, 400)
+        if len(filas) > settings.VALIDACION_MAX_FILAS:
+            return Response({"message": "Máximo " + str(settings.VALIDACION_MAX_FILAS) + " filas por lote"}, 400)
+
+        diagnostico = ValidacionUtils.validar_lote(filas)
+        validas = sum(1 for d in diagnostico if d["valido"])
+        return Response({
+            "total": len(diagnostico),
+            "validas": validas,
+            "invalidas": len(diagnostico) - validas,
+            # Solo las filas con errores; las demás se dan por buenas
+            "errores": [d for d in diagnostico if not d["valido"]],
+        }, 200)
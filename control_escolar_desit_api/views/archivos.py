@@ -0,0 +1,48 @@
+from django.http import FileResponse, Http404
+from rest_framework import permissions, generics
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from control_escolar_desit_api.puentes.storage import StorageBridge, ArchivoDemasiadoGrande, ImagenDemasiadoGrande
+from control_escolar_desit_api.utils import Utils
+from .users import IsAdmin, IsAdminMaestroOrAlumno
+
+# ====================================================
+# ARCHIVOS (POST /archivos/ multipart, GET /archivos/?nombre=)
+# ====================================================
+class ArchivosView(generics.CreateAPIView):
+    permission_classes = (permissions.IsAuthenticated, IsAdminMaestroOrAlumno)
+    parser_classes = (MultiPartParser,)
+
+    # SUBIR: se copia al almacenamiento por bloques, sin base64 ni lectura completa
+    def post(self, request, *args, **kwargs):
+        archivo = request.FILES.get("archivo")
+        if archivo is None:
+            return Response({"message": "Falta el archivo"}, 400)
+        try:
+            data = StorageBridge.guardar_upload(archivo, carpeta=str(request.user.id))
+        except ArchivoDemasiadoGrande:
+            return Response({"message": "El archivo excede el tamaño máximo permitido"}, 400)
+        except ImagenDemasiadoGrande:
+            return Response({"message": "La imagen excede las dimensiones máximas permitidas"}, 400)
+        return Response(data, 201)
+
+    # Cada quien sube a la carpeta de su id (ver post); el admin puede leer todas
+    def _puede_leer(self, request, nombre):
+        partes = nombre.split("/")
+        if len(partes) != 2 or not all(partes) or ".." in partes or "\\" in nombre:
+            return False
+        return partes[0] == str(request.user.id) or IsAdmin().has_permission(request, self)
+
+    # DESCARGAR: se sirve en streaming desde el backend
+    def get(self, request, *args, **kwargs):
+        nombre = request.GET.get("nombre", "")
+        backend = StorageBridge.backend()
+        try:
+            # 404 también para lo ajeno: no se revela qué existe
+            if not self._puede_leer(request, nombre) or not backend.existe(nombre):
+                raise Http404
+            archivo = backend.abrir(nombre)
+        except ValueError:
+            raise Http404
+        return FileResponse(archivo, content_type=Utils.mimeFromFilename(nombre))
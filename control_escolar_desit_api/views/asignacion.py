@@ -0,0 +1,155 @@
+import json
+from django.db import transaction
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.models import Materias
+from control_escolar_desit_api.horario_utils import HorarioUtils
+from control_escolar_desit_api.asignacion_utils import AsignacionUtils, PATRONES_DEFAULT, FRANJAS_DEFAULT
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+from .users import IsAdmin
+
+# ====================================================
+# ASIGNACIÓN AUTOMÁTICA DE SALÓN / HORARIO (POST /asignar-horarios/)
+# ====================================================
+class AsignarHorariosView(generics.CreateAPIView):
+    """Asigna salón, días y hora a las materias incompletas de un programa.
+
+    Por defecto es dry-run: regresa el diff propuesto sin guardar nada.
+    Con "aplicar": true guarda la asignación."""
+    permission_classes = (permissions.IsAuthenticated, IsAdmin)
+
+    def _formato(self, hora):
+        return hora.strftime("%H:%M") if hasattr(hora, "strftime") else hora
+
+    # Lo que manda el cliente llega tal cual al proceso del solver: forma y
+    # valores se revisan aquí para responder 400 y no un 500 desde allá
+    def _franjas(self, valor):
+        if not isinstance(valor, list) or not valor:
+            raise ValueError("'franjas' debe ser una lista de horas HH:MM")
+        for franja in valor:
+            if HorarioUtils.hora_valida(franja) >= 24 * 60:
+                raise ValueError("Franja fuera del día: " + franja)
+        return valor
+
+    def _patrones(self, valor):
+        if not isinstance(valor, list) or not valor:
+            raise ValueError("'patrones' debe ser una lista de listas de días")
+        for patron in valor:
+            if not isinstance(patron, list) or not patron or not all(isinstance(d, str) for d in patron):
+                raise ValueError("Cada patrón debe ser una lista de días")
+            if len(HorarioUtils.dias_materia(patron)) != len({HorarioUtils.normalizar_dia(d) for d in patron}):
+                raise ValueError("Días inválidos en el patrón: " + ", ".join(patron))
+        return valor
+
+    def _salones(self, valor):
+        if not isinstance(valor, list) or not all(isinstance(s, str) and s.strip() for s in valor):
+            raise ValueError("'salones' debe ser una lista de nombres de salón")
+        return valor
+
+    def post(self, request, *args, **kwargs):
+        programa = request.data.get("programa_educativo")
+        if not programa:
+            return Response({"message": "Falta el programa educativo"}, 400)
+        # "false" como texto no debe aplicar la asignación
+        aplicar = request.data.get("aplicar", False)
+        if isinstance(aplicar, str):
+            aplicar = {"true": True, "1": True, "si": True, "false": False, "0": False, "no": False, "": False}.get(aplicar.strip().lower(), aplicar)
+        if aplicar not in (True, False, None):
+            return Response({"message": "'aplicar' debe ser true o false"}, 400)
+        aplicar = bool(aplicar)
+        try:
+            duracion_default = int(request.data.get("duracion", 90))
+            segundos = min(float(request.data.get("tiempo_max", 10)), 60)
+        except (TypeError, ValueError):
+            return Response({"message": "'duracion' y 'tiempo_max' deben ser numéricos"}, 400)
+        if duracion_default <= 0 or not segundos > 0:
+            return Response({"message": "'duracion' y 'tiempo_max' deben ser mayores que 0"}, 400)
+        try:
+            franjas, patrones, salones = (request.data.get(c) for c in ("franjas", "patrones", "salones"))
+            franjas = FRANJAS_DEFAULT if franjas is None else self._franjas(franjas)
+            patrones = PATRONES_DEFAULT if patrones is None else self._patrones(patrones)
+            salones = None if salones is None else self._salones(salones)
+        except ValueError as e:
+            return Response({"message": str(e)}, 400)
+
+        # Solo el periodo actual: lo archivado o pasado no ocupa salones
+        vigentes = Materias.objects.filter(periodo=PeriodoUtils.actual())
+        materias = list(vigentes.filter(programa_educativo=programa).order_by("id"))
+        incompletas = [
+            m for m in materias
+            if not (m.salon and m.hora_inicio and HorarioUtils.dias_materia(m.dias))
+        ]
+        if not incompletas:
+            return Response({"message": "No hay materias por asignar", "cambios": []}, 200)
+
+        salones = salones or sorted(set(
+            vigentes.exclude(salon__isnull=True).exclude(salon="").values_list("salon", flat=True)
+        ))
+        if not salones:
+            return Response({"message": "No hay salones disponibles; envía la lista 'salones'"}, 400)
+
+        secciones = []
+        for m in incompletas:
+            if m.hora_inicio and m.hora_fin:
+                duracion = HorarioUtils.minutos(m.hora_fin) - HorarioUtils.minutos(m.hora_inicio)
+            else:
+                duracion = duracion_default
+            secciones.append({
+                "id": m.id,
+                "profesor": m.profesor_id,
+                "duracion": duracion,
+                "dias": HorarioUtils.dias_materia(m.dias) or None,
+                "hora_inicio": self._formato(m.hora_inicio) if m.hora_inicio else None,
+                "salon": m.salon or None,
+            })
+
+        # Todo lo demás que ya tiene horario ocupa salones y profesores
+        fijas = [
+            {
+                "profesor": f["profesor_id"],
+                "salon": f["salon"],
+                "dias": f["dias"],
+                "hora_inicio": self._formato(f["hora_inicio"]),
+                "hora_fin": self._formato(f["hora_fin"]),
+            }
+            for f in vigentes.exclude(id__in=[s["id"] for s in secciones])
+            .exclude(hora_inicio__isnull=True).exclude(hora_fin__isnull=True)
+            .values("profesor_id", "salon", "dias", "hora_inicio", "hora_fin")
+        ]
+
+        resultado = AsignacionUtils.resolver_en_proceso(secciones, fijas, salones, franjas, patrones, segundos)
+
+        por_id = {m.id: m for m in incompletas}
+        cambios = []
+        for materia_id, nueva in resultado["asignacion"].items():
+            m = por_id[materia_id]
+            cambios.append({
+                "id": m.id,
+                "nrc": m.nrc,
+                "nombre": m.nombre,
+                "antes": {
+                    "salon": m.salon,
+                    "dias": HorarioUtils.dias_materia(m.dias),
+                    "hora_inicio": self._formato(m.hora_inicio),
+                    "hora_fin": self._formato(m.hora_fin),
+                },
+                "despues": nueva,
+            })
+
+        if aplicar and cambios:
+            with transaction.atomic():
+                for cambio in cambios:
+                    m = por_id[cambio["id"]]
+                    m.salon = cambio["despues"]["salon"]
+                    m.dias = json.dumps(cambio["despues"]["dias"])
+                    m.hora_inicio = cambio["despues"]["hora_inicio"]
+                    m.hora_fin = cambio["despues"]["hora_fin"]
+                    m.save(update_fields=["salon", "dias", "hora_inicio", "hora_fin", "update"])
+
+        return Response({
+            "aplicado": aplicar,
+            "cambios": cambios,
+            "sin_asignar": resultado["sin_asignar"],
+            "tiempo_agotado": resultado["tiempo_agotado"],
+        }, 200)
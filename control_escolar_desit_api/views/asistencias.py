@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.models import Alumnos, Maestros, Materias
+from control_escolar_desit_api.asistencias_utils import AsistenciasUtils, AsistenciaError
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+from .users import IsAdminMaestroOrAlumno
+
+# ====================================================
+# ASISTENCIAS (GET, POST /asistencias/)
+# ====================================================
+class AsistenciasView(generics.CreateAPIView):
+    permission_classes = (permissions.IsAuthenticated, IsAdminMaestroOrAlumno)
+
+    def _rol(self, request):
+        grupos = set(request.user.groups.values_list("name", flat=True))
+        for rol in ("administrador", "maestro", "alumno"):
+            if rol in grupos:
+                return rol
+        return None
+
+    # TASA DE ASISTENCIA DE UNA SECCIÓN (?materia=): sale de los contadores por sesión
+    def get(self, request, *args, **kwargs):
+        try:
+            materia = Materias.objects.filter(id=int(request.GET.get("materia"))).first()
+        except (TypeError, ValueError):
+            materia = None
+        if materia is None:
+            return Response({"message": "La materia no existe"}, 404)
+        if self._rol(request) != "administrador" and not Maestros.objects.filter(id=materia.profesor_id, user=request.user).exists():
+            return Response({"message": "Solo el profesor de la materia o un administrador"}, 403)
+        return Response(AsistenciasUtils.tasas(materia), 200)
+
+    # CHECK-INS EN LOTE: {"registros": [{"alumno", "materia", "sesion"?}]}
+    # o pase de lista: {"materia", "sesion"?, "alumnos": [ids]}
+    def post(self, request, *args, **kwargs):
+        if isinstance(request.data.get("alumnos"), list):
+            registros = [
+                {"alumno": alumno, "materia": request.data.get("materia"), "sesion": request.data.get("sesion")}
+                for alumno in request.data["alumnos"]
+            ]
+        else:
+            registros = request.data.get("registros")
+        if not isinstance(registros, list) or not registros:
+            return Response({"message": "Se esperaba una lista 'registros' o 'alumnos'"}, 400)
+        if len(registros) > settings.ASISTENCIAS_MAX_REGISTROS:
+            return Response({"message": "Máximo " + str(settings.ASISTENCIAS_MAX_REGISTROS) + " registros por petición"}, 400)
+
+        rol = self._rol(request)
+        hoy = timezone.localdate()
+        try:
+            if rol == "alumno":
+                # El alumno solo registra su propia asistencia y solo la de hoy;
+                # las sesiones pasadas las captura el maestro o un administrador
+                alumno_id = Alumnos.objects.filter(user=request.user).values_list("id", flat=True).first()
+                if alumno_id is None:
+                    return Response({"message": "Perfil de alumno no encontrado"}, 404)
+                if any(isinstance(r, dict) and r.get("sesion") not in (None, "", hoy.isoformat()) for r in registros):
+                    raise AsistenciaError("Solo puedes registrar tu asistencia de hoy")
+                registros = [dict(r, alumno=alumno_id, sesion=hoy.isoformat()) if isinstance(r, dict) else r for r in registros]
+            llaves = [AsistenciasUtils.normalizar(r if isinstance(r, dict) else {}, hoy) for r in registros]
+        except AsistenciaError as e:
+            return Response({"message": str(e)}, 400)
+
+        # Una sola consulta para todas las materias del lote: periodo actual y,
+        # si captura un maestro, que sean suyas. La inscripción se verifica al escribir.
+        materia_ids = {materia_id for _, materia_id, _ in llaves}
+        validas = Materias.objects.filter(id__in=materia_ids, periodo=PeriodoUtils.actual())
+        if rol == "maestro":
+            validas = validas.filter(profesor__user=request.user)
+        ajenas = materia_ids - set(validas.values_list("id", flat=True))
+        if ajenas:
+            return Response({
+                "message": "Materias fuera del periodo actual o que no imparte",
+                "materias": sorted(ajenas),
+            }, 400)
+
+        aceptados, duplicados = AsistenciasUtils.encolar(llaves)
+        # 202: se escriben en el siguiente lote (dentro de ASISTENCIAS_FLUSH_MS)
+        return Response({"aceptados": aceptados, "duplicados": duplicados}, 202)
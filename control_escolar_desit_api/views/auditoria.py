@@ -0,0 +1,34 @@
+from django.utils.dateparse import parse_datetime
+from rest_framework import permissions, generics
+
+from control_escolar_desit_api.models import Auditoria
+from control_escolar_desit_api.serializers import AuditoriaSerializer
+from .users import StandardResultsPagination, IsAdmin
+
+# ====================================================
+# BITÁCORA DE AUDITORÍA (GET /auditoria/)
+# ?entidad=materias&entidad_id=15&desde=2025-12-01T00:00:00Z&hasta=...
+# ====================================================
+class AuditoriaAll(generics.ListAPIView):
+    """Historial de cambios (quién, qué y cuándo), del más reciente al más antiguo.
+    Usa el índice (entidad, entidad_id, fecha)."""
+    permission_classes = (permissions.IsAuthenticated, IsAdmin)
+    serializer_class = AuditoriaSerializer
+    pagination_class = StandardResultsPagination
+
+    def get_queryset(self):
+        queryset = Auditoria.objects.all()
+        params = self.request.GET
+        if params.get("entidad"):
+            queryset = queryset.filter(entidad=params["entidad"])
+        if params.get("entidad_id"):
+            queryset = queryset.filter(entidad_id=params["entidad_id"])
+        if params.get("usuario_id"):
+            queryset = queryset.filter(usuario_id=params["usuario_id"])
+        desde = parse_datetime(params.get("desde", ""))
+        if desde:
+            queryset = queryset.filter(fecha__gte=desde)
+        hasta = parse_datetime(params.get("hasta", ""))
+        if hasta:
+            queryset = queryset.filter(fecha__lt=hasta)
+        return queryset.order_by("-fecha", "-id")
@@ -29,6 +29,11 @@ class CustomAuthToken(ObtainAuthToken):
             
             #Esta función genera la clave dinámica (token) para iniciar sesión
             token, created = Token.objects.get_or_create(user=user)
+            if not created and BearerTokenAuthentication.expirado(token):
+                # El token viejo ya venció: se emite uno nuevo
+                BearerTokenAuthentication.olvidar(token.key)
+                token.delete()
+                token = Token.objects.create(user=user)
             
            #Verificar que tipo de usuario quiere iniciar sesión
             
@@ -67,6 +72,7 @@ class Logout(generics.GenericAPIView):
         print(str(user))
         if user.is_active:
             token = Token.objects.get(user=user)
+            BearerTokenAuthentication.olvidar(token.key)
             token.delete()
 
             return Response({'logout':True})
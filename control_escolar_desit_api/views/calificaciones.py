@@ -0,0 +1,92 @@
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.models import Alumnos, Maestros, Materias, Inscripciones, Calificaciones, CalificacionesArchivo, ResumenAcademico
+from control_escolar_desit_api.serializers import CalificacionSerializer, ResumenAcademicoSerializer
+from control_escolar_desit_api.calificaciones_utils import CalificacionesUtils, CalificacionError
+from .users import IsAdminMaestroOrAlumno
+
+# ====================================================
+# CALIFICACIONES (GET, POST /calificaciones/)
+# ====================================================
+class CalificacionesView(generics.CreateAPIView):
+    permission_classes = (permissions.IsAuthenticated, IsAdminMaestroOrAlumno)
+
+    def _es_admin(self, request):
+        return request.user.groups.filter(name='administrador').exists()
+
+    # Captura el admin o el profesor asignado a la materia
+    def _puede_capturar(self, request, materia):
+        if self._es_admin(request):
+            return True
+        return materia.profesor_id is not None and Maestros.objects.filter(
+            id=materia.profesor_id, user=request.user
+        ).exists()
+
+    def _materia(self, valor):
+        try:
+            return Materias.objects.filter(id=int(valor)).first()
+        except (TypeError, ValueError):
+            return None
+
+    # ?materia= -> acta de la sección; si no, las del alumno (el admin puede indicar ?alumno=)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("materia"):
+            materia = self._materia(request.GET["materia"])
+            if materia is None:
+                return Response({"message": "La materia no existe"}, 404)
+            if not self._puede_capturar(request, materia):
+                return Response({"message": "Solo el profesor de la materia o un administrador"}, 403)
+            calificaciones = dict(
+                Calificaciones.objects.filter(materia_id=materia.id).values_list("alumno_id", "calificacion")
+            )
+            inscritos = Inscripciones.objects.filter(
+                materia_id=materia.id, estado=Inscripciones.INSCRITO
+            ).select_related("alumno__user").order_by("alumno__user__last_name", "alumno__user__first_name")
+            return Response({
+                "materia": materia.id,
+                "nrc": materia.nrc,
+                "alumnos": [{
+                    "alumno": i.alumno_id,
+                    "matricula": i.alumno.matricula,
+                    "nombre": (i.alumno.user.first_name + " " + i.alumno.user.last_name).strip(),
+                    "calificacion": calificaciones.get(i.alumno_id),
+                } for i in inscritos],
+            }, 200)
+
+        alumno_id = request.GET.get("alumno") if self._es_admin(request) else None
+        if alumno_id:
+            try:
+                alumno_id = int(alumno_id)
+            except ValueError:
+                return Response({"message": "'alumno' debe ser un id numérico"}, 400)
+        else:
+            alumno_id = Alumnos.objects.filter(user=request.user).values_list("id", flat=True).first()
+        if alumno_id is None:
+            return Response({"message": "Perfil de alumno no encontrado"}, 404)
+        resumen = ResumenAcademico.objects.filter(alumno_id=alumno_id).first()
+        return Response({
+            "calificaciones": CalificacionSerializer(
+                Calificaciones.objects.filter(alumno_id=alumno_id).select_related("materia").order_by("id"), many=True
+            ).data,
+            "archivadas": list(CalificacionesArchivo.objects.filter(alumno_id=alumno_id).order_by("periodo", "id").values(
+                "periodo", "materia_id", "calificacion", "creditos"
+            )),
+            "resumen": ResumenAcademicoSerializer(resumen).data if resumen else None,
+        }, 200)
+
+    # CAPTURA POR SECCIÓN: {"materia": id, "calificaciones": [{"alumno": id, "calificacion": 8.5}, ...]}
+    def post(self, request, *args, **kwargs):
+        materia = self._materia(request.data.get("materia"))
+        if materia is None:
+            return Response({"message": "La materia no existe"}, 404)
+        if not self._puede_capturar(request, materia):
+            return Response({"message": "Solo el profesor de la materia o un administrador"}, 403)
+        filas = request.data.get("calificaciones")
+        if not isinstance(filas, list) or not filas:
+            return Response({"message": "Se esperaba una lista 'calificaciones'"}, 400)
+        try:
+            resultado = CalificacionesUtils.capturar(materia, filas, request.user)
+        except CalificacionError as e:
+            return Response({"message": str(e), "errores": e.errores}, 400)
+        return Response(dict(resultado, message="Calificaciones guardadas"), 200)
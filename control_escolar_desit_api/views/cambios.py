@@ -0,0 +1,117 @@
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.models import Administradores, Alumnos, Maestros, Materias, Eliminaciones
+from control_escolar_desit_api.serializers import AdminSerializer, AlumnoSerializer, MaestroSerializer, MateriaSerializer
+from control_escolar_desit_api.utils import Utils
+from .users import IsAdmin, IsAdminOrMaestro, IsAdminMaestroOrAlumno
+
+# entidad -> (queryset, serializer, permiso, campo JSON a decodificar)
+ENTIDADES = {
+    "admins": (Administradores.objects.select_related("user"), AdminSerializer, IsAdmin, None),
+    "maestros": (Maestros.objects.select_related("user"), MaestroSerializer, IsAdminOrMaestro, "materias_json"),
+    "alumnos": (Alumnos.objects.select_related("user"), AlumnoSerializer, IsAdminMaestroOrAlumno, None),
+    "materias": (Materias.objects.all(), MateriaSerializer, IsAdminMaestroOrAlumno, "dias"),
+}
+
+# ====================================================
+# SINCRONIZACIÓN INCREMENTAL (GET /cambios/)
+# ?entidad=materias&updated_since=2025-12-01T00:00:00Z  (primera vez)
+# ?entidad=materias&cursor=...                           (siguientes)
+# ====================================================
+class CambiosView(generics.RetrieveAPIView):
+    """Changefeed por entidad: filas creadas/modificadas (upserts) y
+    eliminadas (tombstones) desde el último cursor, ordenadas por
+    (update, id) para que el costo dependa de los cambios y no de la tabla."""
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def _codificar(self, cursor):
+        return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+    def _decodificar(self, texto):
+        return json.loads(base64.urlsafe_b64decode(texto.encode()).decode())
+
+    def _ultima_baja(self, entidad):
+        return Eliminaciones.objects.filter(entidad=entidad).order_by("-id").values_list("id", flat=True).first() or 0
+
+    def get(self, request, *args, **kwargs):
+        entidad = request.GET.get("entidad")
+        if entidad not in ENTIDADES:
+            return Response({"message": "Entidad inválida: " + ", ".join(ENTIDADES)}, 400)
+        queryset, serializer_class, permiso, campo_json = ENTIDADES[entidad]
+        if not permiso().has_permission(request, self):
+            return Response({"message": "No tienes permisos para esta entidad"}, 403)
+
+        try:
+            limite = min(int(request.GET.get("limite", settings.CAMBIOS_LIMITE)), settings.CAMBIOS_LIMITE)
+        except ValueError:
+            limite = settings.CAMBIOS_LIMITE
+
+        # Cursor: último (update, id) entregado y último tombstone entregado
+        desde, ultimo_id, ultima_baja = None, 0, 0
+        if request.GET.get("cursor"):
+            try:
+                cursor = self._decodificar(request.GET["cursor"])
+                desde = parse_datetime(cursor["t"]) if cursor["t"] else None
+                ultimo_id, ultima_baja = int(cursor["id"]), int(cursor["e"])
+            except Exception:
+                return Response({"message": "Cursor inválido"}, 400)
+        elif request.GET.get("updated_since"):
+            desde = parse_datetime(request.GET["updated_since"])
+            if desde is None:
+                return Response({"message": "updated_since debe ser una fecha ISO 8601"}, 400)
+            if timezone.is_naive(desde):
+                desde = timezone.make_aware(desde, datetime.timezone.utc)
+            # Tombstones desde esa fecha
+            primera = Eliminaciones.objects.filter(entidad=entidad, eliminado__gte=desde).order_by("id").values_list("id", flat=True).first()
+            ultima_baja = primera - 1 if primera else self._ultima_baja(entidad)
+        else:
+            # Sincronización completa: no hace falta ningún tombstone anterior
+            ultima_baja = self._ultima_baja(entidad)
+
+        # No se entregan filas demasiado recientes: una transacción más lenta
+        # aún podría confirmar con un 'update' anterior
+        hasta = timezone.now() - datetime.timedelta(seconds=settings.CAMBIOS_MARGEN_SEGUNDOS)
+        filas = queryset.filter(update__lte=hasta)
+        if desde is not None:
+            filas = filas.filter(Q(update__gt=desde) | Q(update=desde, id__gt=ultimo_id))
+        filas = list(filas.order_by("update", "id")[:limite + 1])
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+
+        upserts = []
+        for fila in filas:
+            data = serializer_class(fila).data
+            if campo_json:
+                Utils.decodeJsonField(data, campo_json)
+            upserts.append(data)
+
+        bajas = list(
+            Eliminaciones.objects.filter(entidad=entidad, id__gt=ultima_baja, eliminado__lte=hasta)
+            .order_by("id").values_list("id", "entidad_id")[:limite]
+        )
+
+        if filas:
+            desde, ultimo_id = filas[-1].update, filas[-1].id
+        if bajas:
+            ultima_baja = bajas[-1][0]
+
+        return Response({
+            "entidad": entidad,
+            "upserts": upserts,
+            "eliminados": [entidad_id for _, entidad_id in bajas],
+            "cursor": self._codificar({
+                "t": desde.isoformat() if desde else None,
+                "id": ultimo_id,
+                "e": ultima_baja,
+            }),
+            "hay_mas": hay_mas or len(bajas) == limite,
+        }, 200)
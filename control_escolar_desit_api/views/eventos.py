@@ -0,0 +1,61 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions
+
+from control_escolar_desit_api.eventos import difusor
+from control_escolar_desit_api.models import BearerTokenAuthentication
+
+ENTIDADES_EVENTOS = ("admins", "alumnos", "maestros", "materias")
+
+def _autenticar(request):
+    """Usuario y grupos del token; EventSource no manda headers, así que
+    también se acepta ?token="""
+    key = request.GET.get("token")
+    encabezado = request.headers.get("Authorization", "").split()
+    if not key and len(encabezado) == 2 and encabezado[0] == BearerTokenAuthentication.keyword:
+        key = encabezado[1]
+    if not key:
+        return None, []
+    try:
+        user, _ = BearerTokenAuthentication().authenticate_credentials(key)
+    except exceptions.AuthenticationFailed:
+        return None, []
+    return user, list(user.groups.values_list("name", flat=True))
+
+# ====================================================
+# EVENTOS EN VIVO (GET /eventos/) - text/event-stream
+# ?token=...&entidades=materias,alumnos  (Last-Event-ID para reanudar)
+# ====================================================
+class EventosView(View):
+    """Avisos de cambio (entidad, id, versión) para dejar de hacer polling.
+    El cliente solo vuelve a pedir lo que cambió; con 'resync' debe
+    ponerse al día con /cambios/. Requiere servidor ASGI (ver asgi.py)."""
+
+    async def get(self, request, *args, **kwargs):
+        user, grupos = await sync_to_async(_autenticar)(request)
+        if user is None:
+            return JsonResponse({"detail": "Token inválido o vencido"}, status=401)
+        if not {"administrador", "maestro", "alumno"} & set(grupos):
+            return JsonResponse({"detail": "Sin permiso"}, status=403)
+
+        entidades = {e.strip() for e in request.GET.get("entidades", "").split(",") if e.strip()}
+        if entidades - set(ENTIDADES_EVENTOS):
+            return JsonResponse({"message": "Entidades válidas: " + ", ".join(ENTIDADES_EVENTOS)}, status=400)
+        if "administrador" not in grupos:
+            entidades = (entidades or set(ENTIDADES_EVENTOS)) - {"admins"}
+        if difusor.conectados() >= settings.SSE_MAX_CLIENTES:
+            return JsonResponse({"message": "Demasiadas conexiones, intente más tarde"}, status=503, headers={"Retry-After": "30"})
+
+        ultimo_id = request.headers.get("Last-Event-ID") or request.GET.get("ultimo_id")
+        suscriptor = difusor.suscribir(
+            entidades, settings.SSE_BUFFER_EVENTOS, int(ultimo_id) if ultimo_id and ultimo_id.isdigit() else None
+        )
+        respuesta = StreamingHttpResponse(
+            difusor.flujo(suscriptor, settings.SSE_HEARTBEAT_SEGUNDOS), content_type="text/event-stream"
+        )
+        respuesta["Cache-Control"] = "no-cache"
+        # nginx / GFE: no acumular la respuesta en buffer
+        respuesta["X-Accel-Buffering"] = "no"
+        return respuesta
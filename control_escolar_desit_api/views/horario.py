@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.shortcuts import get_object_or_404
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.horario_utils import HorarioUtils
+from .users import IsAdminMaestroOrAlumno
+
+# ====================================================
+# HORARIO SEMANAL (GET /horario/)
+# ====================================================
+class HorarioView(generics.RetrieveAPIView):
+    """Rejilla semanal del usuario logueado, armada en el servidor.
+
+    El admin puede consultar el de otro usuario con ?user=<id>."""
+    permission_classes = (permissions.IsAuthenticated, IsAdminMaestroOrAlumno)
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        user_id = request.GET.get("user")
+        if user_id and str(user_id) != str(user.id):
+            if not user.groups.filter(name='administrador').exists():
+                return Response({"message": "No tienes permisos para ver este horario"}, 403)
+            user = get_object_or_404(User, id=user_id)
+        return Response(HorarioUtils.horario_usuario(user), 200)
@@ -0,0 +1,82 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.models import Alumnos, Inscripciones
+from control_escolar_desit_api.serializers import InscripcionSerializer
+from control_escolar_desit_api.inscripciones_utils import InscripcionesUtils, InscripcionError
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+from .users import IsAdminMaestroOrAlumno
+
+# ====================================================
+# INSCRIPCIONES (GET, POST, DELETE /inscripciones/)
+# ====================================================
+class InscripcionesView(generics.CreateAPIView):
+    permission_classes = (permissions.IsAuthenticated, IsAdminMaestroOrAlumno)
+
+    def _es_admin(self, request):
+        return request.user.groups.filter(name='administrador').exists()
+
+    # El alumno opera sobre sí mismo; el admin puede indicar ?alumno= / "alumno"
+    def _alumno_id(self, request, alumno_id):
+        if alumno_id and self._es_admin(request):
+            return alumno_id
+        alumno = Alumnos.objects.filter(user=request.user).only("id").first()
+        return alumno.id if alumno else None
+
+    # LISTAR INSCRIPCIONES DEL ALUMNO
+    def get(self, request, *args, **kwargs):
+        alumno_id = self._alumno_id(request, request.GET.get("alumno"))
+        if alumno_id is None:
+            return Response({"message": "Perfil de alumno no encontrado"}, 404)
+        try:
+            periodo = PeriodoUtils.de_request(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, 400)
+        inscripciones = Inscripciones.objects.filter(alumno_id=alumno_id).select_related("materia").order_by("id")
+        if periodo:
+            inscripciones = inscripciones.filter(materia__periodo=periodo)
+        inscripciones = list(inscripciones)
+        posiciones = InscripcionesUtils.posiciones_espera(inscripciones)
+        data = []
+        for inscripcion in inscripciones:
+            item = InscripcionSerializer(inscripcion).data
+            item["posicion_espera"] = posiciones.get(inscripcion.id)
+            data.append(item)
+        return Response({
+            "inscripciones": data,
+            "creditos": sum(i.materia.creditos for i in inscripciones),
+        }, 200)
+
+    # INSCRIBIR (o mandar a lista de espera si ya no hay cupo)
+    def post(self, request, *args, **kwargs):
+        alumno_id = self._alumno_id(request, request.data.get("alumno"))
+        if alumno_id is None:
+            return Response({"message": "Perfil de alumno no encontrado"}, 404)
+        materia_id = request.data.get("materia")
+        if not materia_id:
+            return Response({"message": "Falta la materia"}, 400)
+        try:
+            inscripcion = InscripcionesUtils.inscribir(alumno_id, materia_id)
+        except InscripcionError as e:
+            return Response({"message": str(e)}, 400)
+
+        data = InscripcionSerializer(inscripcion).data
+        data["posicion_espera"] = InscripcionesUtils.posicion_espera(inscripcion)
+        return Response(data, 201)
+
+    # DAR DE BAJA
+    def delete(self, request, *args, **kwargs):
+        inscripcion = get_object_or_404(Inscripciones, id=request.GET.get("id"))
+        if not self._es_admin(request):
+            alumno_id = self._alumno_id(request, None)
+            if inscripcion.alumno_id != alumno_id:
+                return Response({"message": "No tienes permisos para dar de baja esta inscripción"}, 403)
+        try:
+            promovidas = InscripcionesUtils.dar_de_baja(inscripcion.id)
+        except InscripcionError as e:
+            return Response({"message": str(e)}, 404)
+        return Response({
+            "message": "Inscripción eliminada",
+            "promovidos": [i.alumno_id for i in promovidas],
+        }, 200)
@@ -13,26 +13,32 @@ from rest_framework import filters
 # Aseguramos que se importen desde donde realmente existen
 from control_escolar_desit_api.serializers import UserSerializer, MaestroSerializer
 from control_escolar_desit_api.models import Maestros
-from .users import StandardResultsPagination, IsAdminOrMaestro 
+from .users import StandardResultsPagination, IsAdminOrMaestro, respuesta_por_ids, revisar_permisos, CamposParcialesMixin, CAMPOS_USER
 
 # ====================================================
 # VISTA DE LISTADO DE MAESTROS (GET /lista-maestros/)
 # ====================================================
 
-class MaestrosAll(generics.ListAPIView):
+class MaestrosAll(CamposParcialesMixin, generics.ListAPIView):
     """Lista de Maestros con paginación, ordenamiento y filtro."""
     permission_classes = (permissions.IsAuthenticated, IsAdminOrMaestro) 
     serializer_class = MaestroSerializer 
-    queryset = Maestros.objects.filter(user__is_active=1).order_by("id") 
+    queryset = Maestros.objects.filter(user__is_active=1).select_related("user").order_by("id") 
     pagination_class = StandardResultsPagination
     filter_backends = (filters.OrderingFilter, filters.SearchFilter)
     ordering_fields = ['id', 'id_trabajador', 'user__first_name', 'user__last_name']
     ordering = ['user__last_name']
     search_fields = ['user__first_name', 'user__last_name', 'id_trabajador', 'rfc']
+    campos_permitidos = (
+        "id", "id_trabajador", "fecha_nacimiento", "telefono", "rfc", "cubiculo", "edad",
+        "area_investigacion", "materias_json", "creation", "update",
+    ) + CAMPOS_USER
 
     # Sobrescribimos el GET para mantener la deserialización de materias_json
     def get(self, request, *args, **kwargs):
         response = super().get(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
         lista = response.data.get('results', []) 
 
         for maestro in lista:
@@ -50,17 +56,26 @@ class MaestrosAll(generics.ListAPIView):
 # VISTA DE GESTIÓN INDIVIDUAL (CRUD)
 # ====================================================
 
-class MaestrosView(APIView):
+class MaestrosView(CamposParcialesMixin, APIView):
+    campos_permitidos = MaestrosAll.campos_permitidos
     # Permitimos entrar a Admins y Maestros (para leer su propio perfil)
     #permission_classes = (permissions.IsAuthenticated, IsAdminOrMaestro)
 
     # 1. GET: Obtener maestro por ID (Necesario para el formulario de edición)
     def get(self, request):
+        try:
+            campos = self.campos_pedidos(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, 400)
+        queryset = self.limitar(Maestros.objects.select_related("user"), campos)
+        if request.GET.get("ids"):
+            revisar_permisos(self, request, MaestrosAll.permission_classes)
+            return respuesta_por_ids(request.GET["ids"], queryset, MaestroSerializer, "materias_json", campos=campos)
         maestro_id = request.GET.get("id")
         if maestro_id:
             try:
-                maestro = Maestros.objects.get(id=maestro_id)
-                serializer = MaestroSerializer(maestro)
+                maestro = queryset.get(id=maestro_id)
+                serializer = MaestroSerializer(maestro, campos=campos)
                 data = serializer.data
                 
                 # Convertimos el string JSON de materias a una lista real para el Frontend
@@ -1,4 +1,5 @@
 from django.db import transaction
+from django.db.models import ProtectedError
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, generics, status, filters
 from rest_framework.response import Response
@@ -7,12 +8,15 @@ import json
 # IMPORTANTE: Agregamos 'Maestros' a los imports
 from control_escolar_desit_api.models import Materias, Maestros
 from control_escolar_desit_api.serializers import MateriaSerializer
-from .users import StandardResultsPagination, IsAdminMaestroOrAlumno, IsAdminOrMaestro
+from control_escolar_desit_api.inscripciones_utils import InscripcionesUtils
+from control_escolar_desit_api.catalogo_utils import CatalogoUtils
+from control_escolar_desit_api.periodos_utils import PeriodoUtils
+from .users import StandardResultsPagination, IsAdminMaestroOrAlumno, IsAdminOrMaestro, respuesta_por_ids, CamposParcialesMixin
 
 # ====================================================
 # LISTA DE MATERIAS (GET /lista-materias/)
 # ====================================================
-class MateriasList(generics.ListAPIView):
+class MateriasList(CamposParcialesMixin, generics.ListAPIView):
     # Visible para Admin, Maestro y Alumno
     permission_classes = (permissions.IsAuthenticated, IsAdminMaestroOrAlumno)
     serializer_class = MateriaSerializer
@@ -27,8 +31,27 @@ class MateriasList(generics.ListAPIView):
     # Buscar por NRC, Nombre o Programa
     search_fields = ['nrc', 'nombre', 'programa_educativo']
 
+    # ?fields=id,nrc,nombre para los selectores de materia
+    campos_permitidos = (
+        "id", "periodo", "nrc", "nombre", "seccion", "dias", "hora_inicio", "hora_fin", "salon",
+        "programa_educativo", "creditos", "profesor", "cupo", "inscritos", "creation", "update",
+    )
+
+    def get_queryset(self):
+        # Por defecto solo el periodo actual; ?periodo=todos trae el histórico vivo
+        queryset = super().get_queryset()
+        if self.periodo:
+            queryset = queryset.filter(periodo=self.periodo)
+        return queryset
+
     def get(self, request, *args, **kwargs):
+        try:
+            self.periodo = PeriodoUtils.de_request(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, 400)
         response = super().get(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
         lista = response.data.get('results', [])
         for materia in lista:
             if "dias" in materia and isinstance(materia["dias"], str):
@@ -39,16 +62,38 @@ class MateriasList(generics.ListAPIView):
         response.data['results'] = lista
         return response
 
+# ====================================================
+# FACETAS DEL CATÁLOGO (GET /facetas-materias/)
+# ====================================================
+class MateriasFacetas(generics.RetrieveAPIView):
+    # Conteos para los filtros del catálogo; respeta los mismos ?search= y ?periodo= que MateriasList
+    permission_classes = (permissions.IsAuthenticated, IsAdminMaestroOrAlumno)
+
+    def get(self, request, *args, **kwargs):
+        try:
+            periodo = PeriodoUtils.de_request(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, 400)
+        return Response(CatalogoUtils.facetas(request.GET.get("search", ""), periodo), 200)
+
 # ====================================================
 # GESTIÓN DE MATERIAS (CRUD)
 # ====================================================
-class MateriasView(generics.CreateAPIView):
+class MateriasView(CamposParcialesMixin, generics.CreateAPIView):
     permission_classes = (permissions.IsAuthenticated, IsAdminOrMaestro)
+    campos_permitidos = MateriasList.campos_permitidos
 
     # OBTENER UNA MATERIA POR ID
     def get(self, request, *args, **kwargs):
-        materia = get_object_or_404(Materias, id=request.GET.get("id"))
-        data = MateriaSerializer(materia).data
+        try:
+            campos = self.campos_pedidos(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, 400)
+        queryset = self.limitar(Materias.objects.all(), campos)
+        if request.GET.get("ids"):
+            return respuesta_por_ids(request.GET["ids"], queryset, MateriaSerializer, "dias", campos=campos)
+        materia = get_object_or_404(queryset, id=request.GET.get("id"))
+        data = MateriaSerializer(materia, campos=campos).data
         
         # Parsear dias si es string
         if isinstance(data.get("dias"), str):
@@ -61,8 +106,11 @@ class MateriasView(generics.CreateAPIView):
     # REGISTRAR MATERIA
     @transaction.atomic
     def post(self, request, *args, **kwargs):
-        # Validar si ya existe el NRC
-        if Materias.objects.filter(nrc=request.data.get("nrc")).exists():
+        # El NRC es único dentro de cada periodo
+        periodo = request.data.get("periodo") or PeriodoUtils.actual()
+        if not PeriodoUtils.valido(periodo):
+            return Response({"message": "Periodo inválido (formato AAAA-N)"}, 400)
+        if Materias.objects.filter(periodo=periodo, nrc=request.data.get("nrc")).exists():
             return Response({"message": "El NRC ya existe."}, 400)
 
         # Manejo de JSON para 'dias'
@@ -82,6 +130,7 @@ class MateriasView(generics.CreateAPIView):
         try:
             materia = Materias.objects.create(
                 nrc=request.data["nrc"],
+                periodo=periodo,
                 nombre=request.data["nombre"],
                 seccion=request.data["seccion"],
                 dias=dias_json,
@@ -91,6 +140,7 @@ class MateriasView(generics.CreateAPIView):
                 programa_educativo=request.data["programa_educativo"],
                 # ---> NUEVO: Agregamos créditos y profesor
                 creditos=request.data.get("creditos", 1), # Default 1 si no viene
+                cupo=request.data.get("cupo", 30),
                 profesor=profesor_instance
             )
             return Response({"id": materia.id, "message": "Materia creada correctamente"}, 201)
@@ -103,13 +153,17 @@ class MateriasView(generics.CreateAPIView):
         try:
             materia = Materias.objects.get(id=request.data["id"])
             
-            # Validar NRC único (si cambió)
-            new_nrc = request.data.get("nrc")
-            if new_nrc and new_nrc != materia.nrc:
-                if Materias.objects.filter(nrc=new_nrc).exists():
+            # Validar NRC único dentro del periodo (si cambió alguno de los dos)
+            new_nrc = request.data.get("nrc") or materia.nrc
+            new_periodo = request.data.get("periodo") or materia.periodo
+            if not PeriodoUtils.valido(new_periodo):
+                return Response({"message": "Periodo inválido (formato AAAA-N)"}, 400)
+            if (new_nrc, new_periodo) != (materia.nrc, materia.periodo):
+                if Materias.objects.filter(nrc=new_nrc, periodo=new_periodo).exclude(id=materia.id).exists():
                     return Response({"message": "El NRC ya está ocupado por otra materia."}, 400)
 
-            materia.nrc = request.data.get("nrc", materia.nrc)
+            materia.nrc = new_nrc
+            materia.periodo = new_periodo
             materia.nombre = request.data.get("nombre", materia.nombre)
             materia.seccion = request.data.get("seccion", materia.seccion)
             materia.hora_inicio = request.data.get("hora_inicio", materia.hora_inicio)
@@ -119,6 +173,8 @@ class MateriasView(generics.CreateAPIView):
             
             # ---> NUEVO: Actualizar Créditos
             materia.creditos = request.data.get("creditos", materia.creditos)
+            cupo_anterior = materia.cupo
+            materia.cupo = request.data.get("cupo", materia.cupo)
 
             # ---> NUEVO: Actualizar Profesor
             # Verificamos si en el request viene el campo 'profesor'
@@ -140,7 +196,12 @@ class MateriasView(generics.CreateAPIView):
                 else:
                     materia.dias = dias_data
             
-            materia.save()
+            # El contador 'inscritos' solo se toca con F() desde las inscripciones
+            materia.save(update_fields=[f.name for f in Materias._meta.concrete_fields if f.name not in ("id", "inscritos")])
+
+            # Si se amplió el cupo, entran los que estaban en lista de espera
+            if int(materia.cupo) > int(cupo_anterior):
+                InscripcionesUtils.promover_espera(materia.id)
             return Response({"message": "Materia actualizada"}, 200)
         except Materias.DoesNotExist:
             return Response({"message": "La materia no existe"}, 404)
@@ -152,5 +213,7 @@ class MateriasView(generics.CreateAPIView):
             materia = Materias.objects.get(id=request.GET.get("id"))
             materia.delete()
             return Response({"message": "Materia eliminada"}, 200)
+        except ProtectedError:
+            return Response({"message": "La materia ya tiene calificaciones; se conserva hasta archivar su periodo"}, 400)
         except Materias.DoesNotExist:
             return Response({"message": "La materia no existe"}, 404)
\ No newline at end of file
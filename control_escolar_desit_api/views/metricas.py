@@ -0,0 +1,18 @@
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.middleware import LimiteEsperaMiddleware
+from control_escolar_desit_api.asistencias_utils import AsistenciasUtils
+from .users import IsAdmin
+
+# ====================================================
+# MÉTRICAS DE CARGA (GET /metricas-carga/)
+# ====================================================
+class MetricasCargaView(generics.RetrieveAPIView):
+    """Peticiones servidas / descartadas por tiempo en cola, por grupo de ruta,
+    y el buffer de asistencias. Los contadores son del proceso que atiende
+    esta petición."""
+    permission_classes = (permissions.IsAuthenticated, IsAdmin)
+
+    def get(self, request, *args, **kwargs):
+        return Response({"rutas": LimiteEsperaMiddleware.resumen(), "asistencias": AsistenciasUtils.resumen()}, 200)
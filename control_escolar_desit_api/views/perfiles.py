@@ -0,0 +1,43 @@
+import json
+
+from django.http import FileResponse
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.perfiles_utils import PerfilesUtils
+from .users import IsAdmin
+
+# ====================================================
+# PERFILES DE PETICIONES (GET /perfiles/)
+# Sin parámetros: lista.  ?nombre=...&formato=json|prof: descarga
+# (.prof se abre con pstats / snakeviz)
+# ====================================================
+class PerfilesView(generics.RetrieveAPIView):
+    permission_classes = (permissions.IsAuthenticated, IsAdmin)
+
+    def get(self, request, *args, **kwargs):
+        nombre = request.GET.get("nombre")
+        if nombre:
+            formato = request.GET.get("formato", "json")
+            ruta = PerfilesUtils.ruta_archivo(nombre, "." + formato)
+            if ruta is None:
+                return Response({"message": "Perfil no encontrado"}, 404)
+            return FileResponse(open(ruta, "rb"), as_attachment=True, filename=nombre + "." + formato)
+
+        perfiles = []
+        for nombre in PerfilesUtils.nombres():
+            ruta = PerfilesUtils.ruta_archivo(nombre, ".json")
+            if ruta is None:
+                continue
+            with open(ruta, encoding="utf-8") as archivo:
+                detalle = json.load(archivo)
+            perfiles.append({
+                "nombre": nombre,
+                "ruta": detalle["ruta"],
+                "metodo": detalle["metodo"],
+                "status": detalle["status"],
+                "duracion_ms": detalle["duracion_ms"],
+                "sql_ms": detalle["sql_ms"],
+                "consultas": len(detalle["consultas"]),
+            })
+        return Response({"results": perfiles}, 200)
@@ -0,0 +1,26 @@
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.reportes_utils import ReportesUtils, REPORTES
+from .users import IsAdmin
+
+# ====================================================
+# REPORTES DE CARGA ACADÉMICA (GET /reportes/)
+# ?nombre=carga_docente | secciones_programa | utilizacion_salones
+# ====================================================
+class ReportesView(generics.RetrieveAPIView):
+    """Sirve el snapshot materializado: una sola fila, sin agregar en la petición"""
+    permission_classes = (permissions.IsAuthenticated, IsAdmin)
+
+    def get(self, request, *args, **kwargs):
+        nombre = request.GET.get("nombre")
+        if not nombre:
+            return Response({"reportes": list(REPORTES)}, 200)
+        if nombre not in REPORTES:
+            return Response({"message": "Reporte no encontrado"}, 404)
+        snapshot = ReportesUtils.obtener(nombre)
+        return Response({
+            "nombre": nombre,
+            "generado": snapshot["generado"],
+            "filas": snapshot["datos"],
+        }, 200)
@@ -0,0 +1,42 @@
+from django.conf import settings
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.horario_utils import HorarioUtils
+from control_escolar_desit_api.ocupacion_utils import ocupacion
+from .users import IsAdminOrMaestro
+
+# ====================================================
+# SALONES LIBRES (GET /salones-libres/)
+# ?dias=Lunes,Miercoles&hora_inicio=10:00&hora_fin=12:00
+# ====================================================
+class SalonesLibresView(generics.RetrieveAPIView):
+    permission_classes = (permissions.IsAuthenticated, IsAdminOrMaestro)
+
+    def get(self, request, *args, **kwargs):
+        dias = [d for d in request.GET.get("dias", "").split(",") if d.strip()]
+        hora_inicio = request.GET.get("hora_inicio")
+        hora_fin = request.GET.get("hora_fin")
+        if not dias or not hora_inicio or not hora_fin:
+            return Response({"message": "Faltan dias, hora_inicio u hora_fin"}, 400)
+        try:
+            inicio, fin = HorarioUtils.hora_valida(hora_inicio), HorarioUtils.hora_valida(hora_fin)
+        except ValueError as e:
+            return Response({"message": str(e)}, 400)
+        if fin <= inicio:
+            return Response({"message": "hora_fin debe ser mayor que hora_inicio"}, 400)
+        if not HorarioUtils.dias_materia(dias):
+            return Response({"message": "Días inválidos"}, 400)
+
+        return Response({"salones": ocupacion.salones_libres(dias, hora_inicio, hora_fin)}, 200)
+
+# ====================================================
+# UTILIZACIÓN POR SALÓN (GET /ocupacion-salones/)
+# ====================================================
+class OcupacionSalonesView(generics.RetrieveAPIView):
+    permission_classes = (permissions.IsAuthenticated, IsAdminOrMaestro)
+
+    def get(self, request, *args, **kwargs):
+        return Response(ocupacion.utilizacion(
+            settings.JORNADA_APERTURA, settings.JORNADA_CIERRE, settings.DIAS_HABILES
+        ), 200)
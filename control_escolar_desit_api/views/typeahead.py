@@ -0,0 +1,28 @@
+from django.conf import settings
+from rest_framework import permissions, generics
+from rest_framework.response import Response
+
+from control_escolar_desit_api.typeahead_utils import typeahead, TIPOS
+from .users import IsAdminMaestroOrAlumno
+
+# ====================================================
+# TYPEAHEAD (GET /typeahead/)
+# ?q=jos&tipos=alumnos,maestros&limite=10
+# ====================================================
+class TypeaheadView(generics.RetrieveAPIView):
+    """Sugerencias por prefijo para las cajas de búsqueda; se responde desde
+    el índice en memoria, sin consultar la BD por cada tecla."""
+    permission_classes = (permissions.IsAuthenticated, IsAdminMaestroOrAlumno)
+
+    def get(self, request, *args, **kwargs):
+        q = request.GET.get("q", "")
+        tipos = [t.strip() for t in request.GET.get("tipos", "").split(",") if t.strip()] or list(TIPOS)
+        if any(t not in TIPOS for t in tipos):
+            return Response({"message": "Tipos válidos: " + ", ".join(TIPOS)}, 400)
+        try:
+            limite = int(request.GET.get("limite", settings.TYPEAHEAD_LIMITE))
+        except ValueError:
+            return Response({"message": "limite debe ser un número"}, 400)
+        limite = max(1, min(limite, settings.TYPEAHEAD_LIMITE_MAX))
+
+        return Response({"results": typeahead.buscar(q, limite, tipos)}, 200)
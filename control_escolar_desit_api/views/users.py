@@ -11,6 +11,7 @@ from django.shortcuts import get_object_or_404
 import json
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import filters
+from control_escolar_desit_api.utils import Utils
 
 # ====================================================
 #  CONFIGURACIÓN GLOBAL (PAGINACIÓN Y PERMISOS)
@@ -22,6 +23,101 @@ class StandardResultsPagination(PageNumberPagination):
     page_size_query_param = 'page_size' 
     max_page_size = 100 
 
+# Consulta por lotes (?ids=1,2,3) para los GET de detalle
+LOTE_MAX_IDS = 100
+
+def revisar_permisos(vista, request, permisos):
+    """check_permissions() de DRF con otros permisos: las vistas de detalle no
+    tienen (el registro es público), pero el GET por lotes entrega datos
+    personales de hasta LOTE_MAX_IDS personas y pide sesión y rol"""
+    for permiso in permisos:
+        if not permiso().has_permission(request, vista):
+            vista.permission_denied(request, message=getattr(permiso, "message", None))
+
+def respuesta_por_ids(ids_param, queryset, serializer_class, campo_json=None, campos=None):
+    """Resuelve varios ids en una sola consulta y conserva la forma de cada item.
+
+    Los ids que no existen (o no son números) se reportan en 'no_encontrados'."""
+    # El tope se revisa antes de recorrer todo el parámetro: con maxsplit lo
+    # que pase de LOTE_MAX_IDS queda en un último pedazo
+    valores = [v.strip() for v in ids_param.split(",", LOTE_MAX_IDS)]
+    valores = [v for v in valores if v]
+    if len(valores) > LOTE_MAX_IDS:
+        return Response({"message": "Máximo " + str(LOTE_MAX_IDS) + " ids por consulta"}, 400)
+
+    no_encontrados = {}
+    for valor in valores:
+        # isdigit() también acepta '²', que int() no convierte
+        if not (valor.isascii() and valor.isdigit() and len(valor) <= 18):
+            no_encontrados[valor] = "ID inválido"
+    ids = list(dict.fromkeys(int(v) for v in valores if v not in no_encontrados))
+
+    encontrados = {obj.id: obj for obj in queryset.filter(id__in=ids)}
+    results = []
+    for obj_id in ids:
+        if obj_id not in encontrados:
+            no_encontrados[str(obj_id)] = "No encontrado"
+            continue
+        data = serializer_class(encontrados[obj_id], campos=campos).data
+        if campo_json:
+            Utils.decodeJsonField(data, campo_json)
+        results.append(data)
+    return Response({"results": results, "no_encontrados": no_encontrados}, 200)
+
+# Campos parciales (?fields=id,user.first_name): para dropdowns y tablas que
+# no necesitan el registro completo
+class CamposParcialesMixin:
+    """Limita la respuesta y las columnas del SELECT (only()) a lo que pide
+    ?fields=, dentro de campos_permitidos de la vista. Sin ?fields= todo
+    queda igual. El serializer debe usar CamposMixin."""
+    campos_permitidos = ()
+    campos = None
+
+    def campos_pedidos(self, request):
+        """Lista de campos o None si no hay ?fields=; ValueError si pide uno fuera de la lista"""
+        valor = request.GET.get("fields")
+        if valor is None:
+            return None
+        campos = list(dict.fromkeys(c.strip() for c in valor.split(",") if c.strip()))
+        invalidos = [c for c in campos if c not in self.campos_permitidos]
+        if not campos or invalidos:
+            raise ValueError("Campos no permitidos: " + ", ".join(invalidos or ["(vacío)"])
+                             + ". Permitidos: " + ", ".join(self.campos_permitidos))
+        return campos
+
+    def limitar(self, queryset, campos):
+        """only() con las columnas de los campos pedidos; sin 'user' no hay JOIN"""
+        if campos is None:
+            return queryset
+        columnas = set()
+        for campo in campos:
+            if campo == "user":
+                columnas.update("user__" + c for c in UserSerializer.Meta.fields)
+            else:
+                columnas.add(campo.replace(".", "__"))
+        if not any(c.startswith("user__") for c in columnas):
+            queryset = queryset.select_related(None)
+        return queryset.only(*columnas)
+
+    # Para los ListAPIView: list() -> get_queryset() -> get_serializer()
+    def list(self, request, *args, **kwargs):
+        try:
+            self.campos = self.campos_pedidos(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, 400)
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return self.limitar(super().get_queryset(), self.campos)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.campos is not None:
+            kwargs["campos"] = self.campos
+        return super().get_serializer(*args, **kwargs)
+
+# Campos que se pueden pedir con ?fields= en admins, maestros y alumnos
+CAMPOS_USER = ("user", "user.id", "user.first_name", "user.last_name", "user.email")
+
 # Permiso: Solo Administrador
 class IsAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -92,21 +188,32 @@ class TotalUsers(generics.RetrieveAPIView):
 # ====================================================
 
 # LISTA AVANZADA (Paginación + Search + Sort)
-class AdminAll(generics.ListAPIView):
+class AdminAll(CamposParcialesMixin, generics.ListAPIView):
     permission_classes = (permissions.IsAuthenticated, IsAdmin) 
     serializer_class = AdminSerializer 
-    queryset = Administradores.objects.filter(user__is_active=1).order_by("id") 
+    queryset = Administradores.objects.filter(user__is_active=1).select_related("user").order_by("id") 
     pagination_class = StandardResultsPagination
     filter_backends = (filters.OrderingFilter, filters.SearchFilter)
     ordering_fields = ['id', 'user__first_name', 'user__last_name', 'clave_admin'] 
     ordering = ['user__last_name']
     search_fields = ['user__first_name', 'user__last_name', 'clave_admin', 'rfc']
+    campos_permitidos = ("id", "clave_admin", "rfc", "telefono", "edad", "ocupacion", "creation", "update") + CAMPOS_USER
 
 # CRUD (Crear, Editar, Eliminar) - Mantenemos tu lógica original
-class AdminView(generics.CreateAPIView):
+class AdminView(CamposParcialesMixin, generics.CreateAPIView):
+    campos_permitidos = AdminAll.campos_permitidos
+
     def get(self, request, *args, **kwargs):
-        admin = get_object_or_404(Administradores, id = request.GET.get("id"))
-        return Response(AdminSerializer(admin).data, 200)
+        try:
+            campos = self.campos_pedidos(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, 400)
+        queryset = self.limitar(Administradores.objects.select_related("user"), campos)
+        if request.GET.get("ids"):
+            revisar_permisos(self, request, AdminAll.permission_classes)
+            return respuesta_por_ids(request.GET["ids"], queryset, AdminSerializer, campos=campos)
+        admin = get_object_or_404(queryset, id = request.GET.get("id"))
+        return Response(AdminSerializer(admin, campos=campos).data, 200)
 
     @transaction.atomic
     def post(self, request, *args, **kwargs):
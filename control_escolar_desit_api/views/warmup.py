@@ -0,0 +1,15 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from control_escolar_desit_api.warmup import calentar
+
+# ====================================================
+# WARMUP (GET /_ah/warmup) - App Engine lo llama antes de enviar tráfico
+# ====================================================
+class WarmupView(APIView):
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        return Response({"warmup": calentar()}, 200)
@@ -0,0 +1,71 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_hecho = False
+
+def calentar(forzar=False):
+    """Prepara el proceso para que la primera petición real no pague el arranque.
+
+    Carga el URLconf (y con él todas las vistas), abre la conexión a la BD,
+    llena las cachés en memoria y renderiza la primera página del catálogo.
+    Se ejecuta una sola vez por proceso; regresa los tiempos de cada paso en ms."""
+    global _hecho
+    with _lock:
+        if _hecho and not forzar:
+            return {}
+        tiempos = {}
+
+        def paso(nombre, funcion):
+            inicio = time.perf_counter()
+            try:
+                funcion()
+            except Exception:
+                logger.exception("Warmup: falló el paso %s", nombre)
+            tiempos[nombre] = round((time.perf_counter() - inicio) * 1000, 1)
+
+        paso("urlconf", _cargar_urls)
+        paso("base_de_datos", _conectar_bd)
+        paso("catalogo", _cachear_catalogo)
+        paso("ocupacion", _construir_ocupacion)
+        paso("typeahead", _construir_typeahead)
+        paso("render_catalogo", _renderizar_catalogo)
+        _hecho = True
+        logger.info("Warmup listo: %s", tiempos)
+        return tiempos
+
+def _cargar_urls():
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+
+def _conectar_bd():
+    from django.db import connection
+    connection.ensure_connection()
+
+def _cachear_catalogo():
+    from control_escolar_desit_api.catalogo_utils import CatalogoUtils
+    from control_escolar_desit_api.periodos_utils import PeriodoUtils
+    CatalogoUtils.facetas("", PeriodoUtils.actual())
+
+def _construir_ocupacion():
+    from control_escolar_desit_api.ocupacion_utils import ocupacion
+    ocupacion.asegurar_construido()
+
+def _construir_typeahead():
+    from control_escolar_desit_api.typeahead_utils import typeahead
+    typeahead.asegurar_construido()
+
+def _renderizar_catalogo():
+    # Ejercita serializer + renderer con la misma primera página que pide el front
+    from django.conf import settings
+    from rest_framework.settings import api_settings
+    from control_escolar_desit_api.models import Materias
+    from control_escolar_desit_api.serializers import MateriaSerializer
+    from control_escolar_desit_api.periodos_utils import PeriodoUtils
+    pagina = Materias.objects.filter(periodo=PeriodoUtils.actual()).order_by("nombre")[:settings.REST_FRAMEWORK["PAGE_SIZE"]]
+    data = MateriaSerializer(pagina, many=True).data
+    for renderer in api_settings.DEFAULT_RENDERER_CLASSES[:2]:
+        renderer().render({"results": data})
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'control_escolar_desit_api.settings')
 
 application = get_wsgi_application()
+
+# Warmup opcional al arrancar el worker (p. ej. en Render, que no manda /_ah/warmup)
+if os.getenv("WARMUP_AL_ARRANCAR", "").lower() in ("1", "true", "si"):
+    from control_escolar_desit_api.warmup import calentar
+    calentar()